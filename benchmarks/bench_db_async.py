@@ -0,0 +1,130 @@
+"""
+Event-loop stalls caused by database work, by database access mode.
+
+Static requests are sent to the app (through ASGI, no network) while the
+network snapshot is reloaded from the database in a loop, as the version
+watcher and network refreshes do. Each mode runs the reload differently:
+    blocking   synchronous SQLAlchemy called on the event loop thread
+    thread     synchronous SQLAlchemy in a worker thread (asyncio.to_thread)
+    async      async engine (aiosqlite) via reload_snapshot_async
+
+A ticker measures how late the event loop wakes up (loop lag): that is the
+time any request, static or live, waits behind database calls.
+
+A database is seeded in a temporary directory (see seed_db.py); use
+--stops-per-line to make the network, and so each reload, bigger.
+
+Usage (from the repository root):
+    python benchmarks/bench_db_async.py [--stops-per-line 150] [--duration 5]
+        [--concurrency 16] [--modes blocking,thread,async]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+
+import httpx  # noqa: E402
+
+from seed_db import seed  # noqa: E402
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_mode(mode: str, duration: float, concurrency: int) -> dict:
+    from main import app
+    from services.network_snapshot import reload_snapshot, reload_snapshot_async
+
+    async def reload():
+        if mode == "blocking":
+            reload_snapshot()
+        elif mode == "thread":
+            await asyncio.to_thread(reload_snapshot)
+        else:
+            await reload_snapshot_async()
+
+    await reload()
+    deadline = time.perf_counter() + duration
+    lags, latencies, reloads = [], [], 0
+
+    async def reloader():
+        nonlocal reloads
+        while time.perf_counter() < deadline:
+            await reload()
+            reloads += 1
+            await asyncio.sleep(0)
+
+    async def ticker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        paths = ["/v1/bus/", "/v1/direction/", "/v1/bus_stop/suggest?q=ga", "/v1/bus/direction?direction_id=1"]
+
+        async def worker(offset: int):
+            index = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.get(paths[index % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                index += 1
+
+        await asyncio.gather(reloader(), ticker(), *(worker(offset) for offset in range(concurrency)))
+
+    lags.sort()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "reloads": reloads,
+        "requests": len(latencies),
+        "lag_p50_ms": _percentile(lags, 0.50) * 1000,
+        "lag_p99_ms": _percentile(lags, 0.99) * 1000,
+        "lag_max_ms": (lags[-1] if lags else 0.0) * 1000,
+        "request_p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--stops-per-line", type=int, default=150)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--modes", default="blocking,thread,async")
+    args = parser.parse_args()
+
+    from database.Database import get_async_engine, init_engine
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = Path(workdir) / "bench.sqlite"
+        seed(database, stops_per_line=args.stops_per_line)
+
+        print(f"{'mode':<10}{'reloads':>9}{'requests':>10}{'lag p50':>10}"
+              f"{'lag p99':>10}{'lag max':>10}{'req p99':>10}  (ms)")
+        for mode in args.modes.split(","):
+            init_engine(f"sqlite:///{database}", use_async=mode == "async")
+            if mode == "async" and get_async_engine() is None:
+                print(f"{mode:<10}skipped: aiosqlite is not installed")
+                continue
+            row = asyncio.run(run_mode(mode, args.duration, args.concurrency))
+            print(
+                f"{mode:<10}{row['reloads']:>9}{row['requests']:>10}{row['lag_p50_ms']:>10.2f}"
+                f"{row['lag_p99_ms']:>10.2f}{row['lag_max_ms']:>10.2f}{row['request_p99_ms']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
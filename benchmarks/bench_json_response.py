@@ -0,0 +1,128 @@
+"""
+Per-request CPU time of the JSON response paths, on the all-stops list.
+
+Serves the same list of bus stops three ways and calls each route directly
+through ASGI (no network, no test client), measuring process CPU time:
+    validated      response_model validation + stdlib JSON (FastAPI default)
+    fast           FastJSONResponse (orjson) returned without validation,
+                   as handlers do with FAST_JSON=true
+    pre-rendered   cached bytes, as the static routes serve them
+
+Stops are read from the database at DB_URL, or generated with --synthetic.
+
+Usage (from the repository root):
+    python benchmarks/bench_json_response.py [--synthetic 5000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from fastapi import FastAPI, Response  # noqa: E402
+
+from api.responses import FastJSONResponse, orjson  # noqa: E402
+from models.schemas import BusStopResponse  # noqa: E402
+from services.static_responses import render  # noqa: E402
+
+
+def synthetic_bus_stops(count: int) -> tuple[dict, ...]:
+    return tuple({"id": f"S{index:05d}", "name": f"Arrêt n°{index}"} for index in range(count))
+
+
+def database_bus_stops() -> tuple[dict, ...]:
+    """Bus stops of the network stored at DB_URL."""
+    from database.Database import timed_session
+    from services.network_snapshot import build_snapshot
+
+    session = timed_session()
+    try:
+        return build_snapshot(session).bus_stops
+    finally:
+        session.close()
+
+
+def build_app(bus_stops: tuple[dict, ...]) -> FastAPI:
+    app = FastAPI()
+    rendered = render(bus_stops)
+
+    @app.get("/validated", response_model=list[BusStopResponse])
+    async def validated():
+        return list(bus_stops)
+
+    @app.get("/fast", response_model=list[BusStopResponse])
+    async def fast():
+        return FastJSONResponse(bus_stops)
+
+    @app.get("/pre-rendered", response_model=list[BusStopResponse])
+    async def pre_rendered():
+        return Response(content=rendered.identity, media_type="application/json")
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """Run one GET request through the ASGI app and return the body."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """Mean process CPU time per request, in µs."""
+    for _ in range(min(requests, 50)):  # warm up
+        await call(app, path)
+    start = time.process_time()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.process_time() - start) / requests * 1e6
+
+
+async def run(bus_stops: tuple[dict, ...], requests: int):
+    app = build_app(bus_stops)
+    bodies = {path: await call(app, path) for path in ("/validated", "/fast", "/pre-rendered")}
+    if len(set(bodies.values())) != 1:
+        sys.exit("Response bodies differ between modes")
+
+    size = len(bodies["/validated"])
+    print(f"{len(bus_stops)} stops, {size} bytes per response, orjson={'yes' if orjson else 'no'}")
+    print(f"{'mode':<14}{'CPU µs/req':>12}{'speedup':>10}")
+    baseline = None
+    for path in bodies:
+        cpu = await measure(app, path, requests)
+        baseline = baseline or cpu
+        print(f"{path.lstrip('/'):<14}{cpu:>12.1f}{baseline / cpu:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--synthetic", type=int, metavar="STOPS",
+                        help="generate this many stops instead of reading DB_URL")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    bus_stops = synthetic_bus_stops(args.synthetic) if args.synthetic else database_bus_stops()
+    if not bus_stops:
+        sys.exit("No bus stops: ingest the network first or use --synthetic")
+    asyncio.run(run(bus_stops, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the live page parser.
+
+Compares services.live_parser.parse_live_page with the previous
+BeautifulSoup implementation over the synthetic pages in
+benchmarks/samples/ (hand-written after the live.synchro-bus.fr markup, not
+captured), checking both return the same passages (on the fields the
+previous one extracted). Needs beautifulsoup4 (requirements-dev.txt), which
+the API itself does not use.
+
+Usage (from the repository root):
+    python benchmarks/bench_live_parser.py [--iterations 500]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from services.live_parser import parse_live_page  # noqa: E402
+
+# Fields extracted by the previous implementation
+SHOWN_FIELDS = ("line", "direction", "time", "remaining")
+
+
+def parse_live_page_bs4(content: bytes) -> list[dict]:
+    """Previous implementation: full html.parser tree + four find_all per passage."""
+    soup = BeautifulSoup(content, "html.parser")
+    next_bus_list = []
+    for div in soup.find_all("div", class_="nq-c-Direction"):
+        try:
+            next_bus_list.append({
+                "line": div.find_all("img", class_="img-line")[0]["src"][56],
+                "direction": div.find_all(
+                    "div", class_="nq-c-Direction-content-detail-location"
+                )[0].span.text,
+                "time": div.find_all(
+                    "div", class_="nq-c-Direction-content-detail-time"
+                )[0].text,
+                "remaining": div.find_all(
+                    "div", class_="nq-c-Direction-content-detail-remaining"
+                )[0].text[1:],
+            })
+        except (IndexError, KeyError, AttributeError):
+            continue
+    return next_bus_list
+
+
+def measure(parser, content: bytes, iterations: int) -> dict:
+    """Return mean parse time (µs) and peak allocated memory (KiB) per page."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parser(content)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    parser(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"us_per_page": elapsed / iterations * 1e6, "peak_kib": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'page':<14}{'bytes':>8}{'passages':>10}  {'parser':<8}{'µs/page':>10}{'peak KiB':>10}")
+    for sample in sorted((ROOT / "samples").glob("*.html")):
+        content = sample.read_bytes()
+        expected = parse_live_page_bs4(content)
+        shown = [{field: passage[field] for field in SHOWN_FIELDS} for passage in parse_live_page(content)]
+        if shown != expected:
+            sys.exit(f"{sample.name}: parsers disagree")
+
+        results = {
+            "bs4": measure(parse_live_page_bs4, content, args.iterations),
+            "single": measure(parse_live_page, content, args.iterations),
+        }
+        for name, result in results.items():
+            print(
+                f"{sample.stem:<14}{len(content):>8}{len(expected):>10}  {name:<8}"
+                f"{result['us_per_page']:>10.1f}{result['peak_kib']:>10.1f}"
+            )
+        speedup = results["bs4"]["us_per_page"] / results["single"]["us_per_page"]
+        print(f"{'':<32}speedup x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    main()
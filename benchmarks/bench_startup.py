@@ -0,0 +1,117 @@
+"""
+Cold start time of the API, with and without the network snapshot file.
+
+Each run starts a fresh `uvicorn main:app` process on a seeded database
+(see seed_db.py) and measures, from process spawn:
+    ready     first 200 from /health (uvicorn startup complete)
+    static    first 200 from /v1/bus_stop/ (network served)
+and the time for the database engines to come up (first 200 from
+/health/db), which happens in the background when the snapshot file is
+used. Modes:
+    database  NETWORK_SNAPSHOT_FILE empty: the network is read with SQL
+    file      the network is loaded from a snapshot file written beforehand
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py [--runs 5] [--stops-per-line 30]
+        [--modes database,file]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import httpx  # noqa: E402
+
+from seed_db import seed  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _first_ok(client: httpx.Client, url: str, process: subprocess.Popen, start: float) -> float:
+    while time.perf_counter() - start < 30:
+        if process.poll() is not None:
+            sys.exit(f"API exited with code {process.returncode}")
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.002)
+    sys.exit(f"{url} not ready after 30s")
+
+
+def start_once(env: dict) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--no-access-log"],
+        cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1) as client:
+            return {
+                "ready": _first_ok(client, f"{url}/health", process, start),
+                "static": _first_ok(client, f"{url}/v1/bus_stop/", process, start),
+                "database": _first_ok(client, f"{url}/health/db", process, start),
+            }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def write_snapshot(database: Path, path: Path):
+    from database.Database import APIDatabase
+    from services.network_snapshot import build_snapshot, read_dataset_version, write_snapshot_file
+
+    db = APIDatabase(f"sqlite:///{database}")
+    try:
+        write_snapshot_file(build_snapshot(db.session, read_dataset_version(db.session)), str(path))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--stops-per-line", type=int, default=30)
+    parser.add_argument("--modes", default="database,file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = Path(workdir) / "bench.sqlite"
+        snapshot_file = Path(workdir) / "network.snapshot"
+        seed(database, stops_per_line=args.stops_per_line)
+        write_snapshot(database, snapshot_file)
+
+        print(f"{'mode':<10}{'ready':>10}{'static':>10}{'database':>10}  (ms, median of {args.runs})")
+        for mode in args.modes.split(","):
+            env = {
+                **os.environ,
+                "DB_URL": f"sqlite:///{database}",
+                "NETWORK_SNAPSHOT_FILE": str(snapshot_file) if mode == "file" else "",
+                "LIVE_PREFETCH_ENABLED": "false",
+                "ACCESS_LOG_SAMPLE_RATE": "0",
+                "LOG_LEVEL": "WARNING",
+            }
+            runs = [start_once(env) for _ in range(args.runs)]
+            row = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+            print(f"{mode:<10}{row['ready']:>10.0f}{row['static']:>10.0f}{row['database']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
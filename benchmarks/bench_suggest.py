@@ -0,0 +1,109 @@
+"""
+Micro-benchmark of the bus stop typeahead.
+
+Types every prefix of every stop name (as a user would, one letter at a
+time) against services.suggest_index.StopSuggestIndex and, for comparison,
+the ranked search index, and reports per-query latency.
+
+Stops are read from the database at DB_URL, or generated with --synthetic.
+
+Usage (from the repository root):
+    python benchmarks/bench_suggest.py [--synthetic 5000] [--limit 8]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "src"))
+
+from services.search_index import StopSearchIndex  # noqa: E402
+from services.suggest_index import StopSuggestIndex  # noqa: E402
+
+_WORDS = (
+    "Gare", "Université", "Jacob", "Place", "Église", "Mairie", "Lycée",
+    "Collège", "Pont", "Château", "Hôpital", "Centre", "Rue", "Avenue",
+    "Chambéry", "Bissy", "Cognin", "Barberaz", "Saint", "Martin", "Lac",
+)
+
+
+def synthetic_network(count: int):
+    """Random stop names made of 1 to 3 common words, with lines and directions."""
+    rng = random.Random(42)
+    bus_stops = tuple(
+        {"id": f"S{index:05d}", "name": " ".join(rng.sample(_WORDS, rng.randint(1, 3)))}
+        for index in range(count)
+    )
+    directions = tuple({"id": index, "name": f"Direction {index}"} for index in range(8))
+    buses_by_bus_stop = {stop["id"]: tuple(rng.sample("ABCD", 2)) for stop in bus_stops}
+    directions_by_bus_stop = {
+        stop["id"]: tuple(rng.sample(directions, 2)) for stop in bus_stops
+    }
+    return bus_stops, buses_by_bus_stop, directions_by_bus_stop
+
+
+def database_network():
+    """Stops, lines and directions of the network stored at DB_URL."""
+    from database.Database import timed_session
+    from services.network_snapshot import build_snapshot
+
+    session = timed_session()
+    try:
+        snapshot = build_snapshot(session)
+    finally:
+        session.close()
+    return snapshot.bus_stops, snapshot.buses_by_bus_stop, snapshot.directions_by_bus_stop
+
+
+def measure(lookup, queries: list[str], limit: int) -> dict:
+    """Latency percentiles (µs) of lookup over every query."""
+    durations = []
+    for query in queries:
+        start = time.perf_counter()
+        lookup(query, limit)
+        durations.append((time.perf_counter() - start) * 1e6)
+    durations.sort()
+    return {
+        "mean": statistics.fmean(durations),
+        "p50": durations[len(durations) // 2],
+        "p99": durations[int(len(durations) * 0.99)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--synthetic", type=int, metavar="STOPS",
+                        help="generate this many stops instead of reading DB_URL")
+    parser.add_argument("--limit", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        network = synthetic_network(args.synthetic)
+    else:
+        network = database_network()
+    bus_stops = network[0]
+    if not bus_stops:
+        sys.exit("No bus stops: ingest the network first or use --synthetic")
+
+    start = time.perf_counter()
+    suggest_index = StopSuggestIndex(*network)
+    build_ms = (time.perf_counter() - start) * 1e3
+    search_index = StopSearchIndex(bus_stops)
+
+    queries = [
+        stop["name"][:length]
+        for stop in bus_stops
+        for length in range(1, len(stop["name"] or "") + 1)
+    ]
+    print(f"{len(bus_stops)} stops, {len(queries)} prefixes, index built in {build_ms:.1f} ms")
+    print(f"{'index':<10}{'mean µs':>10}{'p50 µs':>10}{'p99 µs':>10}")
+    for name, lookup in (("suggest", suggest_index.suggest), ("search", search_index.search)):
+        result = measure(lookup, queries, args.limit)
+        print(f"{name:<10}{result['mean']:>10.1f}{result['p50']:>10.1f}{result['p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
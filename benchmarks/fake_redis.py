@@ -0,0 +1,116 @@
+"""
+Minimal in-memory stand-in for a Redis server, for the shared live cache.
+
+Speaks RESP and implements only what the API's redis backend uses: PING,
+GET, SET (with NX, XX, PX, EX), DEL, AUTH (accepted and ignored) and
+SELECT. Keys expire lazily when read.
+
+Point the API at it with:
+    LIVE_CACHE_BACKEND=redis
+    LIVE_CACHE_REDIS_URL=redis://127.0.0.1:6399/0
+
+Usage (from the repository root):
+    python benchmarks/fake_redis.py [--port 6399]
+"""
+import argparse
+import asyncio
+import time
+
+
+class Store:
+    def __init__(self):
+        self.values: dict[bytes, tuple[bytes, float]] = {}
+
+    def get(self, key: bytes):
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        if entry[1] and entry[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry[0]
+
+    def execute(self, args: list[bytes]) -> bytes:
+        name = args[0].upper()
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if name == b"GET" and len(args) == 2:
+            return _bulk(self.get(args[1]))
+        if name == b"DEL":
+            deleted = 0
+            for key in args[1:]:
+                if self.get(key) is not None:
+                    del self.values[key]
+                    deleted += 1
+            return b":%d\r\n" % deleted
+        if name == b"SET" and len(args) >= 3:
+            key, value, options = args[1], args[2], [option.upper() for option in args[3:]]
+            expires_at = 0.0
+            for unit, scale in ((b"PX", 0.001), (b"EX", 1.0)):
+                if unit in options:
+                    expires_at = time.monotonic() + int(options[options.index(unit) + 1]) * scale
+            exists = self.get(key) is not None
+            if (b"NX" in options and exists) or (b"XX" in options and not exists):
+                return b"$-1\r\n"
+            self.values[key] = (value, expires_at)
+            return b"+OK\r\n"
+        return b"-ERR unsupported command '%s'\r\n" % args[0]
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+async def _read_command(reader: asyncio.StreamReader) -> list[bytes]:
+    header = await reader.readline()
+    if not header:
+        raise EOFError
+    if not header.startswith(b"*"):
+        return header.split()  # inline command (e.g. from telnet)
+    args = []
+    for _ in range(int(header[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+def make_handler(store: Store):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await _read_command(reader)
+                if args:
+                    writer.write(store.execute(args))
+                    await writer.drain()
+        except (EOFError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(make_handler(Store()), host, port)
+    print(f"Fake Redis on {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
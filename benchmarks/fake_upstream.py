@@ -0,0 +1,98 @@
+"""
+Local stand-in for live.synchro-bus.fr and the linesshape API.
+
+Serves the generated network (see fixtures.py) at /linesshape?line=X and a
+synthetic live page at /<bus_stop_id>, with configurable latency and error
+rate, so the API can be load-tested without touching Synchro-Bus. /_stats
+returns the number of live pages served, to check how many upstream
+requests the API's caching let through.
+
+Point the API at it with:
+    SYNCHROBUS_LIVE_URL=http://127.0.0.1:8765
+    SYNCHROBUS_LINESSHAPE_URL=http://127.0.0.1:8765/linesshape
+
+Usage (from the repository root):
+    python benchmarks/fake_upstream.py [--port 8765] [--latency-ms 80]
+        [--jitter-ms 40] [--error-rate 0.02] [--seed 42]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fixtures import live_page_for, live_pages, network_shapes
+
+
+def make_handler(shapes: dict, pages: list[bytes], latency: float, jitter: float, error_rate: float):
+    live_requests = [0]
+    counter_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/_stats":
+                self._send(200, json.dumps({"live_requests": live_requests[0]}).encode(), "application/json")
+                return
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < error_rate:
+                self._send(503, b"Service Unavailable", "text/plain")
+                return
+
+            url = urlparse(self.path)
+            if url.path.rstrip("/").endswith("linesshape"):
+                line = parse_qs(url.query).get("line", [""])[0]
+                if line not in shapes:
+                    self._send(404, b"{}", "application/json")
+                    return
+                body = json.dumps({line: shapes[line]}, ensure_ascii=False).encode()
+                self._send(200, body, "application/json")
+            else:
+                bus_stop_id = url.path.strip("/")
+                with counter_lock:
+                    live_requests[0] += 1
+                self._send(200, live_page_for(bus_stop_id, pages), "text/html; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    handler = make_handler(
+        network_shapes(args.seed), live_pages(),
+        args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"Fake upstream on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms}±{args.jitter_ms} ms, errors {args.error_rate:.0%})",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
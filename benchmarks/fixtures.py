@@ -0,0 +1,83 @@
+"""
+Deterministic test data shared by the benchmark tools.
+
+The network is generated from a seed in the linesshape JSON format (one
+entry per line, two directions each, some stops shared between lines),
+so the fake upstream and the seeded database always agree. Live pages are
+the synthetic pages in benchmarks/samples/ (hand-written after the
+live.synchro-bus.fr markup, not captured), assigned to stops by id.
+"""
+import random
+import unicodedata
+import zlib
+from pathlib import Path
+
+SAMPLES = Path(__file__).resolve().parent / "samples"
+
+_PLACES = (
+    "Gare", "Université", "Jacob", "Gambetta", "Curial", "Bissy", "Cognin",
+    "Barberaz", "Bassens", "Technolac", "Landiers", "Chamnord", "Mairie",
+    "Lycée", "Collège", "Église", "Hôpital", "Château", "Pont", "Carré",
+    "Lac", "Verney", "Joppet", "Biollay", "Mérande", "Bellevue", "Plage",
+)
+_PREFIXES = ("", "", "Place ", "Rue ", "Avenue ", "Les ", "Saint-")
+
+
+def _stop_id(name: str, taken: set[str]) -> str:
+    """Upstream-like id: first letters of the name plus a digit (e.g. GAMBE1)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    letters = "".join(char for char in ascii_name.upper() if char.isalpha())[:5]
+    for digit in range(1, 100):
+        candidate = f"{letters}{digit}"
+        if candidate not in taken:
+            taken.add(candidate)
+            return candidate
+    raise ValueError(f"No free id for {name}")
+
+
+def network_shapes(
+    seed: int = 42, lines: tuple[str, ...] = ("A", "B", "C", "D"), stops_per_line: int = 30
+) -> dict[str, list[dict]]:
+    """
+    Generate the linesshape payload of every line.
+
+    Args:
+        seed: Random seed (same seed, same network)
+        lines: Line identifiers
+        stops_per_line: Stops along each line
+
+    Returns:
+        dict: Line identifier to its directions, as returned by linesshape
+    """
+    rng = random.Random(seed)
+    names, taken, pool = set(), set(), []
+    while len(pool) < len(lines) * stops_per_line * 3 // 4:
+        name = f"{rng.choice(_PREFIXES)}{rng.choice(_PLACES)}"
+        if rng.random() < 0.4:
+            name += f" {rng.choice(_PLACES)}"
+        if name not in names:
+            names.add(name)
+            pool.append({"id": _stop_id(name, taken), "name": name})
+
+    shapes = {}
+    for line in lines:
+        stops = rng.sample(pool, stops_per_line)
+        first, last = stops[0]["name"], stops[-1]["name"]
+        shapes[line] = [
+            {"display": last.upper(), "stopPoints": stops},
+            {"display": first.upper(), "stopPoints": stops[::-1]},
+        ]
+    return shapes
+
+
+def live_pages() -> list[bytes]:
+    """Synthetic live pages, in a stable order."""
+    return [path.read_bytes() for path in sorted(SAMPLES.glob("*.html"))]
+
+
+def live_page_for(bus_stop_id: str, pages: list[bytes]) -> bytes:
+    """Sample page named after a stop if there is one, else a page chosen by its id."""
+    sample = SAMPLES / f"{bus_stop_id}.html"
+    if sample.is_file():
+        return sample.read_bytes()
+    return pages[zlib.crc32(bus_stop_id.encode()) % len(pages)]
@@ -0,0 +1,293 @@
+"""
+Load test of every API endpoint at several concurrency levels.
+
+By default the whole stack is started locally: a seeded SQLite database
+(seed_db.py), the fake upstream (fake_upstream.py) and the API under
+uvicorn, all on loopback ports. Use --url to target a running API instead.
+
+For each endpoint and concurrency level, a fixed number of requests is sent
+and throughput (RPS), latency percentiles and errors (exceptions and HTTP
+status >= 400) are reported. Results are written as JSON; with --baseline,
+the run fails (exit code 1) when an endpoint got slower or lost throughput
+by more than --max-regression compared to a previous result file.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py [--concurrency 1,8,32] [--requests 500]
+        [--endpoints bus_stop.] [--output results.json]
+        [--baseline previous.json --max-regression 0.15]
+        [--upstream-latency-ms 80 --upstream-error-rate 0.02]
+        [--app-env LIVE_CACHE_TTL=0]
+
+With --workers above 1, each uvicorn worker has its own live cache; compare
+the upstream live page count printed at the end with
+--app-env LIVE_CACHE_BACKEND=sqlite (or redis, see fake_redis.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT.parent / "src"
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{url} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    sys.exit(f"{url} did not start within {timeout}s")
+
+
+@contextmanager
+def local_stack(args):
+    """Seed a database, start the fake upstream and the API; yield the API URL."""
+    from seed_db import seed
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database = Path(workdir) / "bench.sqlite"
+        seed(database, args.seed)
+        upstream_port, api_port = _free_port(), _free_port()
+        upstream_url = f"http://127.0.0.1:{upstream_port}"
+        api_url = f"http://127.0.0.1:{api_port}"
+
+        env = {
+            **os.environ,
+            "DB_URL": f"sqlite:///{database}",
+            "SYNCHROBUS_LIVE_URL": upstream_url,
+            "SYNCHROBUS_LINESSHAPE_URL": f"{upstream_url}/linesshape",
+            "ACCESS_LOG_SAMPLE_RATE": "0",
+            "LOG_LEVEL": "WARNING",
+        }
+        env.update(value.split("=", 1) for value in args.app_env)
+
+        processes = []
+        try:
+            processes.append(subprocess.Popen([
+                sys.executable, str(ROOT / "fake_upstream.py"),
+                "--port", str(upstream_port), "--seed", str(args.seed),
+                "--latency-ms", str(args.upstream_latency_ms),
+                "--jitter-ms", str(args.upstream_jitter_ms),
+                "--error-rate", str(args.upstream_error_rate),
+            ], stdout=subprocess.DEVNULL))
+            _wait_until_ready(f"{upstream_url}/linesshape?line=A", processes[-1])
+
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1", "--port", str(api_port),
+                "--workers", str(args.workers), "--no-access-log",
+            ], cwd=SRC, env=env, stdout=subprocess.DEVNULL))
+            _wait_until_ready(f"{api_url}/health", processes[-1])
+            yield api_url
+            live_requests = httpx.get(f"{upstream_url}/_stats").json()["live_requests"]
+            print(f"Upstream live pages fetched: {live_requests}")
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def discover_endpoints(url: str) -> dict[str, list[str]]:
+    """Build the endpoint list, with real ids taken from the API itself."""
+    buses = httpx.get(f"{url}/v1/bus/").json()
+    directions = [direction["id"] for direction in httpx.get(f"{url}/v1/direction/").json()]
+    bus_stops = httpx.get(f"{url}/v1/bus_stop/").json()
+    stop_ids = [bus_stop["id"] for bus_stop in bus_stops][:40]
+    names = [bus_stop["name"] for bus_stop in bus_stops][:40]
+
+    return {
+        "bus.all": ["/v1/bus/"],
+        "bus.by_direction": [f"/v1/bus/direction?direction_id={id}" for id in directions],
+        "direction.all": ["/v1/direction/"],
+        "direction.by_bus": [f"/v1/direction/bus?bus_id={bus}" for bus in buses],
+        "direction.by_bus_stop": [f"/v1/direction/bus_stop?bus_stop_id={id}" for id in stop_ids],
+        "bus_stop.all": ["/v1/bus_stop/"],
+        "bus_stop.by_direction": [f"/v1/bus_stop/direction?direction_id={id}" for id in directions],
+        "bus_stop.search": [f"/v1/bus_stop/search/{name[:6]}" for name in names],
+        "bus_stop.suggest": [f"/v1/bus_stop/suggest?q={name[:3]}" for name in names],
+        "bus_stop.live": [f"/v1/bus_stop/live/{id}" for id in stop_ids],
+        "bus_stop.live_batch": [
+            f"/v1/bus_stop/live?ids={','.join(stop_ids[i:i + 4])}"
+            for i in range(0, len(stop_ids), 4)
+        ],
+        "appleshortcuts.direction_by_bus": [
+            f"/v1/appleshortcuts/direction/bus?bus_id={bus}" for bus in buses
+        ],
+        "appleshortcuts.bus_stop_by_direction": [
+            f"/v1/appleshortcuts/bus_stop/direction?direction_id={id}" for id in directions
+        ],
+    }
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_level(url: str, paths: list[str], concurrency: int, requests: int) -> dict:
+    """Send requests (cycling through paths) with concurrency workers."""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        for path in paths[:concurrency]:  # open connections, fill caches
+            await client.get(path)
+
+        async def worker():
+            nonlocal errors
+            for index in counter:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(paths[index % len(paths)])
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """Describe every endpoint/level that regressed beyond the threshold."""
+    previous = {(row["endpoint"], row["concurrency"]): row for row in baseline}
+    regressions = []
+    for row in results:
+        before = previous.get((row["endpoint"], row["concurrency"]))
+        if before is None:
+            continue
+        if row["rps"] < before["rps"] * (1 - max_regression):
+            regressions.append(
+                f"{row['endpoint']} c={row['concurrency']}: RPS {before['rps']} -> {row['rps']}"
+            )
+        if row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(
+                f"{row['endpoint']} c={row['concurrency']}: p95 {before['p95_ms']} -> {row['p95_ms']} ms"
+            )
+        if row["errors"] > before["errors"] * (1 + max_regression) + 1:
+            regressions.append(
+                f"{row['endpoint']} c={row['concurrency']}: errors {before['errors']} -> {row['errors']}"
+            )
+    return regressions
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def benchmark(url: str, args) -> list[dict]:
+    endpoints = discover_endpoints(url)
+    if args.endpoints:
+        prefixes = args.endpoints.split(",")
+        endpoints = {
+            name: paths for name, paths in endpoints.items()
+            if any(name.startswith(prefix) for prefix in prefixes)
+        }
+
+    results = []
+    print(f"{'endpoint':<38}{'conc':>5}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, paths in endpoints.items():
+        for concurrency in args.concurrency:
+            row = {"endpoint": name, **asyncio.run(run_level(url, paths, concurrency, args.requests))}
+            results.append(row)
+            print(
+                f"{name:<38}{concurrency:>5}{row['rps']:>10.1f}{row['p50_ms']:>9.2f}"
+                f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['errors']:>8}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="target a running API instead of starting one")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        type=lambda value: [int(level) for level in value.split(",")])
+    parser.add_argument("--requests", type=int, default=500, help="per endpoint and level")
+    parser.add_argument("--endpoints", help="comma-separated endpoint name prefixes")
+    parser.add_argument("--output", type=Path, default=ROOT / "results" / "load_test.json")
+    parser.add_argument("--baseline", type=Path, help="previous results to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--upstream-latency-ms", type=float, default=80)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=40)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--app-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="extra environment variable for the API (repeatable)")
+    args = parser.parse_args()
+
+    if args.url:
+        results = benchmark(args.url.rstrip("/"), args)
+    else:
+        with local_stack(args) as url:
+            results = benchmark(url, args)
+
+    report = {
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text())["results"],
+                              args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
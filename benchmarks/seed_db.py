@@ -0,0 +1,69 @@
+"""
+Create a seeded SQLite database for benchmarks.
+
+Applies the Alembic migrations to a new file, then imports the generated
+network (see fixtures.py) through the regular ingest code, so the schema,
+indexes and dataset version match a real deployment.
+
+Usage (from the repository root):
+    python benchmarks/seed_db.py benchmarks/bench.sqlite [--seed 42] [--stops-per-line 30]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+DATABASE_DIR = ROOT.parent / "src" / "database"
+sys.path.insert(0, str(ROOT.parent / "src"))
+sys.path.insert(0, str(DATABASE_DIR))  # alembic env.py imports Table directly
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from fixtures import network_shapes  # noqa: E402
+
+
+def seed(path: Path, seed: int = 42, stops_per_line: int = 30) -> dict:
+    """
+    Build the database at path (replacing it) and return the ingest report.
+
+    Args:
+        path: SQLite file to create
+        seed: Network generator seed
+        stops_per_line: Stops along each line
+
+    Returns:
+        dict: Synchronize report (version, inserted rows per table, ...)
+    """
+    from database.Database import APIDatabase
+    from services.ingest_service import synchronize, transform
+
+    path = path.resolve()
+    path.unlink(missing_ok=True)
+    url = f"sqlite:///{path}"
+
+    alembic_config = Config(str(DATABASE_DIR / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(DATABASE_DIR / "alembic"))
+    alembic_config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(alembic_config, "head")
+
+    database = APIDatabase(url)
+    try:
+        return synchronize(database.session, transform(network_shapes(seed, stops_per_line=stops_per_line)))
+    finally:
+        database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stops-per-line", type=int, default=30)
+    args = parser.parse_args()
+
+    report = seed(args.path, args.seed, args.stops_per_line)
+    print(f"Seeded {args.path} (dataset v{report['version']}): {report['inserted']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,189 @@
 """FastAPI dependencies for dependency injection."""
-from typing import Generator
-from sqlalchemy.orm import Session
+import secrets
+from typing import Union
+from fastapi import Depends, Header, HTTPException, Query, Response
 
-import config
-from database.Database import APIDatabase
+from core import config
+from services.arrival_filter import ArrivalFilter
+from services.network_snapshot import NetworkSnapshot, get_snapshot
+from services.pagination import ListPage, decode_cursor
+from services.search_index import normalize
+from services.static_responses import ENCODINGS
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_network() -> NetworkSnapshot:
     """
-    Get database session using dependency injection.
+    Get the in-memory network snapshot using dependency injection.
     
-    Yields:
-        Session: SQLAlchemy database session
+    Returns:
+        NetworkSnapshot: Current immutable snapshot of buses, directions
+        and bus stops, with precomputed lookup indexes
+    """
+    return get_snapshot()
+
+
+def cache_control(max_age: float, stale_while_revalidate: float = 0) -> str:
+    """Build a public Cache-Control header value."""
+    value = f"public, max-age={max(0, int(max_age))}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={int(stale_while_revalidate)}"
+    return value
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def static_etag(version: str, encoding: Union[str, None] = None) -> str:
+    """Strong ETag of a static response; each content coding gets its own."""
+    return f'"{version}-{encoding}"' if encoding else f'"{version}"'
+
+
+def static_cache_headers(network: NetworkSnapshot, encoding: Union[str, None] = None) -> dict:
+    """ETag and Cache-Control headers of a static response."""
+    return {
+        "ETag": static_etag(network.version, encoding),
+        "Cache-Control": cache_control(
+            config.STATIC_CACHE_MAX_AGE, config.STATIC_CACHE_STALE_WHILE_REVALIDATE
+        ),
+        "Vary": "Accept-Encoding",
+    }
+
+
+def get_cached_network(
+    response: Response,
+    if_none_match: Union[str, None] = Header(None),
+    network: NetworkSnapshot = Depends(get_network),
+) -> NetworkSnapshot:
+    """
+    Get the network snapshot for a static route, with HTTP caching.
+    
+    Static responses only change when the network is re-ingested, so they
+    carry a strong ETag derived from the snapshot version and a public
+    Cache-Control header. A request whose If-None-Match matches is answered
+    304 Not Modified before the route runs.
+    
+    Returns:
+        NetworkSnapshot: Current immutable snapshot
         
-    Example:
-        @router.get("/items")
-        def get_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
-    """
-    db = APIDatabase(config.DB_URL)
-    try:
-        yield db
-    finally:
-        db.close()
+    Raises:
+        HTTPException: 304 if the client copy is still current
+    """
+    if if_none_match:
+        for encoding in (None, *ENCODINGS):
+            if etag_matches(if_none_match, static_etag(network.version, encoding)):
+                raise HTTPException(
+                    status_code=304, headers=static_cache_headers(network, encoding)
+                )
+    response.headers.update(static_cache_headers(network))
+    return network
+
+
+def get_arrival_filter(
+    line: Union[str, None] = Query(None, description="Comma-separated lines to keep (e.g., A,C)"),
+    direction_id: Union[int, None] = Query(None, description="Direction to keep"),
+    max_minutes: Union[int, None] = Query(
+        None, ge=0, description="Keep arrivals due within this many minutes"
+    ),
+    limit: Union[int, None] = Query(None, ge=1, le=100, description="Maximum arrivals per stop"),
+    network: NetworkSnapshot = Depends(get_network),
+) -> ArrivalFilter:
+    """
+    Get the live arrivals filter from the query parameters.
+    
+    Returns:
+        ArrivalFilter: Criteria to apply to each stop's arrivals
+        
+    Raises:
+        HTTPException: 404 if direction_id is not a known direction
+    """
+    direction = None
+    if direction_id is not None:
+        name = next(
+            (direction["name"] for direction in network.directions if direction["id"] == direction_id),
+            None,
+        )
+        if name is None:
+            raise HTTPException(status_code=404, detail=f"Direction inconnue: {direction_id}")
+        direction = normalize(name)
+    lines = frozenset(value.strip().upper() for value in (line or "").split(",") if value.strip())
+    return ArrivalFilter(lines, direction, max_minutes, limit)
+
+
+def list_page_dependency(key_type: type, fields: tuple[str, ...]):
+    """
+    Build the dependency reading limit, cursor and fields of a list endpoint.
+    
+    Args:
+        key_type: Type of the endpoint's ids (cursors of another type are
+            rejected)
+        fields: Fields of the endpoint's items, in response order
+        
+    Returns:
+        Callable: FastAPI dependency returning a ListPage
+    """
+    def get_list_page(
+        limit: Union[int, None] = Query(
+            None, ge=1, le=config.LIST_PAGE_MAX_LIMIT, description="Maximum items (ordered by id)"
+        ),
+        cursor: Union[str, None] = Query(None, description="Next page cursor (X-Next-Cursor header)"),
+        fields_query: Union[str, None] = Query(
+            None, alias="fields", description=f"Comma-separated fields to return ({', '.join(fields)})"
+        ),
+    ) -> ListPage:
+        """
+        Get the requested page and fields.
+        
+        Raises:
+            HTTPException: 400 if the cursor is invalid or a field is unknown
+        """
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                after = None
+            if not isinstance(after, key_type):
+                raise HTTPException(status_code=400, detail="Curseur invalide")
+
+        selected = None
+        if fields_query:
+            names = {name.strip() for name in fields_query.split(",") if name.strip()}
+            unknown = sorted(names.difference(fields))
+            if unknown:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Champ inconnu: {', '.join(unknown)} (disponibles: {', '.join(fields)})"
+                )
+            selected = tuple(field for field in fields if field in names)
+            if selected == fields:
+                selected = None
+        return ListPage(after, limit, selected)
+
+    return get_list_page
+
+
+def require_admin(authorization: Union[str, None] = Header(None)):
+    """
+    Check the admin bearer token.
+    
+    Raises:
+        HTTPException: 404 if no ADMIN_TOKEN is configured (admin routes
+        are disabled), 401 if the token is missing or wrong
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token, config.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=401,
+            detail="Authentification requise",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,117 @@
+"""Response helpers: pre-rendered static bodies and the fast JSON mode."""
+from typing import Any, Hashable, Sequence
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib encoder
+    orjson = None
+
+from api.dependencies import static_cache_headers
+from core import config
+from services.network_snapshot import NetworkSnapshot
+from services.pagination import KeysetIndex, ListPage, encode_cursor
+from services.static_responses import static_responses
+
+
+def static_json_response(
+    request: Request, network: NetworkSnapshot, key: Hashable, content: Any
+) -> Response:
+    """
+    Send static content from its cached JSON body, compressed when accepted.
+    
+    The body is serialized once per snapshot version, so the route skips
+    response_model validation and serialization; content must already have
+    the documented shape.
+    
+    Args:
+        request: Incoming request (for Accept-Encoding)
+        network: Snapshot the content comes from
+        key: Route and parameter identifying the response
+        content: Response content
+        
+    Returns:
+        Response: JSON response with ETag and Cache-Control headers
+    """
+    rendered = static_responses.get(network.version, key, content)
+    body, encoding = rendered.select(request.headers.get("accept-encoding"))
+    headers = static_cache_headers(network, encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def list_page_response(
+    request: Request,
+    network: NetworkSnapshot,
+    key: tuple,
+    rows: Sequence[dict],
+    index: KeysetIndex,
+    page: ListPage,
+) -> Response:
+    """
+    Send a network list, or one page or field projection of it.
+
+    Without limit or cursor the whole list is sent in table order, from
+    the pre-rendered bodies. Pages are ordered by id and serialized per
+    request: they cost O(limit) whatever the list size, and arbitrary
+    cursors cannot churn the pre-rendered body cache. When more items
+    follow, the next page is given by the X-Next-Cursor and Link headers.
+
+    Args:
+        request: Incoming request
+        network: Snapshot the list comes from
+        key: Route identifying the full list
+        rows: The full list, in table order
+        index: The same list sorted by id
+        page: Requested page and fields
+
+    Returns:
+        Response: JSON response with ETag and Cache-Control headers
+    """
+    if not page.paginated:
+        if page.fields is None:
+            return static_json_response(request, network, key, rows)
+        return static_json_response(request, network, (*key, page.fields), page.project(rows))
+
+    items, next_key = index.page(page.after, page.limit)
+    response_class = FastJSONResponse if config.FAST_JSON else JSONResponse
+    response = response_class(page.project(items), headers=static_cache_headers(network))
+    if next_key is not None:
+        cursor = encode_cursor(next_key)
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"'
+    return response
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content)
+
+
+def trusted_response(content: Any, response: Response) -> Any:
+    """
+    Return handler data, skipping response_model validation in fast mode.
+    
+    The routers build their data in the documented shape already, so with
+    FAST_JSON enabled it is encoded directly instead of being validated a
+    second time. Headers set on the injected response are kept.
+    
+    Args:
+        content: Data in the shape of the route's response_model
+        response: Response injected in the route (carries its headers)
+        
+    Returns:
+        Any: content unchanged, or a FastJSONResponse in fast mode
+    """
+    if not config.FAST_JSON:
+        return content
+    fast = FastJSONResponse(content, status_code=response.status_code or 200)
+    fast.raw_headers.extend(response.headers.raw)
+    return fast
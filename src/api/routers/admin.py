@@ -0,0 +1,48 @@
+"""Administration routes (require the ADMIN_TOKEN bearer token)."""
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.dependencies import require_admin
+from models.schemas import NetworkRefreshResponse
+from core.logging_config import logger
+from services.network_refresh import RefreshInProgressError, refresh_network
+
+router = APIRouter(
+    prefix="/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.post("/network/refresh", response_model=NetworkRefreshResponse)
+async def refresh_network_data():
+    """
+    Refresh the static network from the Synchro-Bus linesshape API.
+    
+    Only rows that changed upstream are inserted or deleted, in a single
+    transaction. Every API worker switches to the new dataset version
+    atomically, without a restart.
+    
+    Returns:
+        NetworkRefreshResponse: New dataset version and per-table changes
+        
+    Raises:
+        HTTPException: 401 if the admin token is missing or wrong
+        HTTPException: 409 if a refresh is already running
+        HTTPException: 502 if the upstream network cannot be fetched
+    """
+    logger.info("POST /v1/admin/network/refresh")
+    
+    try:
+        return await refresh_network()
+    except RefreshInProgressError:
+        raise HTTPException(
+            status_code=409,
+            detail="Un rafraîchissement du réseau est déjà en cours"
+        )
+    except httpx.HTTPError as e:
+        logger.error("Error fetching network data: %s", e)
+        raise HTTPException(
+            status_code=502,
+            detail=f"Erreur lors de la récupération du réseau: {str(e)}"
+        )
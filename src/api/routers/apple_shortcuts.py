@@ -1,20 +1,20 @@
 """Apple Shortcuts specific routes (dict format instead of list)."""
 from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from api.dependencies import get_db
-from database.Table import Direction, BusDirection, BusStop, BusStopDirection
+from api.dependencies import get_cached_network
+from api.responses import static_json_response
 from core.logging_config import logger
+from services.network_snapshot import NetworkSnapshot
 
 router = APIRouter(prefix="/v1/appleshortcuts", tags=["apple_shortcuts"])
 
 
 @router.get("/direction/bus", response_model=dict[str, int])
 async def get_directions_by_bus_apple_shortcuts(
+    request: Request,
     bus_id: Union[str, None] = Query(None, description="Bus line identifier"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all directions for a bus in Apple Shortcuts format.
@@ -43,23 +43,22 @@ async def get_directions_by_bus_apple_shortcuts(
             detail="Vous devez spécifier un bus"
         )
     
-    logger.info(f"GET /v1/appleshortcuts/direction/bus?bus_id={bus_id}")
+    logger.info("GET /v1/appleshortcuts/direction/bus?bus_id=%s", bus_id)
     
-    query = select(Direction.id, Direction.name).where(
-        Direction.id.in_(
-            select(BusDirection.direction_id).where(
-                BusDirection.bus_id == bus_id
-            )
-        )
+    directions = {
+        direction["name"]: direction["id"]
+        for direction in network.get_directions_by_bus(bus_id)
+    }
+    return static_json_response(
+        request, network, ("appleshortcuts.direction.bus", bus_id), directions
     )
-    res = db.execute(query).fetchall()
-    return {direction[1]: direction[0] for direction in res}
 
 
 @router.get("/bus_stop/direction", response_model=dict[str, str])
 async def get_bus_stops_by_direction_apple_shortcuts(
+    request: Request,
     direction_id: Union[str, None] = Query(None, description="Direction ID"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all bus stops for a direction in Apple Shortcuts format.
@@ -89,14 +88,12 @@ async def get_bus_stops_by_direction_apple_shortcuts(
             detail="Vous devez spécifier une direction"
         )
     
-    logger.info(f"GET /v1/appleshortcuts/bus_stop/direction?direction_id={direction_id}")
+    logger.info("GET /v1/appleshortcuts/bus_stop/direction?direction_id=%s", direction_id)
     
-    query = select(BusStop.id, BusStop.name).where(
-        BusStop.id.in_(
-            select(BusStopDirection.bus_stop_id).where(
-                BusStopDirection.direction_id == direction_id
-            )
-        )
+    bus_stops = {
+        bus_stop["name"]: bus_stop["id"]
+        for bus_stop in network.get_bus_stops_by_direction(direction_id)
+    }
+    return static_json_response(
+        request, network, ("appleshortcuts.bus_stop.direction", direction_id), bus_stops
     )
-    res = db.execute(query).fetchall()
-    return {bus_stop[1]: bus_stop[0] for bus_stop in res}
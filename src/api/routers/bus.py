@@ -1,18 +1,20 @@
 """Bus routes."""
 from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from api.dependencies import get_db
-from database.Table import Bus, BusDirection
+from api.dependencies import get_cached_network
+from api.responses import static_json_response
 from core.logging_config import logger
+from services.network_snapshot import NetworkSnapshot
 
 router = APIRouter(prefix="/v1/bus", tags=["bus"])
 
 
 @router.get("/", response_model=list[str])
-async def get_all_buses(db: Session = Depends(get_db)):
+async def get_all_buses(
+    request: Request,
+    network: NetworkSnapshot = Depends(get_cached_network)
+):
     """
     Get all available bus lines.
     
@@ -20,14 +22,14 @@ async def get_all_buses(db: Session = Depends(get_db)):
         list[str]: List of bus line identifiers (e.g., ["A", "B", "C", "D"])
     """
     logger.info("GET /v1/bus - Fetching all bus lines")
-    res = db.execute(select(Bus.id)).fetchall()
-    return [bus[0] for bus in res]
+    return static_json_response(request, network, ("bus",), network.buses)
 
 
 @router.get("/direction", response_model=list[str])
 async def get_buses_by_direction(
+    request: Request,
     direction_id: Union[int, None] = Query(None, description="Direction ID"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all bus lines for a specific direction.
@@ -47,14 +49,9 @@ async def get_buses_by_direction(
             detail="Vous devez spécifier une direction"
         )
     
-    logger.info(f"GET /v1/bus/direction?direction_id={direction_id}")
+    logger.info("GET /v1/bus/direction?direction_id=%s", direction_id)
     
-    query = select(Bus.id).where(
-        Bus.id.in_(
-            select(BusDirection.bus_id).where(
-                BusDirection.direction_id == direction_id
-            )
-        )
+    return static_json_response(
+        request, network, ("bus.direction", direction_id),
+        network.get_buses_by_direction(direction_id),
     )
-    res = db.execute(query).fetchall()
-    return [bus[0] for bus in res]
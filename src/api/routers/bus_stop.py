@@ -1,36 +1,66 @@
 """Bus stop routes."""
+import asyncio
+import json
+import math
 from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-import requests
-from bs4 import BeautifulSoup
-
-from api.dependencies import get_db
-from database.Table import BusStop, BusStopDirection
-from models.schemas import BusStopResponse, BusLiveInfoResponse
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Path, Request, Response,
+    WebSocket, WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+
+from api.dependencies import (
+    cache_control, get_arrival_filter, get_cached_network, get_network, list_page_dependency,
+)
+from api.responses import list_page_response, static_json_response, trusted_response
+from models.schemas import (
+    BusStopResponse,
+    BusStopSuggestion,
+    BusLiveInfoResponse,
+    BusLiveBatchEntry,
+)
+from core import config
 from core.logging_config import logger
+from services.arrival_filter import ArrivalFilter
+from services.live_cache import live_cache
+from services.live_stream import Subscription, live_hub
+from services.network_snapshot import NetworkSnapshot, get_snapshot
+from services.pagination import ListPage
+from services.scraper_service import LiveDataError, UpstreamUnavailableError
 
 router = APIRouter(prefix="/v1/bus_stop", tags=["bus_stop"])
 
 
 @router.get("/", response_model=list[BusStopResponse])
-async def get_all_bus_stops(db: Session = Depends(get_db)):
+async def get_all_bus_stops(
+    request: Request,
+    page: ListPage = Depends(list_page_dependency(str, ("id", "name"))),
+    network: NetworkSnapshot = Depends(get_cached_network)
+):
     """
-    Get all available bus stops.
+    Get all available bus stops, or one page of them.
+    
+    With `limit` and/or `cursor`, stops are ordered by id and the
+    `X-Next-Cursor` header (and `Link: rel="next"`) gives the cursor of the
+    next page, absent on the last one. `fields` keeps only some fields.
     
     Returns:
-        list[BusStopResponse]: List of all bus stops with ID and name
+        list[BusStopResponse]: Bus stops with ID and name (or the requested fields)
+        
+    Raises:
+        HTTPException: 400 if the cursor is invalid or a field is unknown
     """
     logger.info("GET /v1/bus_stop - Fetching all bus stops")
-    res = db.execute(select(BusStop.id, BusStop.name)).fetchall()
-    return [{"id": bus_stop[0], "name": bus_stop[1]} for bus_stop in res]
+    return list_page_response(
+        request, network, ("bus_stop",), network.bus_stops, network.bus_stops_by_id, page
+    )
 
 
 @router.get("/direction", response_model=list[BusStopResponse])
 async def get_bus_stops_by_direction(
+    request: Request,
     direction_id: Union[str, None] = Query(None, description="Direction ID"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all bus stops for a specific direction.
@@ -50,59 +80,325 @@ async def get_bus_stops_by_direction(
             detail="Vous devez spécifier une direction"
         )
     
-    logger.info(f"GET /v1/bus_stop/direction?direction_id={direction_id}")
+    logger.info("GET /v1/bus_stop/direction?direction_id=%s", direction_id)
     
-    query = select(BusStop.id, BusStop.name).where(
-        BusStop.id.in_(
-            select(BusStopDirection.bus_stop_id).where(
-                BusStopDirection.direction_id == direction_id
-            )
-        )
+    return static_json_response(
+        request, network, ("bus_stop.direction", direction_id),
+        network.get_bus_stops_by_direction(direction_id),
     )
-    res = db.execute(query).fetchall()
-    return [{"id": bus_stop[0], "name": bus_stop[1]} for bus_stop in res]
 
 
 @router.get("/search/{bus_stop_name}", response_model=list[BusStopResponse])
 async def search_bus_stops(
+    response: Response,
     bus_stop_name: str = Path(..., description="Bus stop name to search for"),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Search for bus stops by name.
     
+    Matching ignores accents and case ("universite" finds "Université"),
+    tolerates small typos, and returns the best matches first.
+    
     Args:
-        bus_stop_name: The name pattern to search for
+        bus_stop_name: The name (or part of it) to search for
+        limit: Maximum number of results
         
     Returns:
         list[BusStopResponse]: List of bus stops matching the search query
     """
-    logger.info(f"GET /v1/bus_stop/search/{bus_stop_name}")
+    logger.info("GET /v1/bus_stop/search/%s", bus_stop_name)
+    
+    return trusted_response(network.search_index.search(bus_stop_name, limit), response)
+
+
+@router.get("/suggest", response_model=list[BusStopSuggestion])
+async def suggest_bus_stops(
+    response: Response,
+    q: str = Query(..., description="What the user typed so far"),
+    limit: int = Query(8, ge=1, le=50, description="Maximum number of suggestions"),
+    network: NetworkSnapshot = Depends(get_cached_network)
+):
+    """
+    Suggest bus stops while the user types (typeahead).
+    
+    Matches stops whose name, or a word in it, starts with `q` (accents and
+    case ignored). Each suggestion carries its lines and directions so no
+    follow-up request is needed.
+    
+    Args:
+        q: Name prefix typed so far
+        limit: Maximum number of suggestions
+        
+    Returns:
+        list[BusStopSuggestion]: Matching stops with lines and directions
+    """
+    return trusted_response(network.suggest_index.suggest(q, limit), response)
+
+
+def _live_bus_stop_ids(ids: Union[str, None]) -> list[str]:
+    """
+    Parse a comma-separated list of stops for the live routes.
+    
+    Raises:
+        HTTPException: 400 if no stop or too many stops are given
+    """
+    bus_stop_ids = [bus_stop_id.strip() for bus_stop_id in (ids or "").split(",") if bus_stop_id.strip()]
+    if not bus_stop_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Vous devez spécifier au moins un arrêt de bus"
+        )
+    if len(bus_stop_ids) > config.LIVE_BATCH_MAX_STOPS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Vous ne pouvez pas demander plus de {config.LIVE_BATCH_MAX_STOPS} arrêts"
+        )
+    return list(dict.fromkeys(bus_stop_ids))
+
+
+@router.get("/live", response_model=dict[str, BusLiveBatchEntry])
+async def get_bus_stops_live_info(
+    response: Response,
+    ids: Union[str, None] = Query(
+        None, description="Comma-separated bus stop identifiers (e.g., GAMBE1,GARE1)"
+    ),
+    arrival_filter: ArrivalFilter = Depends(get_arrival_filter)
+):
+    """
+    Get real-time bus arrival information for several stops at once.
+    
+    Stops are fetched concurrently (bounded by LIVE_BATCH_CONCURRENCY) and
+    cached results are reused, so the response arrives in about the time of
+    the slowest stop. A stop that fails gets an `error` instead of failing
+    the whole batch, or its last known arrivals with `cache` FALLBACK. Clients
+    may cache the response until its oldest stop expires, unless a stop
+    failed or fell back. The `line`, `direction_id`, `max_minutes` and
+    `limit` filters apply to each stop.
+    
+    Args:
+        ids: Comma-separated bus stop identifiers
+        arrival_filter: Filters from the line, direction_id, max_minutes
+            and limit query parameters
+        
+    Returns:
+        dict[str, BusLiveBatchEntry]: Live arrivals (or error) per stop
+        
+    Raises:
+        HTTPException: 400 if no stop or too many stops are given
+        HTTPException: 404 if direction_id is unknown
+    """
+    bus_stop_ids = _live_bus_stop_ids(ids)
+    
+    logger.info("GET /v1/bus_stop/live?ids=%s", ','.join(bus_stop_ids))
+    
+    results = await live_cache.get_many(bus_stop_ids, config.LIVE_BATCH_CONCURRENCY)
+    
+    batch = {}
+    oldest, failed = 0.0, False
+    for bus_stop_id, result in results.items():
+        if isinstance(result, LiveDataError):
+            logger.error("Error fetching live data for %s: %s", bus_stop_id, result)
+            batch[bus_stop_id] = {
+                "arrivals": None,
+                "cache": None,
+                "age": None,
+                "error": f"Erreur lors de la récupération des données en temps réel: {str(result)}",
+            }
+            failed = True
+        elif isinstance(result, BaseException):
+            # Unexpected errors and cancellation (CancelledError is not an Exception)
+            raise result
+        else:
+            batch[bus_stop_id] = {
+                "arrivals": arrival_filter.apply(result.value),
+                "cache": result.status,
+                "age": int(result.age),
+                "error": None,
+            }
+            oldest = max(oldest, result.age)
+            failed = failed or result.status == "FALLBACK"
+    response.headers["Cache-Control"] = (
+        "no-store" if failed else cache_control(config.LIVE_CACHE_TTL - oldest)
+    )
+    return trusted_response(batch, response)
+
+
+def _unknown_bus_stops(network: NetworkSnapshot, bus_stop_ids: list[str]) -> list[str]:
+    known = {bus_stop["id"] for bus_stop in network.bus_stops}
+    return [bus_stop_id for bus_stop_id in bus_stop_ids if bus_stop_id not in known]
+
+
+def _sse_event(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def _live_event_stream(bus_stop_ids: list[str]):
+    """Server-Sent Events of a new subscription, with keep-alive comments."""
+    subscription = live_hub.subscribe(bus_stop_ids)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), config.LIVE_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield _sse_event(event)
+    finally:
+        live_hub.unsubscribe(subscription)
+
+
+@router.get(
+    "/live/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "Event stream"}},
+)
+async def stream_bus_stops_live_info(
+    ids: Union[str, None] = Query(
+        None, description="Comma-separated bus stop identifiers (e.g., GAMBE1,GARE1)"
+    ),
+    network: NetworkSnapshot = Depends(get_network)
+):
+    """
+    Stream real-time arrivals of one or more stops (Server-Sent Events).
+    
+    Each stop is polled once for all connected clients, so departure boards
+    watching the same stop share one upstream request per cache TTL. The
+    stream starts with a `snapshot` event per stop, then sends a `diff`
+    event (`added`, `changed` and `removed` arrivals, keyed by line,
+    direction and time) only when its arrivals change, and an `error` event
+    when fetching starts failing. Comments are sent every
+    LIVE_STREAM_HEARTBEAT seconds to keep the connection open.
+    
+    Args:
+        ids: Comma-separated bus stop identifiers
+        
+    Returns:
+        StreamingResponse: text/event-stream of JSON events
+        
+    Raises:
+        HTTPException: 400 if no stop or too many stops are given
+        HTTPException: 404 if a stop does not exist
+    """
+    bus_stop_ids = _live_bus_stop_ids(ids)
+    unknown = _unknown_bus_stops(network, bus_stop_ids)
+    if unknown:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Arrêt(s) de bus inconnu(s): {', '.join(unknown)}"
+        )
+    
+    logger.info("GET /v1/bus_stop/live/stream?ids=%s", ','.join(bus_stop_ids))
     
-    query = select(BusStop.id, BusStop.name).where(
-        BusStop.name.like(f"%{bus_stop_name}%")
+    return StreamingResponse(
+        _live_event_stream(bus_stop_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    res = db.execute(query).fetchall()
-    return [{"id": bus_stop[0], "name": bus_stop[1]} for bus_stop in res]
+
+
+async def _send_live_events(websocket: WebSocket, subscription: Subscription):
+    while True:
+        event = await subscription.get()
+        if event is None:
+            await websocket.close()
+            return
+        await websocket.send_text(json.dumps(event, ensure_ascii=False))
+
+
+def _websocket_follow(subscription: Subscription, message: dict) -> str:
+    """Apply a subscribe/unsubscribe message; return an error, or "" if valid."""
+    subscribe, unsubscribe = message.get("subscribe", []), message.get("unsubscribe", [])
+    if not all(
+        isinstance(ids, list) and all(isinstance(id, str) for id in ids)
+        for ids in (subscribe, unsubscribe)
+    ):
+        return "Format attendu: {\"subscribe\": [...], \"unsubscribe\": [...]}"
+    unknown = _unknown_bus_stops(get_snapshot(), subscribe)
+    if unknown:
+        return f"Arrêt(s) de bus inconnu(s): {', '.join(unknown)}"
+    if len((subscription.bus_stop_ids - set(unsubscribe)) | set(subscribe)) > config.LIVE_BATCH_MAX_STOPS:
+        return f"Vous ne pouvez pas suivre plus de {config.LIVE_BATCH_MAX_STOPS} arrêts"
+    live_hub.unfollow(subscription, unsubscribe)
+    live_hub.follow(subscription, subscribe)
+    return ""
+
+
+@router.websocket("/live/ws")
+async def bus_stops_live_websocket(websocket: WebSocket):
+    """
+    Stream real-time arrivals over a WebSocket.
+    
+    Sends the same JSON events as `/live/stream`. The client changes the
+    stops it follows at any time by sending
+    `{"subscribe": ["GAMBE1"], "unsubscribe": ["GARE1"]}`; invalid messages
+    are answered with an `error` event without a `bus_stop_id`.
+    """
+    await websocket.accept()
+    subscription = live_hub.subscribe([])
+    sender = asyncio.create_task(_send_live_events(websocket, subscription))
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                message = None
+            error = (
+                _websocket_follow(subscription, message) if isinstance(message, dict)
+                else "Message JSON invalide"
+            )
+            if error:
+                live_hub.deliver(subscription, {"type": "error", "error": error})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        live_hub.unsubscribe(subscription)
 
 
 @router.get("/live/{bus_stop_id}", response_model=list[BusLiveInfoResponse])
 async def get_bus_stop_live_info(
-    bus_stop_id: str = Path(..., description="Bus stop identifier")
+    response: Response,
+    bus_stop_id: str = Path(..., description="Bus stop identifier"),
+    arrival_filter: ArrivalFilter = Depends(get_arrival_filter)
 ):
     """
     Get real-time bus arrival information for a specific stop.
     
-    This endpoint scrapes live data from the Synchro-Bus website.
+    This endpoint scrapes live data from the Synchro-Bus website using the
+    shared async HTTP client, so a slow upstream does not block the worker.
+    Results are cached per stop for a short TTL and hot stops are refreshed
+    in the background; the `X-Cache` (HIT/STALE/MISS) and `Age` response
+    headers report how fresh the data is, and `Cache-Control` lets clients
+    keep it for the cache TTL.
+    
+    When Synchro-Bus fails, the last known arrivals of the stop (up to
+    LIVE_FALLBACK_MAX_AGE old) are returned with `X-Cache: FALLBACK` and are
+    not cacheable. While the upstream circuit is open and nothing is known
+    for the stop, the request fails fast with 503 and `Retry-After`.
+    
+    Each arrival has the time and remaining text shown by Synchro-Bus, plus
+    the `departure` timestamp and `minutes` until departure, computed when
+    the response is served (so cached and fallback entries stay accurate).
+    `line` (e.g., A,C), `direction_id`, `max_minutes` and `limit` filter
+    them server-side; every variant is served from the same cached entry.
     
     Args:
         bus_stop_id: The bus stop identifier (e.g., "GAMBE1")
+        arrival_filter: Filters from the line, direction_id, max_minutes
+            and limit query parameters
         
     Returns:
         list[BusLiveInfoResponse]: List of upcoming bus arrivals with times
         
     Raises:
         HTTPException: 400 if bus_stop_id is not provided
+        HTTPException: 404 if direction_id is unknown
+        HTTPException: 503 if the upstream is unavailable (circuit open or
+            rate limited)
         HTTPException: 500 if scraping fails
     """
     if not bus_stop_id:
@@ -111,50 +407,28 @@ async def get_bus_stop_live_info(
             detail="Vous devez spécifier un arrêt de bus"
         )
     
-    logger.info(f"GET /v1/bus_stop/live/{bus_stop_id} - Fetching live data")
+    logger.info("GET /v1/bus_stop/live/%s - Fetching live data", bus_stop_id)
     
     try:
-        headers = {'Accept-Encoding': 'gzip'}
-        page = requests.get(
-            f"https://live.synchro-bus.fr/{bus_stop_id}",
-            headers=headers,
-            timeout=10
+        result = await live_cache.get(bus_stop_id)
+    except UpstreamUnavailableError as e:
+        logger.warning("Live data for %s not fetched: %s", bus_stop_id, e)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Données en temps réel indisponibles: {str(e)}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
         )
-        page.raise_for_status()
-        
-        soup = BeautifulSoup(page.content, "html.parser")
-        bus_passage = soup.find_all("div", class_="nq-c-Direction")
-        
-        next_bus_list: list = []
-        
-        for div in bus_passage:
-            try:
-                next_bus = {
-                    # Bus line identifier
-                    "line": div.find_all("img", class_="img-line")[0]["src"][56],
-                    # Direction name
-                    "direction": div.find_all(
-                        "div", class_="nq-c-Direction-content-detail-location"
-                    )[0].span.text,
-                    # Arrival time
-                    "time": div.find_all(
-                        "div", class_="nq-c-Direction-content-detail-time"
-                    )[0].text,
-                    # Time remaining
-                    "remaining": div.find_all(
-                        "div", class_="nq-c-Direction-content-detail-remaining"
-                    )[0].text[1:]  # Remove first space character
-                }
-                next_bus_list.append(next_bus)
-            except (IndexError, KeyError, AttributeError) as e:
-                logger.warning(f"Error parsing bus passage data: {e}")
-                continue
-        
-        return next_bus_list
-        
-    except requests.RequestException as e:
-        logger.error(f"Error fetching live data for {bus_stop_id}: {e}")
+    except LiveDataError as e:
+        logger.error("Error fetching live data for %s: %s", bus_stop_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la récupération des données en temps réel: {str(e)}"
         )
+    
+    response.headers["X-Cache"] = result.status
+    response.headers["Age"] = str(int(result.age))
+    # Caches subtract Age from max-age, so this expires with our own entry
+    response.headers["Cache-Control"] = (
+        "no-store" if result.status == "FALLBACK" else cache_control(config.LIVE_CACHE_TTL)
+    )
+    return trusted_response(arrival_filter.apply(result.value), response)
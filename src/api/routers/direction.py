@@ -1,34 +1,47 @@
 """Direction routes."""
 from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from api.dependencies import get_db
-from database.Table import Direction, BusDirection, BusStopDirection
+from api.dependencies import get_cached_network, list_page_dependency
+from api.responses import list_page_response, static_json_response
 from models.schemas import DirectionResponse
 from core.logging_config import logger
+from services.network_snapshot import NetworkSnapshot
+from services.pagination import ListPage
 
 router = APIRouter(prefix="/v1/direction", tags=["direction"])
 
 
 @router.get("/", response_model=list[DirectionResponse])
-async def get_all_directions(db: Session = Depends(get_db)):
+async def get_all_directions(
+    request: Request,
+    page: ListPage = Depends(list_page_dependency(int, ("id", "name"))),
+    network: NetworkSnapshot = Depends(get_cached_network)
+):
     """
-    Get all available directions.
+    Get all available directions, or one page of them.
+    
+    With `limit` and/or `cursor`, directions are ordered by id and the
+    `X-Next-Cursor` header (and `Link: rel="next"`) gives the cursor of the
+    next page, absent on the last one. `fields` keeps only some fields.
     
     Returns:
-        list[DirectionResponse]: List of all directions with ID and name
+        list[DirectionResponse]: Directions with ID and name (or the requested fields)
+        
+    Raises:
+        HTTPException: 400 if the cursor is invalid or a field is unknown
     """
     logger.info("GET /v1/direction - Fetching all directions")
-    res = db.execute(select(Direction.id, Direction.name)).fetchall()
-    return [{"id": direction[0], "name": direction[1]} for direction in res]
+    return list_page_response(
+        request, network, ("direction",), network.directions, network.directions_by_id, page
+    )
 
 
 @router.get("/bus", response_model=list[DirectionResponse])
 async def get_directions_by_bus(
+    request: Request,
     bus_id: Union[str, None] = Query(None, description="Bus line identifier"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all directions for a specific bus line.
@@ -48,23 +61,19 @@ async def get_directions_by_bus(
             detail="Vous devez spécifier un bus"
         )
     
-    logger.info(f"GET /v1/direction/bus?bus_id={bus_id}")
+    logger.info("GET /v1/direction/bus?bus_id=%s", bus_id)
     
-    query = select(Direction.id, Direction.name).where(
-        Direction.id.in_(
-            select(BusDirection.direction_id).where(
-                BusDirection.bus_id == bus_id
-            )
-        )
+    return static_json_response(
+        request, network, ("direction.bus", bus_id),
+        network.get_directions_by_bus(bus_id),
     )
-    res = db.execute(query).fetchall()
-    return [{"id": direction[0], "name": direction[1]} for direction in res]
 
 
 @router.get("/bus_stop", response_model=list[DirectionResponse])
 async def get_directions_by_bus_stop(
+    request: Request,
     bus_stop_id: Union[str, None] = Query(None, description="Bus stop identifier"),
-    db: Session = Depends(get_db)
+    network: NetworkSnapshot = Depends(get_cached_network)
 ):
     """
     Get all directions for a specific bus stop.
@@ -84,14 +93,9 @@ async def get_directions_by_bus_stop(
             detail="Vous devez spécifier un arrêt de bus"
         )
     
-    logger.info(f"GET /v1/direction/bus_stop?bus_stop_id={bus_stop_id}")
+    logger.info("GET /v1/direction/bus_stop?bus_stop_id=%s", bus_stop_id)
     
-    query = select(Direction.id, Direction.name).where(
-        Direction.id.in_(
-            select(BusStopDirection.direction_id).where(
-                BusStopDirection.bus_stop_id == bus_stop_id
-            )
-        )
+    return static_json_response(
+        request, network, ("direction.bus_stop", bus_stop_id),
+        network.get_directions_by_bus_stop(bus_stop_id),
     )
-    res = db.execute(query).fetchall()
-    return [{"id": direction[0], "name": direction[1]} for direction in res]
@@ -9,13 +9,128 @@ load_dotenv(dotenv_path=env_path)
 # Database Configuration
 DB_URL = os.getenv("DB_URL", "sqlite:///./database/db.sqlite")
 
+# Database connection pool (one engine per process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+# Load the network and poll its version through an async driver (aiosqlite,
+# asyncpg) when installed, instead of worker threads
+DB_ASYNC = os.getenv("DB_ASYNC", "true").lower() == "true"
+
 # API Configuration
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8080"))
 RELOAD = os.getenv("RELOAD", "false").lower() == "true"
 
+# Upstream Synchro-Bus live website
+SYNCHROBUS_LIVE_URL = os.getenv("SYNCHROBUS_LIVE_URL", "https://live.synchro-bus.fr").rstrip("/")
+
+# Upstream network topology (used by InitDb)
+SYNCHROBUS_LINESSHAPE_URL = os.getenv(
+    "SYNCHROBUS_LINESSHAPE_URL", "https://start.synchro.grandchambery.fr/fr/map/linesshape"
+)
+NETWORK_BUS_LINES = os.getenv("NETWORK_BUS_LINES", "A,B,C,D").split(",")
+# Automatic network refresh (seconds, 0 = only on demand)
+NETWORK_REFRESH_INTERVAL = float(os.getenv("NETWORK_REFRESH_INTERVAL", "0"))
+# Seconds a refresh holds the cross-worker lease before another worker may
+# take over (must exceed the longest refresh)
+NETWORK_REFRESH_LEASE_TTL = float(os.getenv("NETWORK_REFRESH_LEASE_TTL", "300"))
+# How often each worker checks for a new dataset version
+NETWORK_VERSION_POLL_INTERVAL = float(os.getenv("NETWORK_VERSION_POLL_INTERVAL", "10"))
+# Network snapshot written at ingestion and loaded at startup instead of
+# querying the database (empty = always load from the database)
+NETWORK_SNAPSHOT_FILE = os.getenv("NETWORK_SNAPSHOT_FILE", "./database/network.snapshot")
+# Fetch the network from Synchro-Bus when a container starts (InitDb); with
+# false, containers start from an existing snapshot file without fetching
+NETWORK_INGEST_ON_START = os.getenv("NETWORK_INGEST_ON_START", "true").lower() == "true"
+
+# Admin endpoints are disabled unless a token is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# HTTP caching of static network routes (seconds); an ETag lets clients
+# revalidate for free once max-age has passed
+STATIC_CACHE_MAX_AGE = float(os.getenv("STATIC_CACHE_MAX_AGE", "300"))
+STATIC_CACHE_STALE_WHILE_REVALIDATE = float(os.getenv("STATIC_CACHE_STALE_WHILE_REVALIDATE", "86400"))
+# Serialized (and compressed) static responses kept per snapshot version
+STATIC_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("STATIC_RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Largest page of the paginated list endpoints (?limit=)
+LIST_PAGE_MAX_LIMIT = int(os.getenv("LIST_PAGE_MAX_LIMIT", "500"))
+
+# Opt-in fast JSON mode: orjson encoding, and handlers return trusted data
+# without a second response_model validation pass (schemas are unchanged)
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+# Shared async HTTP client
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "true").lower() == "true"
+
+# Time zone of the times shown on the live website
+LIVE_TIMEZONE = os.getenv("LIVE_TIMEZONE", "Europe/Paris")
+
+# Live arrivals cache
+LIVE_CACHE_TTL = float(os.getenv("LIVE_CACHE_TTL", "15"))
+LIVE_CACHE_MAX_ENTRIES = int(os.getenv("LIVE_CACHE_MAX_ENTRIES", "512"))
+# Expired entries are still served this long while refreshed in background
+LIVE_CACHE_STALE_TTL = float(os.getenv("LIVE_CACHE_STALE_TTL", "60"))
+
+# Store shared by workers: memory (none, per process), sqlite (one host) or
+# redis (any Redis-protocol server); one worker fetches a stop, the others
+# wait up to LIVE_CACHE_LOCK_TIMEOUT seconds for its result
+LIVE_CACHE_BACKEND = os.getenv("LIVE_CACHE_BACKEND", "memory").lower()
+LIVE_CACHE_SQLITE_PATH = os.getenv("LIVE_CACHE_SQLITE_PATH", "")
+LIVE_CACHE_REDIS_URL = os.getenv("LIVE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+LIVE_CACHE_LOCK_TIMEOUT = float(os.getenv("LIVE_CACHE_LOCK_TIMEOUT", "5"))
+
+# Last known arrivals are served (flagged FALLBACK) when the upstream fails,
+# up to this age in seconds; 0 disables the fallback
+LIVE_FALLBACK_MAX_AGE = float(os.getenv("LIVE_FALLBACK_MAX_AGE", "600"))
+
+# Protection of the live website: per-request timeout (seconds), circuit
+# breaker (consecutive failures before opening, seconds before a probe) and
+# a global rate limit (requests per second, 0 = unlimited; burst; max wait)
+LIVE_FETCH_TIMEOUT = float(os.getenv("LIVE_FETCH_TIMEOUT", "4"))
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+UPSTREAM_BREAKER_RECOVERY = float(os.getenv("UPSTREAM_BREAKER_RECOVERY", "30"))
+UPSTREAM_RATE_LIMIT = float(os.getenv("UPSTREAM_RATE_LIMIT", "20"))
+UPSTREAM_RATE_BURST = float(os.getenv("UPSTREAM_RATE_BURST", "40"))
+UPSTREAM_RATE_MAX_WAIT = float(os.getenv("UPSTREAM_RATE_MAX_WAIT", "1"))
+
+# Batch live endpoint
+LIVE_BATCH_MAX_STOPS = int(os.getenv("LIVE_BATCH_MAX_STOPS", "20"))
+LIVE_BATCH_CONCURRENCY = int(os.getenv("LIVE_BATCH_CONCURRENCY", "8"))
+
+# Streaming of live arrivals (SSE / WebSocket): seconds between reads of a
+# followed stop, and seconds between SSE keep-alive comments
+LIVE_STREAM_INTERVAL = float(os.getenv("LIVE_STREAM_INTERVAL", "5"))
+LIVE_STREAM_HEARTBEAT = float(os.getenv("LIVE_STREAM_HEARTBEAT", "15"))
+
+# Background prefetch of the most requested stops
+LIVE_PREFETCH_ENABLED = os.getenv("LIVE_PREFETCH_ENABLED", "true").lower() == "true"
+LIVE_PREFETCH_INTERVAL = float(os.getenv("LIVE_PREFETCH_INTERVAL", "5"))
+LIVE_PREFETCH_HOT_STOPS = int(os.getenv("LIVE_PREFETCH_HOT_STOPS", "20"))
+# Max upstream requests the prefetcher may issue per cycle
+LIVE_PREFETCH_BUDGET = int(os.getenv("LIVE_PREFETCH_BUDGET", "10"))
+# Requests a stop needs (counts halve every cycle) before it is prefetched
+LIVE_PREFETCH_MIN_DEMAND = float(os.getenv("LIVE_PREFETCH_MIN_DEMAND", "2"))
+
 # CORS Configuration
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else ["*"]
 
+# Prometheus metrics at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Write logs from a background thread so a slow stdout never delays requests
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"
+# Access log: fraction of requests logged, only 4xx/5xx, and a threshold
+# (milliseconds, 0 = off) above which a request is always logged as slow
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1"))
+ACCESS_LOG_ERRORS_ONLY = os.getenv("ACCESS_LOG_ERRORS_ONLY", "false").lower() == "true"
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
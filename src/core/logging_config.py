@@ -1,10 +1,65 @@
 """Logging configuration for the application."""
+import atexit
 import logging
+import queue
 import sys
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from core import config
 
+_listener: Optional[QueueListener] = None
+# Handlers each logger had before _use_queue(), put back by stop_logging()
+_original_handlers: list[tuple[logging.Logger, list[logging.Handler]]] = []
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    Queue handler for a queue read in the same process.
+    
+    The stock handler formats every record before enqueueing it (so it can
+    be pickled); here records are enqueued as they are and the listener
+    thread formats and writes them, off the request path. Log arguments
+    must therefore not be mutated after the call, which holds for the
+    strings and numbers logged here.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _use_queue(console: logging.Handler, loggers: list[logging.Logger]):
+    """Route loggers through a queue drained by a background thread."""
+    global _listener
+    log_queue = queue.SimpleQueue()
+    handler = _LocalQueueHandler(log_queue)
+    for target in loggers:
+        _original_handlers.append((target, target.handlers))
+        target.handlers = [
+            handler if existing is console else existing for existing in target.handlers
+        ]
+    _listener = QueueListener(log_queue, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """
+    Flush queued records and stop the background log writer.
+
+    Loggers get their console handler back first, so records emitted
+    afterwards (e.g. uvicorn's shutdown messages) are written directly
+    instead of into a queue nobody drains.
+    """
+    global _listener
+    while _original_handlers:
+        target, handlers = _original_handlers.pop()
+        target.handlers = handlers
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logging():
     """Configure logging for the application."""
@@ -53,7 +108,14 @@ def setup_logging():
     }
     
     dictConfig(log_config)
-    return logging.getLogger("app")
+    app_logger = logging.getLogger("app")
+    if config.LOG_QUEUE:
+        # Writing to stdout can block; do it from a background thread
+        console = app_logger.handlers[0]
+        _use_queue(console, [
+            logging.getLogger(name) for name in ("app", "uvicorn", "uvicorn.access", "")
+        ])
+    return app_logger
 
 
 # Create logger instance
@@ -0,0 +1,191 @@
+"""Prometheus metrics, collected in process without extra dependencies.
+
+Counters and histograms are plain Python numbers updated on the hot path
+without locks: the event loop runs handlers one at a time, and the few
+updates made from worker threads (database sessions) only risk losing an
+increment under a rare race, which is acceptable for monitoring. Values
+that already exist elsewhere (cache statistics, pool usage) are read only
+when /metrics is scraped, through collector callbacks.
+"""
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+# Latency buckets (seconds) for HTTP requests and upstream calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Finer buckets for in-process work (parsing, pool checkout)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# A collector returns (name, kind, help, {labels tuple: value}, labelnames)
+Collector = Callable[[], Iterable[tuple[str, str, str, dict, tuple[str, ...]]]]
+
+
+class Registry:
+    """Set of metrics and scrape-time collectors rendered for /metrics."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Collector) -> Collector:
+        """Register a function called on each scrape (usable as a decorator)."""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, kind, documentation, values, labelnames in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(
+                    f"{name}{_labels(labelnames, labels)} {_number(value)}"
+                    for labels, value in values.items()
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "synchrobus_http_requests_total", "HTTP requests by route and status.",
+    ("method", "route", "status"),
+))
+http_request_duration = registry.register(Histogram(
+    "synchrobus_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "synchrobus_http_requests_in_flight", "HTTP requests being processed.",
+))
+http_requests_in_flight.set(value=0)
+upstream_request_duration = registry.register(Histogram(
+    "synchrobus_upstream_request_duration_seconds", "Latency of calls to Synchro-Bus.",
+    ("target",),
+))
+upstream_errors = registry.register(Counter(
+    "synchrobus_upstream_errors_total", "Failed calls to Synchro-Bus by error type.",
+    ("target", "error"),
+))
+upstream_rejected = registry.register(Counter(
+    "synchrobus_upstream_rejected_total",
+    "Calls to Synchro-Bus not made by the circuit breaker or rate limiter.",
+    ("reason",),
+))
+live_parse_duration = registry.register(Histogram(
+    "synchrobus_live_parse_duration_seconds", "Time spent parsing a live page.",
+    buckets=FAST_BUCKETS,
+))
+db_checkout_wait = registry.register(Histogram(
+    "synchrobus_db_checkout_wait_seconds", "Time waiting for a pooled DB connection.",
+    buckets=FAST_BUCKETS,
+))
+
+
+def route_label(scope: dict) -> Optional[str]:
+    """Path template of the matched route (None if no route matched)."""
+    route = scope.get("route")
+    return getattr(route, "path", None)
@@ -1,61 +1,168 @@
 """Middleware for logging, CORS, and security."""
+import itertools
+import logging
+import os
+import random
 import time
-import uuid
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from core import config, metrics
 from core.logging_config import logger
 
+access_logger = logging.getLogger("app.access")
+
+# Request ids are a per-process prefix plus a counter: unique and cheap
+_REQUEST_ID_PREFIX = os.urandom(4).hex()
+_request_ids = itertools.count(1)
+
+# Long-lived responses (SSE): their duration is the connection time, not
+# the latency, so they are neither logged as slow nor timed in the histogram
+_STREAM_MEDIA_TYPES = (b"text/event-stream",)
+
+
+def _is_stream(message: Message) -> bool:
+    """Whether an http.response.start message starts a streamed event response."""
+    for name, value in message.get("headers", ()):
+        if name.lower() == b"content-type":
+            return value.startswith(_STREAM_MEDIA_TYPES)
+    return False
+
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all HTTP requests and responses."""
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware logging HTTP requests.
     
-    async def dispatch(self, request: Request, call_next):
-        """
-        Log request and response details.
-        
-        Args:
-            request: The incoming HTTP request
-            call_next: The next middleware/handler in the chain
-            
-        Returns:
-            Response: The HTTP response
-        """
-        # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        
-        # Start timer
-        start_time = time.time()
+    Every response gets X-Request-ID (the incoming one if the client sent
+    it) and X-Process-Time headers. One access log line is written when the
+    response is complete, with structured fields (request_id, method, path,
+    status, duration_ms, client) passed as `extra` and the message formatted
+    lazily, only if the line is actually emitted:
+    
+    - server errors (5xx) are always logged, as errors
+    - requests slower than slow_ms are always logged, as warnings (except
+      event streams, which stay open by design)
+    - otherwise, with errors_only only 4xx are logged, else a sample_rate
+      fraction of requests is
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = config.ACCESS_LOG_SAMPLE_RATE,
+        errors_only: bool = config.ACCESS_LOG_ERRORS_ONLY,
+        slow_ms: float = config.ACCESS_LOG_SLOW_MS,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.errors_only = errors_only
+        self.slow_ms = slow_ms
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Log request
-        logger.info(
-            f"Request started | "
-            f"ID: {request_id} | "
-            f"Method: {request.method} | "
-            f"Path: {request.url.path} | "
-            f"Client: {request.client.host if request.client else 'unknown'}"
-        )
+        start = time.perf_counter()
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = f"{_REQUEST_ID_PREFIX}-{next(_request_ids):x}"
+        status, stream = 500, False
         
-        # Process request
-        response = await call_next(request)
+        async def send_wrapper(message: Message):
+            nonlocal status, stream
+            if message["type"] == "http.response.start":
+                status, stream = message["status"], _is_stream(message)
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = f"{time.perf_counter() - start:.4f}"
+            await send(message)
         
-        # Calculate processing time
-        process_time = time.time() - start_time
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self._log(scope, request_id, 500, start, stream, exc_info=True)
+            raise
+        self._log(scope, request_id, status, start, stream)
+    
+    def _log(
+        self, scope: Scope, request_id: str, status: int, start: float, stream: bool, exc_info=False
+    ):
+        duration_ms = (time.perf_counter() - start) * 1000
+        if status >= 500:
+            level = logging.ERROR
+        elif self.slow_ms > 0 and duration_ms >= self.slow_ms and not stream:
+            level = logging.WARNING
+        elif self.errors_only:
+            if status < 400:
+                return
+            level = logging.INFO
+        elif self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        else:
+            level = logging.INFO
+        if not access_logger.isEnabledFor(level):
+            return
         
-        # Log response
-        logger.info(
-            f"Request completed | "
-            f"ID: {request_id} | "
-            f"Status: {response.status_code} | "
-            f"Time: {process_time:.4f}s"
+        client = scope.get("client")
+        fields = {
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(duration_ms, 2),
+            "client": client[0] if client else "unknown",
+        }
+        access_logger.log(
+            level,
+            "%s %s %d %.1fms | ID: %s | Client: %s",
+            fields["method"], fields["path"], status, duration_ms, request_id, fields["client"],
+            extra=fields,
+            exc_info=exc_info,
         )
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and in-flight
+    requests per route template (e.g. /v1/bus_stop/live/{bus_stop_id}), so
+    label cardinality stays bounded whatever the ids in the URLs. Event
+    streams are counted but kept out of the latency histogram.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status, stream = 500, False
         
-        # Add custom headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = f"{process_time:.4f}"
+        async def send_wrapper(message: Message):
+            nonlocal status, stream
+            if message["type"] == "http.response.start":
+                status, stream = message["status"], _is_stream(message)
+            await send(message)
         
-        return response
+        metrics.http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.http_requests_in_flight.dec()
+            route = metrics.route_label(scope) or "unmatched"
+            method = scope["method"]
+            metrics.http_requests.inc(method, route, str(status))
+            if not stream:
+                metrics.http_request_duration.observe(time.perf_counter() - start, method, route)
 
 
 def setup_cors(app, allowed_origins: list[str]):
@@ -1,15 +1,251 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import importlib.util
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import delete
 
+from core import metrics
+
+
+# Process-wide engine and session factory, created once by init_engine()
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+
+# Async counterparts, created by init_engine() when an async driver is installed
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+# Async engines replaced by init_engine(), disposed by dispose_engines()
+_retired_async_engines: list[AsyncEngine] = []
+
+# Async driver used for each sync backend (module to import, URL drivername)
+ASYNC_DRIVERS = {
+    "sqlite": ("aiosqlite", "sqlite+aiosqlite"),
+    "postgresql": ("asyncpg", "postgresql+asyncpg"),
+    "mysql": ("aiomysql", "mysql+aiomysql"),
+}
+
+# Checkout wait statistics, updated by timed_session()
+_checkout_stats = {
+    "checkouts": 0,
+    "wait_total": 0.0,
+    "wait_max": 0.0,
+}
+
+
+def init_engine(
+    db_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    use_async: bool = True,
+) -> Engine:
+    """
+    Create the process-wide engine and session factory.
+
+    Calling it again disposes the previous engine first, so it is safe to
+    re-initialize with a different URL (e.g. in scripts); the previous
+    async engine can only be disposed from async code and is kept until
+    dispose_engines(). An async engine on the same database is created too
+    when use_async is set and the backend's async driver (see
+    ASYNC_DRIVERS) is installed.
+
+    Args:
+        db_url: SQLAlchemy database URL
+        pool_size: Number of connections kept open in the pool
+        max_overflow: Extra connections allowed above pool_size
+        pool_timeout: Seconds to wait for a connection before giving up
+        pool_recycle: Recycle connections older than this (seconds, -1 = never)
+        pool_pre_ping: Test connections for liveness on checkout
+        use_async: Also create the async engine if a driver is available
+
+    Returns:
+        Engine: The shared engine
+    """
+    global _engine, _session_factory, _async_engine, _async_session_factory
+
+    if _engine is not None:
+        _engine.dispose()
+    if _async_engine is not None:
+        _retired_async_engines.append(_async_engine)
+    _async_engine = _async_session_factory = None
+
+    engine_kwargs = {
+        "echo": False,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
+    url = make_url(db_url)
+    # In-memory SQLite cannot use a QueuePool (each connection is a new DB)
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        engine_kwargs.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+        )
+    if url.get_backend_name() == "sqlite":
+        # Sessions are handed across threads by FastAPI's threadpool
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+
+    _engine = create_engine(db_url, **engine_kwargs)
+    _session_factory = sessionmaker(bind=_engine)
+
+    async_url = async_database_url(db_url) if use_async else None
+    if async_url is not None:
+        async_kwargs = {key: value for key, value in engine_kwargs.items() if key != "connect_args"}
+        _async_engine = create_async_engine(async_url, **async_kwargs)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _engine
+
+
+def async_database_url(db_url: str) -> Optional[str]:
+    """
+    Return db_url with its backend's async driver, if that driver is installed.
+
+    Args:
+        db_url: Synchronous SQLAlchemy database URL
+
+    Returns:
+        Optional[str]: Async URL (e.g. sqlite+aiosqlite:///...), or None if
+        the backend has no known async driver or it is not installed
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return None  # a second engine would open a different in-memory database
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or importlib.util.find_spec(driver[0]) is None:
+        return None
+    if importlib.util.find_spec("greenlet") is None:
+        return None
+    return url.set(drivername=driver[1]).render_as_string(hide_password=False)
+
+
+def get_engine() -> Engine:
+    """Return the shared engine, creating it from config if needed."""
+    if _engine is None:
+        from core import config
+
+        init_engine(
+            config.DB_URL,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            use_async=config.DB_ASYNC,
+        )
+    return _engine
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    """Return the shared async engine, or None if no async driver is used."""
+    get_engine()
+    return _async_engine
+
+
+async def dispose_engines():
+    """Close every pooled connection of the sync and async engines, including replaced ones."""
+    while _retired_async_engines:
+        await _retired_async_engines.pop().dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+
+def _record_checkout(wait: float):
+    metrics.db_checkout_wait.observe(wait)
+    _checkout_stats["checkouts"] += 1
+    _checkout_stats["wait_total"] += wait
+    if wait > _checkout_stats["wait_max"]:
+        _checkout_stats["wait_max"] = wait
+
+
+def timed_session() -> Session:
+    """
+    Open a session from the shared factory and check out its connection.
+
+    The connection is acquired eagerly so the time spent waiting on the
+    pool can be recorded in the checkout statistics.
+    """
+    get_engine()
+    session = _session_factory()
+    start = time.perf_counter()
+    session.connection()
+    _record_checkout(time.perf_counter() - start)
+    return session
+
+
+@asynccontextmanager
+async def timed_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    Async version of timed_session(), closing the session on exit.
+
+    Raises:
+        RuntimeError: If no async engine is available (see get_async_engine)
+    """
+    if get_async_engine() is None:
+        raise RuntimeError("No async database driver available for this database")
+    session = _async_session_factory()
+    try:
+        start = time.perf_counter()
+        await session.connection()
+        _record_checkout(time.perf_counter() - start)
+        yield session
+    finally:
+        await session.close()
+
+
+def pool_status() -> dict:
+    """
+    Return connection pool usage and checkout wait statistics.
+
+    Returns:
+        dict: Pool size, checked in/out and overflow counts, and the
+        number of checkouts with their mean and max wait (milliseconds)
+    """
+    pool = get_engine().pool
+    checkouts = _checkout_stats["checkouts"]
+    status = {
+        "pool_class": type(pool).__name__,
+        "checkouts": checkouts,
+        "checkout_wait_avg_ms": round(
+            _checkout_stats["wait_total"] / checkouts * 1000, 3
+        ) if checkouts else 0.0,
+        "checkout_wait_max_ms": round(_checkout_stats["wait_max"] * 1000, 3),
+    }
+    for stat in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, stat):
+            status[stat] = getattr(pool, stat)()
+    return status
+
+
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Enable WAL on SQLite so pooled readers don't block each other."""
+    module = type(dbapi_connection).__module__
+    if not module.startswith("sqlite3"):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
 
 
 class APIDatabase:
     """Simple object to manage and queries DB"""
 
-    def __init__(self, db_url):
-        self.engine = create_engine(db_url, echo=False)
-        self.Session = sessionmaker(bind=self.engine)
+    def __init__(self, db_url=None):
+        if db_url is not None and (_engine is None or _engine.url != make_url(db_url)):
+            init_engine(db_url)
+        self.engine = get_engine()
+        self.Session = _session_factory
         self.session = self.Session()
 
     def get_engine(self):
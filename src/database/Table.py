@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -36,6 +36,10 @@ class BusStop(Base):
 
 class BusDirection(Base):
     __tablename__ = "bus_direction"
+    __table_args__ = (
+        Index("uq_bus_direction_bus_id_direction_id", "bus_id", "direction_id", unique=True),
+        Index("ix_bus_direction_direction_id", "direction_id"),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     bus_id = Column("bus_id", String(255), ForeignKey("bus.id"))
@@ -48,6 +52,10 @@ class BusDirection(Base):
 
 class BusStopBus(Base):
     __tablename__ = "bus_stop_bus"
+    __table_args__ = (
+        Index("uq_bus_stop_bus_bus_stop_id_bus_id", "bus_stop_id", "bus_id", unique=True),
+        Index("ix_bus_stop_bus_bus_id", "bus_id"),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     bus_id = Column("bus_id", String(255), ForeignKey("bus.id"))
@@ -60,6 +68,13 @@ class BusStopBus(Base):
 
 class BusStopDirection(Base):
     __tablename__ = "bus_stop_direction"
+    __table_args__ = (
+        Index(
+            "uq_bus_stop_direction_bus_stop_id_direction_id",
+            "bus_stop_id", "direction_id", unique=True,
+        ),
+        Index("ix_bus_stop_direction_direction_id", "direction_id"),
+    )
 
     id = Column("id", Integer, primary_key=True, autoincrement=True)
     bus_stop_id = Column("bus_stop_id", String(255), ForeignKey("bus_stop.id"))
@@ -68,3 +83,37 @@ class BusStopDirection(Base):
     def __init__(self, bus_stop_id, direction_id):
         self.bus_stop_id = bus_stop_id
         self.direction_id = direction_id
+
+
+class DatasetVersion(Base):
+    """Single row counting network data changes, bumped by each refresh."""
+    __tablename__ = "dataset_version"
+
+    id = Column("id", Integer, primary_key=True)
+    version = Column("version", Integer, nullable=False)
+    updated_at = Column("updated_at", DateTime)
+
+    def __init__(self, id, version, updated_at=None):
+        self.id = id
+        self.version = version
+        self.updated_at = updated_at
+
+
+class NetworkRefreshLease(Base):
+    """
+    Single row electing the worker that refreshes the network.
+
+    Times are Unix timestamps (time.time()), comparable across hosts.
+    """
+    __tablename__ = "network_refresh_lease"
+
+    id = Column("id", Integer, primary_key=True)
+    owner = Column("owner", String(64))
+    expires_at = Column("expires_at", Float, nullable=False)
+    refreshed_at = Column("refreshed_at", Float, nullable=False)
+
+    def __init__(self, id, owner=None, expires_at=0.0, refreshed_at=0.0):
+        self.id = id
+        self.owner = owner
+        self.expires_at = expires_at
+        self.refreshed_at = refreshed_at
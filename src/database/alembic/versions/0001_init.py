@@ -0,0 +1,77 @@
+"""init
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-23 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "bus",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "bus_stop",
+        sa.Column("id", sa.String(length=255), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "direction",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_table(
+        "bus_direction",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("bus_id", sa.String(length=255), nullable=True),
+        sa.Column("direction_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["bus_id"], ["bus.id"]),
+        sa.ForeignKeyConstraint(["direction_id"], ["direction.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "bus_stop_bus",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("bus_id", sa.String(length=255), nullable=True),
+        sa.Column("bus_stop_id", sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(["bus_id"], ["bus.id"]),
+        sa.ForeignKeyConstraint(["bus_stop_id"], ["bus_stop.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "bus_stop_direction",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("bus_stop_id", sa.String(length=255), nullable=True),
+        sa.Column("direction_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["bus_stop_id"], ["bus_stop.id"]),
+        sa.ForeignKeyConstraint(["direction_id"], ["direction.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("bus_stop_direction")
+    op.drop_table("bus_stop_bus")
+    op.drop_table("bus_direction")
+    op.drop_table("direction")
+    op.drop_table("bus_stop")
+    op.drop_table("bus")
@@ -0,0 +1,60 @@
+"""junction table indexes
+
+Adds unique indexes on the natural keys of the junction tables and
+reverse-lookup indexes on their other column, so lookups by either side
+stop scanning the whole table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-24 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, unique index, natural key, reverse index, reverse column)
+JUNCTION_INDEXES = [
+    (
+        "bus_direction",
+        "uq_bus_direction_bus_id_direction_id", ["bus_id", "direction_id"],
+        "ix_bus_direction_direction_id", "direction_id",
+    ),
+    (
+        "bus_stop_bus",
+        "uq_bus_stop_bus_bus_stop_id_bus_id", ["bus_stop_id", "bus_id"],
+        "ix_bus_stop_bus_bus_id", "bus_id",
+    ),
+    (
+        "bus_stop_direction",
+        "uq_bus_stop_direction_bus_stop_id_direction_id", ["bus_stop_id", "direction_id"],
+        "ix_bus_stop_direction_direction_id", "direction_id",
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, unique_index, natural_key, reverse_index, reverse_column in JUNCTION_INDEXES:
+        # Keep the first row of any duplicate so the unique index can be built
+        columns = ", ".join(natural_key)
+        op.execute(
+            f"DELETE FROM {table} WHERE id NOT IN "
+            f"(SELECT MIN(id) FROM {table} GROUP BY {columns})"
+        )
+        op.create_index(unique_index, table, natural_key, unique=True)
+        op.create_index(reverse_index, table, [reverse_column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, unique_index, _, reverse_index, _ in JUNCTION_INDEXES:
+        op.drop_index(reverse_index, table_name=table)
+        op.drop_index(unique_index, table_name=table)
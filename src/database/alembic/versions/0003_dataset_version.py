@@ -0,0 +1,38 @@
+"""dataset version
+
+Adds the single-row dataset_version table that network refreshes bump, so
+API workers can tell when to reload their in-memory snapshot.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-25 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dataset_version = op.create_table(
+        "dataset_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(dataset_version, [{"id": 1, "version": 0, "updated_at": None}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("dataset_version")
@@ -0,0 +1,42 @@
+"""network refresh lease
+
+Adds the single-row network_refresh_lease table, so that only one worker
+across all processes and hosts refreshes the network at a time, and a
+scheduled refresh is skipped when another worker just ran one.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-26 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    network_refresh_lease = op.create_table(
+        "network_refresh_lease",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner", sa.String(length=64), nullable=True),
+        sa.Column("expires_at", sa.Float(), nullable=False),
+        sa.Column("refreshed_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(
+        network_refresh_lease, [{"id": 1, "owner": None, "expires_at": 0.0, "refreshed_at": 0.0}]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("network_refresh_lease")
@@ -1,11 +1,31 @@
 """Main FastAPI application with improved structure."""
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.responses import RedirectResponse
 
-from core import config
-from core.logging_config import logger
-from core.middleware import LoggingMiddleware, setup_cors
-from api.routers import bus, direction, bus_stop, apple_shortcuts
+from core import config, metrics
+from core.logging_config import logger, stop_logging
+from core.middleware import LoggingMiddleware, MetricsMiddleware, setup_cors
+from api.responses import FastJSONResponse
+from api.routers import admin, bus, direction, bus_stop, apple_shortcuts
+from services.http_client import close_http_client, start_http_client
+from services.live_cache import live_cache
+from services.live_stream import live_hub
+from services.network_refresh import NetworkRefreshScheduler
+from services.network_snapshot import (
+    SnapshotWatcher,
+    get_snapshot,
+    load_snapshot_file,
+    reload_snapshot_async,
+    save_snapshot_file,
+)
+from services.prefetcher import live_prefetcher
+from services.static_responses import static_responses
+from services.upstream_guard import live_breaker, upstream_status
 
 # Description for API documentation
 description = """
@@ -34,8 +54,22 @@ tags_metadata = [
         "name": "apple_shortcuts",
         "description": "Endpoints compatibles Apple Shortcuts (format dict au lieu de list).",
     },
+    {
+        "name": "admin",
+        "description": "Administration (rafraîchissement du réseau). Nécessite ADMIN_TOKEN.",
+    },
 ]
 
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources before serving, and release them on shutdown."""
+    await startup()
+    yield
+    await shutdown()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="SynchroBus API",
@@ -44,6 +78,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if config.FAST_JSON else JSONResponse,
     contact={
         "name": "SynchroBus API",
         "url": "https://github.com/leodbrs/synchrobus-api",
@@ -56,11 +92,25 @@ setup_cors(app, config.CORS_ORIGINS)
 # Add logging middleware
 app.add_middleware(LoggingMiddleware)
 
+# Record request metrics (outermost, so logging time is included)
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(bus.router)
 app.include_router(direction.router)
 app.include_router(bus_stop.router)
 app.include_router(apple_shortcuts.router)
+app.include_router(admin.router)
+
+snapshot_watcher = SnapshotWatcher(config.NETWORK_VERSION_POLL_INTERVAL)
+network_refresh_scheduler = NetworkRefreshScheduler(config.NETWORK_REFRESH_INTERVAL)
+
+# Startup work finished in the background: the HTTP client, and the database
+# engines when the network snapshot came from its file (see startup)
+_database_task: Optional[asyncio.Task] = None
+_http_client_task: Optional[asyncio.Task] = None
+_database_started = False
 
 logger.info("All routers registered successfully")
 
@@ -82,9 +132,207 @@ async def health_check():
     return {"status": "healthy", "version": "2.0.0"}
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Log application startup."""
+@app.get("/health/db")
+async def database_pool_status():
+    """
+    Database connection pool statistics.
+    
+    Returns:
+        dict: Pool usage (checked in/out, overflow) and checkout wait times
+        
+    Raises:
+        HTTPException: 503 while the database is still starting
+    """
+    if not _database_started:
+        raise HTTPException(status_code=503, detail="Base de données en cours de démarrage")
+    from database.Database import pool_status
+
+    return pool_status()
+
+
+@app.get("/health/cache")
+async def live_cache_status():
+    """
+    Live arrivals cache statistics.
+    
+    Returns:
+        dict: Entry count, hits, misses, coalesced misses, evictions,
+        prefetcher counters, streaming subscriptions and pre-rendered
+        static responses
+    """
+    return {
+        **live_cache.stats(),
+        "prefetched": live_prefetcher.refreshed,
+        "prefetch_failures": live_prefetcher.failed,
+        "streams": live_hub.stats(),
+        "static_responses": static_responses.stats(),
+    }
+
+
+@app.get("/health/upstream")
+async def upstream_guard_status():
+    """
+    Synchro-Bus circuit breaker and rate limiter state.
+    
+    Returns:
+        dict: Circuit state (closed/open/half_open), consecutive failures,
+        seconds before the next probe, and rate limiter tokens; both with
+        their count of rejected calls
+    """
+    return upstream_status()
+
+
+@metrics.registry.collector
+def _service_metrics():
+    """Cache, prefetcher, stream, circuit, pool and snapshot values read at scrape time."""
+    cache = live_cache.stats()
+    yield (
+        "synchrobus_live_cache_lookups_total", "counter", "Live cache lookups by result.",
+        {
+            ("hit",): cache["hits"], ("stale",): cache["stale_hits"],
+            ("miss",): cache["misses"], ("fallback",): cache["fallbacks"],
+        },
+        ("result",),
+    )
+    yield (
+        "synchrobus_live_cache_coalesced_total", "counter",
+        "Misses that joined a fetch already in progress.", {(): cache["coalesced"]}, (),
+    )
+    yield (
+        "synchrobus_live_cache_shared_total", "counter",
+        "Local misses by shared backend outcome (memory backend: always 0).",
+        {
+            ("hit",): cache["shared_hits"], ("waited",): cache["shared_waits"],
+            ("error",): cache["backend_errors"],
+        },
+        ("outcome",),
+    )
+    yield (
+        "synchrobus_live_cache_evictions_total", "counter",
+        "Live cache entries evicted (LRU).", {(): cache["evictions"]}, (),
+    )
+    yield (
+        "synchrobus_live_cache_entries", "gauge", "Stops held in the live cache.",
+        {(): cache["entries"]}, (),
+    )
+    yield (
+        "synchrobus_live_prefetch_total", "counter", "Background refreshes by outcome.",
+        {("ok",): live_prefetcher.refreshed, ("failed",): live_prefetcher.failed},
+        ("outcome",),
+    )
+    streams = live_hub.stats()
+    yield (
+        "synchrobus_live_stream_subscribers", "gauge", "Connected streaming clients.",
+        {(): streams["subscribers"]}, (),
+    )
+    yield (
+        "synchrobus_live_stream_stops", "gauge", "Stops polled for streaming clients.",
+        {(): streams["stops"]}, (),
+    )
+    yield (
+        "synchrobus_static_response_renders_total", "counter",
+        "Static response bodies serialized and compressed.",
+        {(): static_responses.stats()["renders"]}, (),
+    )
+    yield (
+        "synchrobus_upstream_circuit_state", "gauge",
+        "Synchro-Bus circuit breaker state (1 for the current state).",
+        {(state,): int(state == live_breaker.state) for state in ("closed", "open", "half_open")},
+        ("state",),
+    )
+    if _database_started:
+        from database.Database import pool_status
+
+        pool = pool_status()
+        yield (
+            "synchrobus_db_pool_connections", "gauge", "Database pool connections by state.",
+            {
+                (state,): max(0, pool[stat])  # SQLAlchemy reports unused overflow as negative
+                for state, stat in (("idle", "checkedin"), ("in_use", "checkedout"), ("overflow", "overflow"))
+                if stat in pool
+            },
+            ("state",),
+        )
+    yield (
+        "synchrobus_network_dataset_version", "gauge", "Dataset version being served.",
+        {(): get_snapshot().dataset_version}, (),
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Metrics in Prometheus text format."""
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _init_database() -> bool:
+    """Create the database engines; return whether the async one is used."""
+    from database.Database import get_async_engine, init_engine
+
+    init_engine(
+        config.DB_URL,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        use_async=config.DB_ASYNC,
+    )
+    return get_async_engine() is not None
+
+
+async def _start_database(snapshot_from_file: bool):
+    """Create the engines, make sure the snapshot is current and watch for new versions."""
+    global _database_started
+    # SQLAlchemy takes a few hundred milliseconds to import: not on the event loop
+    use_async = await asyncio.to_thread(_init_database)
+    _database_started = True
+    logger.info(
+        f"DB pool: size={config.DB_POOL_SIZE}, overflow={config.DB_MAX_OVERFLOW}, "
+        f"async={'on' if use_async else 'off (worker threads)'}"
+    )
+    if snapshot_from_file:
+        # The file may predate the last refresh made by another host
+        try:
+            await snapshot_watcher.check()
+        except Exception as e:
+            logger.error(f"Dataset version check failed: {e}")
+    else:
+        snapshot = await reload_snapshot_async()
+        await asyncio.to_thread(save_snapshot_file, snapshot)
+    snapshot_watcher.start()
+    if config.NETWORK_REFRESH_INTERVAL > 0:
+        network_refresh_scheduler.start()
+
+
+def _log_task_failure(task: asyncio.Task):
+    """Log a background startup task's exception as soon as it fails."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background startup failed (%s)", task.get_name(), exc_info=task.exception())
+
+
+def _start_in_background(coroutine, name: str) -> asyncio.Task:
+    task = asyncio.get_running_loop().create_task(coroutine, name=name)
+    task.add_done_callback(_log_task_failure)
+    return task
+
+
+async def startup():
+    """Create shared resources and log application startup."""
+    global _database_task, _http_client_task
+    # Opened in the background; the first live request waits for it if needed
+    _http_client_task = _start_in_background(start_http_client(), "HTTP client")
+    if load_snapshot_file() is not None:
+        # Ready to serve now; the database comes up in the background
+        _database_task = _start_in_background(_start_database(True), "database")
+    else:
+        await _start_database(False)
+    if config.LIVE_PREFETCH_ENABLED:
+        live_prefetcher.start()
     logger.info("=" * 50)
     logger.info("SynchroBus API starting up...")
     logger.info(f"Environment: {config.LOG_LEVEL}")
@@ -92,7 +340,22 @@ async def startup_event():
     logger.info("=" * 50)
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Log application shutdown."""
+async def shutdown():
+    """Release shared resources and log application shutdown."""
     logger.info("SynchroBus API shutting down...")
+    # Failures were logged when they happened (see _log_task_failure)
+    await asyncio.gather(
+        *(task for task in (_database_task, _http_client_task) if task is not None),
+        return_exceptions=True,
+    )
+    await network_refresh_scheduler.stop()
+    await snapshot_watcher.stop()
+    await live_prefetcher.stop()
+    await live_hub.stop()
+    await live_cache.close()
+    await close_http_client()
+    if _database_started:
+        from database.Database import dispose_engines
+
+        await dispose_engines()
+    stop_logging()
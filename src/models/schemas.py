@@ -1,4 +1,5 @@
 """Pydantic schemas for API request/response validation."""
+from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 
@@ -47,6 +48,23 @@ class BusStopResponse(BusStopBase):
     )
 
 
+class BusStopSuggestion(BusStopBase):
+    """Schema for a typeahead suggestion, with its lines and directions."""
+    lines: list[str] = Field(..., description="Bus lines serving the stop")
+    directions: list[DirectionResponse] = Field(..., description="Directions serving the stop")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "id": "UJACO1",
+                "name": "Université Jacob",
+                "lines": ["A", "C"],
+                "directions": [{"id": 2, "name": "Université jacob"}]
+            }
+        }
+    )
+
+
 # ============================================================================
 # Apple Shortcuts Schemas (dict format)
 # ============================================================================
@@ -63,6 +81,8 @@ class BusLiveInfoResponse(BaseModel):
     direction: str = Field(..., description="Destination direction")
     time: str = Field(..., description="Arrival time (HH:MM)")
     remaining: str = Field(..., description="Time remaining (e.g., 'dans 5 minutes')")
+    minutes: Optional[int] = Field(None, description="Minutes until departure, as of the response")
+    departure: Optional[datetime] = Field(None, description="Departure time (ISO 8601, local time zone)")
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -70,12 +90,58 @@ class BusLiveInfoResponse(BaseModel):
                 "line": "A",
                 "direction": "Université Jacob",
                 "time": "20:26",
-                "remaining": "dans 2 minutes"
+                "remaining": "dans 2 minutes",
+                "minutes": 2,
+                "departure": "2025-01-15T20:26:00+01:00"
+            }
+        }
+    )
+
+
+class BusLiveBatchEntry(BaseModel):
+    """Live arrivals of one stop within a batch response."""
+    arrivals: Optional[list[BusLiveInfoResponse]] = Field(
+        None, description="Upcoming arrivals, absent if the stop failed"
+    )
+    cache: Optional[str] = Field(None, description="Cache status (HIT, STALE, MISS, FALLBACK)")
+    age: Optional[int] = Field(None, description="Seconds since the data was fetched")
+    error: Optional[str] = Field(None, description="Error message if the stop failed")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "arrivals": [
+                    {
+                        "line": "A",
+                        "direction": "Université Jacob",
+                        "time": "20:26",
+                        "remaining": "dans 2 minutes",
+                        "minutes": 2,
+                        "departure": "2025-01-15T20:26:00+01:00"
+                    }
+                ],
+                "cache": "HIT",
+                "age": 4,
+                "error": None
             }
         }
     )
 
 
+# ============================================================================
+# Admin Schemas
+# ============================================================================
+
+class NetworkRefreshResponse(BaseModel):
+    """Result of a network refresh."""
+    version: int = Field(..., description="Dataset version after the refresh")
+    changed: bool = Field(..., description="Whether any row changed")
+    inserted: dict[str, int] = Field(..., description="Inserted rows per table")
+    deleted: dict[str, int] = Field(..., description="Deleted rows per table")
+    renamed_bus_stops: int = Field(..., description="Bus stops whose name changed")
+    timings: dict[str, float] = Field(..., description="Phase durations in seconds")
+
+
 # ============================================================================
 # Query Parameters Schemas
 # ============================================================================
@@ -0,0 +1,75 @@
+"""Server-side selection of live arrivals (line, direction, horizon, count)."""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from services.search_index import normalize
+
+
+def minutes_until(departure: Optional[str], now: datetime) -> Optional[int]:
+    """Whole minutes from now until an ISO 8601 departure (0 once due)."""
+    if departure is None:
+        return None
+    return max(0, round((datetime.fromisoformat(departure) - now).total_seconds() / 60))
+
+
+def with_minutes(arrivals: list[dict], now: Optional[datetime] = None) -> list[dict]:
+    """
+    Copy arrivals with their minutes until departure as of now.
+
+    Cached arrivals only hold their departure: the countdown is computed
+    when serving, so STALE and FALLBACK entries stay accurate.
+
+    Args:
+        arrivals: Arrivals as cached (see parse_live_page)
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        list[dict]: The arrivals, each with a "minutes" field
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return [{**arrival, "minutes": minutes_until(arrival.get("departure"), now)} for arrival in arrivals]
+
+
+@dataclass(frozen=True)
+class ArrivalFilter:
+    """
+    Criteria applied to the cached arrivals of a stop.
+
+    The cache always holds every arrival of a stop, so all filter variants
+    share one entry (and one upstream request); filtering happens per
+    response, on the minutes until departure as of the response.
+
+    Attributes:
+        lines: Lines to keep (empty keeps every line)
+        direction: Normalized direction name to keep (see normalize)
+        max_minutes: Keep arrivals due within this many minutes
+        limit: Keep at most this many arrivals
+    """
+    lines: frozenset[str] = frozenset()
+    direction: Optional[str] = None
+    max_minutes: Optional[int] = None
+    limit: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return not self.lines and self.direction is None and self.max_minutes is None and self.limit is None
+
+    def matches(self, arrival: dict) -> bool:
+        if self.lines and arrival["line"] not in self.lines:
+            return False
+        if self.direction is not None and normalize(arrival["direction"]) != self.direction:
+            return False
+        if self.max_minutes is not None:
+            minutes = arrival.get("minutes")
+            if minutes is None or minutes > self.max_minutes:
+                return False
+        return True
+
+    def apply(self, arrivals: list[dict], now: Optional[datetime] = None) -> list[dict]:
+        """Return the matching arrivals with their minutes (see with_minutes), in page order, up to limit."""
+        arrivals = with_minutes(arrivals, now)
+        if self.is_empty():
+            return arrivals
+        selected = [arrival for arrival in arrivals if self.matches(arrival)]
+        return selected if self.limit is None else selected[:self.limit]
@@ -0,0 +1,304 @@
+"""Shared stores for live arrivals, so several workers scrape a stop once.
+
+The live cache keeps its in-process LRU in front of these backends: a local
+miss first looks in the shared store, and only the worker holding the
+stop's lock fetches it upstream while the others wait for its result.
+
+Backends:
+    sqlite  a SQLite file, for workers on one host
+    redis   any server speaking the Redis protocol (RESP), for several hosts
+
+Entries carry wall-clock fetch times (time.time()) since monotonic clocks
+are not comparable between processes.
+"""
+import asyncio
+import json
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlparse
+
+from core import config
+from core.logging_config import logger
+
+
+class CacheBackendError(Exception):
+    """Raised when the shared store cannot be reached, answers an error or holds an unreadable entry."""
+
+
+class LiveCacheBackend:
+    """
+    Interface of a shared live cache store.
+
+    Values are JSON-serializable; locks are advisory, expire after their
+    ttl, and are identified by a token so only their owner releases them.
+    """
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[tuple[list[dict], float]]:
+        """Return (value, fetched_at wall-clock time), or None if absent."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: list[dict], fetched_at: float, ttl: float):
+        """Store a value for ttl seconds."""
+        raise NotImplementedError
+
+    async def acquire(self, key: str, ttl: float) -> Optional[str]:
+        """Take the lock of key; return its token, or None if it is held."""
+        raise NotImplementedError
+
+    async def release(self, key: str, token: str):
+        """Release a lock taken with acquire()."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections."""
+
+
+class SQLiteBackend(LiveCacheBackend):
+    """
+    Shared store in a SQLite file (WAL), for the workers of one host.
+
+    Statements run in worker threads over one connection per process.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS live_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS live_cache_lock ("
+                "key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        self._writes = 0
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> sqlite3.Cursor:
+        try:
+            with self._lock:
+                return self._connection.execute(sql, parameters)
+        except sqlite3.Error as e:
+            raise CacheBackendError(f"SQLite cache: {e}") from e
+
+    def _fetchone(self, sql: str, parameters: tuple = ()) -> Optional[tuple]:
+        """Run a query and read its first row under the lock, in one call."""
+        try:
+            with self._lock:
+                return self._connection.execute(sql, parameters).fetchone()
+        except sqlite3.Error as e:
+            raise CacheBackendError(f"SQLite cache: {e}") from e
+
+    async def get(self, key: str) -> Optional[tuple[list[dict], float]]:
+        row = await asyncio.to_thread(
+            self._fetchone,
+            "SELECT value, fetched_at FROM live_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        )
+        if row is None:
+            return None
+        return _decode(row[0], f"SQLite cache entry {key}"), row[1]
+
+    async def set(self, key: str, value: list[dict], fetched_at: float, ttl: float):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO live_cache VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), fetched_at, time.time() + ttl),
+        )
+        self._writes += 1
+        if self._writes % 500 == 0:
+            await asyncio.to_thread(
+                self._execute, "DELETE FROM live_cache WHERE expires_at < ?", (time.time(),)
+            )
+
+    async def acquire(self, key: str, ttl: float) -> Optional[str]:
+        token, now = secrets.token_hex(8), time.time()
+        cursor = await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO live_cache_lock VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE "
+            "SET token = excluded.token, expires_at = excluded.expires_at "
+            "WHERE live_cache_lock.expires_at < ?",
+            (key, token, now + ttl, now),
+        )
+        return token if cursor.rowcount == 1 else None
+
+    async def release(self, key: str, token: str):
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM live_cache_lock WHERE key = ? AND token = ?", (key, token)
+        )
+
+    async def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class RedisBackend(LiveCacheBackend):
+    """
+    Shared store on a Redis-protocol server (Redis, Valkey, KeyDB, ...).
+
+    Speaks RESP directly over one connection per process (commands are
+    serialized), using only GET, SET (NX, PX), DEL, AUTH and SELECT, so a
+    minimal stand-in server can replace Redis in tests.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "synchrobus:live:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.prefix = prefix
+        self._streams: Optional[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=config.HTTP_CONNECT_TIMEOUT
+        )
+        self._streams = (reader, writer)
+        if self.password:
+            credentials = (self.username, self.password) if self.username else (self.password,)
+            await self._roundtrip("AUTH", *credentials)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+        return reader, writer
+
+    async def _roundtrip(self, *args: str):
+        reader, writer = self._streams
+        command = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode()
+            command.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        writer.write(b"".join(command))
+        await writer.drain()
+        return await _read_reply(reader)
+
+    async def command(self, *args: str):
+        """
+        Send one command and return its reply.
+
+        Raises:
+            CacheBackendError: On connection errors or error replies
+        """
+        async with self._lock:
+            try:
+                if self._streams is None:
+                    await self._connect()
+                return await asyncio.wait_for(self._roundtrip(*args), timeout=config.HTTP_CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                await self._disconnect()
+                raise CacheBackendError(f"Redis cache at {self.host}:{self.port}: {e!r}") from e
+
+    async def _disconnect(self):
+        if self._streams is not None:
+            self._streams[1].close()
+            self._streams = None
+
+    async def get(self, key: str) -> Optional[tuple[list[dict], float]]:
+        data = await self.command("GET", self.prefix + key)
+        if data is None:
+            return None
+        entry = _decode(data, f"Redis cache entry {key}")
+        try:
+            return entry["value"], entry["fetched_at"]
+        except (KeyError, TypeError) as e:
+            raise CacheBackendError(f"Redis cache entry {key}: missing {e}") from e
+
+    async def set(self, key: str, value: list[dict], fetched_at: float, ttl: float):
+        data = json.dumps({"value": value, "fetched_at": fetched_at}, ensure_ascii=False)
+        await self.command("SET", self.prefix + key, data, "PX", str(max(1, int(ttl * 1000))))
+
+    async def acquire(self, key: str, ttl: float) -> Optional[str]:
+        token = secrets.token_hex(8)
+        reply = await self.command(
+            "SET", f"{self.prefix}lock:{key}", token, "NX", "PX", str(max(1, int(ttl * 1000)))
+        )
+        return token if reply == "OK" else None
+
+    async def release(self, key: str, token: str):
+        # GET then DEL is not atomic, but the lock expires anyway if a
+        # slow owner's release races with a new owner
+        lock_key = f"{self.prefix}lock:{key}"
+        if await self.command("GET", lock_key) == token:
+            await self.command("DEL", lock_key)
+
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
+
+
+def _decode(data: str, source: str):
+    """
+    Parse a stored JSON document.
+
+    Raises:
+        CacheBackendError: If it is not valid JSON (e.g. written by another
+        version, or truncated)
+    """
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise CacheBackendError(f"{source}: {e}") from e
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    """Read one RESP2 reply."""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise asyncio.IncompleteReadError(line, None)
+    kind, payload = line[:1], line[1:-2].decode()
+    if kind == b"+":
+        return payload
+    if kind == b"-":
+        raise CacheBackendError(f"Redis error: {payload}")
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2].decode()
+    if kind == b"*":
+        count = int(payload)
+        return None if count < 0 else [await _read_reply(reader) for _ in range(count)]
+    raise CacheBackendError(f"Unexpected Redis reply: {line!r}")
+
+
+def create_backend(name: str) -> Optional[LiveCacheBackend]:
+    """
+    Build the shared backend named by LIVE_CACHE_BACKEND.
+
+    Args:
+        name: "memory" (no shared store), "sqlite" or "redis"
+
+    Returns:
+        Optional[LiveCacheBackend]: The backend, None for "memory"
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "memory":
+        return None
+    if name == "sqlite":
+        path = config.LIVE_CACHE_SQLITE_PATH or str(Path(tempfile.gettempdir()) / "synchrobus_live_cache.sqlite")
+        logger.info(f"Live cache shared through SQLite file {path}")
+        return SQLiteBackend(path)
+    if name == "redis":
+        logger.info(f"Live cache shared through Redis at {config.LIVE_CACHE_REDIS_URL}")
+        return RedisBackend(config.LIVE_CACHE_REDIS_URL)
+    raise ValueError(f"Unknown LIVE_CACHE_BACKEND: {name!r} (expected memory, sqlite or redis)")
@@ -0,0 +1,89 @@
+"""Application-lifetime async HTTP client for upstream Synchro-Bus calls."""
+import asyncio
+from typing import Optional
+
+import httpx
+
+from core import config
+from core.logging_config import logger
+
+_client: Optional[httpx.AsyncClient] = None
+_opening: Optional[asyncio.Task] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """
+    Open the shared client (called from the startup hook).
+
+    The client is built in a worker thread, as loading the TLS certificate
+    bundle takes a noticeable part of startup; the startup hook may run
+    this in the background, get_http_client() then waits for it.
+
+    Returns:
+        httpx.AsyncClient: Client with keep-alive and connection limits
+    """
+    global _opening
+    if _client is not None:
+        return _client
+    if _opening is None:
+        _opening = asyncio.get_running_loop().create_task(_open())
+    return await asyncio.shield(_opening)
+
+
+async def _open() -> httpx.AsyncClient:
+    global _client
+    use_http2 = config.HTTP_HTTP2 and _http2_available()
+    _client = await asyncio.to_thread(_build_client, use_http2)
+    logger.info(
+        f"HTTP client started (http2={use_http2}, "
+        f"max_connections={config.HTTP_MAX_CONNECTIONS})"
+    )
+    return _client
+
+
+def _build_client(use_http2: bool) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=use_http2,
+        timeout=httpx.Timeout(config.HTTP_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+
+async def close_http_client():
+    """Close the shared client (called from the shutdown hook)."""
+    global _client, _opening
+    if _opening is not None:
+        await asyncio.gather(_opening, return_exceptions=True)
+        _opening = None
+    if _client is None:
+        return
+    await _client.aclose()
+    _client = None
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, waiting for it if it is still being opened.
+
+    Raises:
+        RuntimeError: If the client has not been started
+    """
+    if _client is not None:
+        return _client
+    if _opening is None:
+        raise RuntimeError("HTTP client is not started")
+    return await asyncio.shield(_opening)
@@ -0,0 +1,362 @@
+"""Import of the static bus network from the Synchro-Bus linesshape API.
+
+The import runs in three timed phases:
+    fetch      every line's shape is downloaded concurrently
+    transform  entities and links are deduplicated in memory
+    write      the difference with the current rows is applied (bulk
+               inserts and deletes) in a single transaction that also
+               bumps the dataset version
+
+The same pipeline serves the first import (everything is an insert) and
+incremental refreshes of a live database.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from core import config, metrics
+from database.Table import (
+    Bus,
+    BusDirection,
+    BusStop,
+    BusStopBus,
+    BusStopDirection,
+    DatasetVersion,
+    Direction,
+)
+from services.network_snapshot import read_dataset_version
+
+# INSERT skipping rows that already exist, per dialect; other dialects use
+# a plain INSERT (the diff only holds missing rows, and refreshes are
+# serialized by the refresh lease)
+_INSERTS = {
+    "sqlite": lambda table: sqlite.insert(table).on_conflict_do_nothing(),
+    "postgresql": lambda table: postgresql.insert(table).on_conflict_do_nothing(),
+    "mysql": lambda table: insert(table).prefix_with("IGNORE"),
+}
+
+
+@dataclass
+class NetworkData:
+    """Deduplicated network, with links expressed by natural keys."""
+    buses: list[str] = field(default_factory=list)
+    directions: list[str] = field(default_factory=list)
+    bus_stops: dict[str, str] = field(default_factory=dict)
+    bus_directions: list[tuple[str, str]] = field(default_factory=list)
+    bus_stop_buses: list[tuple[str, str]] = field(default_factory=list)
+    bus_stop_directions: list[tuple[str, str]] = field(default_factory=list)
+
+
+async def fetch_lines(bus_list: list[str]) -> dict[str, list[dict]]:
+    """
+    Download the shape of every line concurrently.
+
+    Args:
+        bus_list: Bus line identifiers (e.g., ["A", "B", "C", "D"])
+
+    Returns:
+        dict: Line identifier to its list of directions with stop points
+
+    Raises:
+        httpx.HTTPError: If any line cannot be fetched
+    """
+    async with httpx.AsyncClient(timeout=config.HTTP_TIMEOUT) as client:
+
+        async def fetch_line(bus: str) -> list[dict]:
+            start = time.perf_counter()
+            try:
+                response = await client.get(config.SYNCHROBUS_LINESSHAPE_URL, params={"line": bus})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                metrics.upstream_errors.inc("linesshape", type(e).__name__)
+                raise
+            finally:
+                metrics.upstream_request_duration.observe(
+                    time.perf_counter() - start, "linesshape"
+                )
+            return response.json()[bus]
+
+        shapes = await asyncio.gather(*(fetch_line(bus) for bus in bus_list))
+    return dict(zip(bus_list, shapes))
+
+
+def transform(lines: dict[str, list[dict]]) -> NetworkData:
+    """
+    Deduplicate lines, directions, stops and their links.
+
+    Order of first appearance is kept; a stop served by several lines keeps
+    the first name seen.
+
+    Args:
+        lines: Output of fetch_lines
+
+    Returns:
+        NetworkData: Unique entities and links
+    """
+    data = NetworkData()
+    directions, bus_directions, bus_stop_buses, bus_stop_directions = {}, {}, {}, {}
+
+    for bus, shape in lines.items():
+        data.buses.append(bus)
+        for direction in shape:
+            direction_name = direction["display"].capitalize()
+            directions.setdefault(direction_name, None)
+            bus_directions.setdefault((bus, direction_name), None)
+
+            for bus_stop in direction["stopPoints"]:
+                data.bus_stops.setdefault(bus_stop["id"], bus_stop["name"])
+                bus_stop_buses.setdefault((bus_stop["id"], bus), None)
+                bus_stop_directions.setdefault((bus_stop["id"], direction_name), None)
+
+    data.directions = list(directions)
+    data.bus_directions = list(bus_directions)
+    data.bus_stop_buses = list(bus_stop_buses)
+    data.bus_stop_directions = list(bus_stop_directions)
+    return data
+
+
+def direction_ids(session: Session) -> dict[str, int]:
+    """Map every direction name to its id."""
+    return dict(session.execute(select(Direction.name, Direction.id)).all())
+
+
+def load_current(session: Session) -> NetworkData:
+    """
+    Read the network currently in the database as natural keys.
+
+    Args:
+        session: Database session
+
+    Returns:
+        NetworkData: Current entities and links
+    """
+    names = {id: name for name, id in direction_ids(session).items()}
+    return NetworkData(
+        buses=list(session.execute(select(Bus.id)).scalars()),
+        directions=list(names.values()),
+        bus_stops=dict(session.execute(select(BusStop.id, BusStop.name)).all()),
+        bus_directions=[
+            (bus, names[direction_id])
+            for bus, direction_id in session.execute(
+                select(BusDirection.bus_id, BusDirection.direction_id)
+            )
+        ],
+        bus_stop_buses=[
+            tuple(row) for row in session.execute(
+                select(BusStopBus.bus_stop_id, BusStopBus.bus_id)
+            )
+        ],
+        bus_stop_directions=[
+            (bus_stop_id, names[direction_id])
+            for bus_stop_id, direction_id in session.execute(
+                select(BusStopDirection.bus_stop_id, BusStopDirection.direction_id)
+            )
+        ],
+    )
+
+
+@dataclass
+class NetworkDiff:
+    """Rows to insert and delete (by natural key) to reach the upstream network."""
+    inserted: NetworkData
+    deleted: NetworkData
+    renamed_bus_stops: dict[str, str]
+
+    def is_empty(self) -> bool:
+        return not (self.renamed_bus_stops or _count(self.inserted) or _count(self.deleted))
+
+    def summary(self) -> dict:
+        """Number of inserted, deleted and renamed rows per table."""
+        return {
+            "inserted": _count(self.inserted, by_table=True),
+            "deleted": _count(self.deleted, by_table=True),
+            "renamed_bus_stops": len(self.renamed_bus_stops),
+        }
+
+
+_TABLES = (
+    "buses", "directions", "bus_stops",
+    "bus_directions", "bus_stop_buses", "bus_stop_directions",
+)
+
+
+def _count(data: NetworkData, by_table: bool = False):
+    counts = {table: len(getattr(data, table)) for table in _TABLES}
+    return counts if by_table else sum(counts.values())
+
+
+def diff(current: NetworkData, upstream: NetworkData) -> NetworkDiff:
+    """
+    Compute the rows to insert and delete to turn current into upstream.
+
+    Args:
+        current: Network in the database (see load_current)
+        upstream: Network from the linesshape API (see transform)
+
+    Returns:
+        NetworkDiff: Inserts, deletes and bus stop renames
+    """
+    inserted, deleted = NetworkData(), NetworkData()
+    for table in _TABLES:
+        current_rows, upstream_rows = getattr(current, table), getattr(upstream, table)
+        if isinstance(upstream_rows, dict):
+            setattr(inserted, table, {
+                key: value for key, value in upstream_rows.items() if key not in current_rows
+            })
+            setattr(deleted, table, {
+                key: value for key, value in current_rows.items() if key not in upstream_rows
+            })
+        else:
+            current_set, upstream_set = set(current_rows), set(upstream_rows)
+            setattr(inserted, table, [row for row in upstream_rows if row not in current_set])
+            setattr(deleted, table, [row for row in current_rows if row not in upstream_set])
+
+    renamed = {
+        bus_stop_id: name
+        for bus_stop_id, name in upstream.bus_stops.items()
+        if bus_stop_id in current.bus_stops and current.bus_stops[bus_stop_id] != name
+    }
+    return NetworkDiff(inserted, deleted, renamed)
+
+
+def _link_delete(table, left, right):
+    """
+    DELETE of a junction row by its two columns, bound as :left and :right.
+
+    apply() runs it as a single executemany over the deleted pairs: one
+    statement per table, each row found through the table's index.
+    """
+    return delete(table.__table__).where(left == bindparam("left"), right == bindparam("right"))
+
+
+def apply(session: Session, changes: NetworkDiff) -> int:
+    """
+    Apply a diff and bump the dataset version if anything changed.
+
+    Links are deleted before the entities they reference and inserted
+    after them. Deletes and inserts are bulk: link deletes run as one
+    executemany per table (see _link_delete), inserts skip existing rows
+    where the dialect supports it (see _INSERTS). The caller owns the
+    transaction: nothing is committed here.
+
+    Args:
+        session: Database session
+        changes: Output of diff
+
+    Returns:
+        int: The dataset version after the change
+    """
+    version = read_dataset_version(session)
+    if changes.is_empty():
+        return version
+
+    insert_statement = _INSERTS.get(session.get_bind().dialect.name, insert)
+    inserted, deleted = changes.inserted, changes.deleted
+
+    def insert_rows(table, rows: list[dict]):
+        if rows:
+            session.execute(insert_statement(table), rows)
+
+    def delete_links(table, left, right, pairs):
+        if pairs:
+            session.execute(_link_delete(table, left, right), [
+                {"left": left_value, "right": right_value} for left_value, right_value in pairs
+            ])
+
+    ids = direction_ids(session)
+    delete_links(BusDirection, BusDirection.bus_id, BusDirection.direction_id, [
+        (bus, ids[name]) for bus, name in deleted.bus_directions
+    ])
+    delete_links(BusStopBus, BusStopBus.bus_stop_id, BusStopBus.bus_id, deleted.bus_stop_buses)
+    delete_links(
+        BusStopDirection, BusStopDirection.bus_stop_id, BusStopDirection.direction_id,
+        [(bus_stop_id, ids[name]) for bus_stop_id, name in deleted.bus_stop_directions],
+    )
+    if deleted.bus_stops:
+        session.execute(delete(BusStop).where(BusStop.id.in_(list(deleted.bus_stops))))
+    if deleted.directions:
+        session.execute(delete(Direction).where(Direction.name.in_(deleted.directions)))
+    if deleted.buses:
+        session.execute(delete(Bus).where(Bus.id.in_(deleted.buses)))
+
+    for bus_stop_id, name in changes.renamed_bus_stops.items():
+        session.execute(update(BusStop).where(BusStop.id == bus_stop_id).values(name=name))
+
+    insert_rows(Bus, [{"id": bus} for bus in inserted.buses])
+    insert_rows(Direction, [{"name": name} for name in inserted.directions])
+    insert_rows(BusStop, [{"id": id, "name": name} for id, name in inserted.bus_stops.items()])
+
+    ids = direction_ids(session)
+    insert_rows(BusDirection, [
+        {"bus_id": bus, "direction_id": ids[name]}
+        for bus, name in inserted.bus_directions
+    ])
+    insert_rows(BusStopBus, [
+        {"bus_stop_id": bus_stop_id, "bus_id": bus}
+        for bus_stop_id, bus in inserted.bus_stop_buses
+    ])
+    insert_rows(BusStopDirection, [
+        {"bus_stop_id": bus_stop_id, "direction_id": ids[name]}
+        for bus_stop_id, name in inserted.bus_stop_directions
+    ])
+
+    version += 1
+    session.merge(DatasetVersion(id=1, version=version, updated_at=datetime.now(timezone.utc)))
+    return version
+
+
+def synchronize(session: Session, upstream: NetworkData) -> dict:
+    """
+    Bring the database to the upstream network in one transaction.
+
+    Args:
+        session: Database session
+        upstream: Output of transform
+
+    Returns:
+        dict: Dataset version, whether anything changed, and the diff summary
+    """
+    try:
+        changes = diff(load_current(session), upstream)
+        version = apply(session, changes)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return {"version": version, "changed": not changes.is_empty(), **changes.summary()}
+
+
+def ingest_network(session: Session, bus_list: list[str]) -> dict:
+    """
+    Fetch, transform and synchronize the whole network.
+
+    Args:
+        session: Database session
+        bus_list: Bus line identifiers to import
+
+    Returns:
+        dict: Synchronize report, plus the duration of each phase in
+        seconds under "timings"
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    lines = asyncio.run(fetch_lines(bus_list))
+    timings["fetch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = transform(lines)
+    timings["transform"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = synchronize(session, data)
+    timings["write"] = time.perf_counter() - start
+
+    timings["total"] = sum(timings.values())
+    return {**report, "timings": timings}
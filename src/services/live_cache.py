@@ -0,0 +1,340 @@
+"""In-process TTL cache for live arrivals with single-flight loading."""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, NamedTuple, Optional, Union
+
+from core import config
+from core.logging_config import logger
+from services.cache_backends import CacheBackendError, LiveCacheBackend, create_backend
+from services.scraper_service import LiveDataError, get_live_arrivals
+
+# Seconds between checks of the shared store while another worker fetches
+SHARED_LOCK_POLL_INTERVAL = 0.05
+# Seconds the shared store is bypassed after it failed
+SHARED_BACKEND_RETRY_INTERVAL = 5
+
+
+@dataclass
+class CacheEntry:
+    """A cached value and the monotonic time it was fetched at."""
+    value: list[dict]
+    fetched_at: float
+    shared: bool = False  # taken from the shared backend, not fetched here
+
+
+class CacheResult(NamedTuple):
+    """Value returned by the cache with its freshness information."""
+    value: list[dict]
+    status: str  # "HIT", "STALE", "MISS" or "FALLBACK"
+    age: float  # seconds since the value was fetched upstream
+
+
+class LiveCache:
+    """
+    Bounded LRU cache keyed by bus stop id, with a time-to-live.
+
+    Concurrent misses for the same key share a single call to the loader
+    instead of each triggering their own upstream request. Entries older
+    than the TTL but within the stale window are still served, while a
+    refresh runs in the background (stale-while-revalidate). When loading
+    fails, an entry up to fallback_ttl old is served instead of the error
+    (last known good), with the FALLBACK status.
+
+    With a shared backend (see cache_backends), a local miss first reuses a
+    fresh entry from the backend; otherwise only the process holding the
+    key's lock in the backend calls the loader, and the others wait up to
+    lock_timeout for its result. An unreachable backend degrades to local
+    loading.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[list[dict]]],
+        ttl: float,
+        max_entries: int,
+        stale_ttl: float = 0,
+        fallback_ttl: float = 0,
+        backend: Optional[LiveCacheBackend] = None,
+        lock_timeout: float = 5,
+    ):
+        self._loader = loader
+        self.backend = backend
+        self.lock_timeout = lock_timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.fallback_ttl = fallback_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Recent lookups per key, decayed by the prefetcher
+        self._demand: dict[str, float] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.shared_hits = 0
+        self.shared_waits = 0
+        self.backend_errors = 0
+        self._backend_down = False
+        self._backend_retry_at = 0.0
+
+    async def get(self, key: str) -> CacheResult:
+        """
+        Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: Bus stop identifier
+
+        Returns:
+            CacheResult: Value, cache status and age in seconds
+
+        Raises:
+            Exception: Whatever the loader raises (shared by coalesced
+            callers), unless a fallback entry can be served
+        """
+        self._demand[key] = self._demand.get(key, 0.0) + 1
+        if len(self._demand) > 4 * self.max_entries:
+            self.decay_demand()
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CacheResult(entry.value, "HIT", age)
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self.refresh(key)
+                return CacheResult(entry.value, "STALE", age)
+
+        self.misses += 1
+        try:
+            loaded = await self._load(key)
+        except LiveDataError:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.fetched_at >= self.fallback_ttl:
+                raise
+            self.fallbacks += 1
+            return CacheResult(entry.value, "FALLBACK", time.monotonic() - entry.fetched_at)
+        status = "HIT" if loaded.shared else "MISS"
+        return CacheResult(loaded.value, status, time.monotonic() - loaded.fetched_at)
+
+    async def get_many(
+        self, keys: list[str], concurrency: int
+    ) -> dict[str, Union[CacheResult, BaseException]]:
+        """
+        Look up several keys concurrently, at most `concurrency` at a time.
+
+        Args:
+            keys: Bus stop identifiers (duplicates are looked up once)
+            concurrency: Maximum number of simultaneous lookups
+
+        Returns:
+            dict: Key to its CacheResult, or to the exception its load raised
+            (possibly asyncio.CancelledError, which callers should re-raise)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded_get(key: str) -> CacheResult:
+            async with semaphore:
+                return await self.get(key)
+
+        unique_keys = list(dict.fromkeys(keys))
+        results = await asyncio.gather(
+            *(bounded_get(key) for key in unique_keys), return_exceptions=True
+        )
+        return dict(zip(unique_keys, results))
+
+    async def _load(self, key: str) -> CacheEntry:
+        """Run the loader once per key, however many callers are waiting."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key)
+        else:
+            self.coalesced += 1
+        # Shield so a disconnecting client doesn't cancel the shared fetch
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: str) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fetch_and_store(key))
+        task.add_done_callback(_consume_exception)
+        self._inflight[key] = task
+        return task
+
+    def refresh(self, key: str) -> asyncio.Task:
+        """
+        Reload key in the background, unless a load is already running.
+
+        Returns:
+            asyncio.Task: The (possibly shared) load task
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key)
+            task.add_done_callback(_log_refresh_failure)
+        return task
+
+    def expires_in(self, key: str) -> float:
+        """Seconds until key stops being fresh (negative once expired)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return float("-inf")
+        return entry.fetched_at + self.ttl - time.monotonic()
+
+    def is_loading(self, key: str) -> bool:
+        """Whether a load for key is currently in flight."""
+        return key in self._inflight
+
+    def hottest(self, count: int, min_demand: float = 0.0) -> list[str]:
+        """Return the count keys with the most recent demand, of at least min_demand."""
+        keys = [key for key, demand in self._demand.items() if demand >= min_demand]
+        return sorted(keys, key=self._demand.__getitem__, reverse=True)[:count]
+
+    def decay_demand(self, factor: float = 0.5):
+        """Age demand counters so the hot set follows current traffic."""
+        for key in list(self._demand):
+            demand = self._demand[key] * factor
+            if demand < 0.01:
+                del self._demand[key]
+            else:
+                self._demand[key] = demand
+
+    async def _fetch_and_store(self, key: str) -> CacheEntry:
+        try:
+            if self.backend is None or time.monotonic() < self._backend_retry_at:
+                entry = CacheEntry(await self._loader(key), time.monotonic())
+            else:
+                entry = await self._load_shared(key)
+        finally:
+            self._inflight.pop(key, None)
+        self._store(key, entry)
+        return entry
+
+    async def _load_shared(self, key: str) -> CacheEntry:
+        """Reuse the backend's fresh entry, or load under the backend's lock."""
+        deadline = time.monotonic() + self.lock_timeout
+        waited = False
+        while True:
+            try:
+                shared = await self.backend.get(key)
+                if shared is not None and time.time() - shared[1] < self.ttl:
+                    self._backend_ok()
+                    self.shared_hits += 1
+                    return CacheEntry(shared[0], time.monotonic() - (time.time() - shared[1]), True)
+                token = await self.backend.acquire(key, self.lock_timeout)
+            except CacheBackendError as e:
+                self._backend_failed(e)
+                return CacheEntry(await self._loader(key), time.monotonic())
+            self._backend_ok()
+
+            if token is not None:
+                try:
+                    value = await self._loader(key)
+                    await self.backend.set(key, value, time.time(), self.ttl)
+                except CacheBackendError as e:
+                    self._backend_failed(e)
+                finally:
+                    await self._release(key, token)
+                return CacheEntry(value, time.monotonic())
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"Gave up waiting for another worker to fetch {key}")
+                return CacheEntry(await self._loader(key), time.monotonic())
+            if not waited:
+                self.shared_waits += 1
+                waited = True
+            await asyncio.sleep(SHARED_LOCK_POLL_INTERVAL)
+
+    async def _release(self, key: str, token: str):
+        try:
+            await self.backend.release(key, token)
+        except CacheBackendError as e:
+            self._backend_failed(e)
+
+    def _backend_ok(self):
+        if self._backend_down:
+            logger.info(f"Shared live cache ({self.backend.name}) reachable again")
+            self._backend_down = False
+
+    def _backend_failed(self, error: Exception):
+        self.backend_errors += 1
+        self._backend_retry_at = time.monotonic() + SHARED_BACKEND_RETRY_INTERVAL
+        if not self._backend_down:
+            logger.warning(f"Shared live cache unavailable, fetching locally: {error}")
+            self._backend_down = True
+
+    async def close(self):
+        """Close the shared backend, if any."""
+        if self.backend is not None:
+            await self.backend.close()
+
+    def _store(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return cache counters.
+
+        Returns:
+            dict: Entry count, hits, stale hits, misses, fallbacks, coalesced
+            misses, evictions, hit ratio (stale hits count as hits) and
+            shared backend counters (misses answered by another worker's
+            fetch, misses that waited for one, backend errors)
+        """
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "fallback_ttl": self.fallback_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "backend": self.backend.name if self.backend is not None else "memory",
+            "shared_hits": self.shared_hits,
+            "shared_waits": self.shared_waits,
+            "backend_errors": self.backend_errors,
+        }
+
+
+def _consume_exception(task: asyncio.Task):
+    """Mark a failed load as retrieved when every waiter went away."""
+    if not task.cancelled():
+        task.exception()
+
+
+def _log_refresh_failure(task: asyncio.Task):
+    """Background refreshes have no caller to report their failure to."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background live refresh failed: {task.exception()}")
+
+
+live_cache = LiveCache(
+    get_live_arrivals,
+    ttl=config.LIVE_CACHE_TTL,
+    max_entries=config.LIVE_CACHE_MAX_ENTRIES,
+    stale_ttl=config.LIVE_CACHE_STALE_TTL,
+    fallback_ttl=config.LIVE_FALLBACK_MAX_AGE,
+    backend=create_backend(config.LIVE_CACHE_BACKEND),
+    lock_timeout=config.LIVE_CACHE_LOCK_TIMEOUT,
+)
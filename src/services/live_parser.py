@@ -0,0 +1,160 @@
+"""Single-pass extraction of bus passages from live.synchro-bus.fr pages.
+
+The page is scanned once with a tokenizer that only recognises the tags the
+scraper cares about (div and img); no document tree is built.
+
+Passages carry no realtime/theoretical flag: the markup telling them apart
+has not been confirmed on a captured page, so none is guessed.
+"""
+import html
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Union
+from zoneinfo import ZoneInfo
+
+from core import config
+from core.logging_config import logger
+
+# The line letter sits at a fixed position in the line pictogram URL
+LINE_SRC_OFFSET = 56
+
+# Target div classes and the passage field they hold
+_FIELD_CLASSES = {
+    "nq-c-Direction-content-detail-location": "direction",
+    "nq-c-Direction-content-detail-time": "time",
+    "nq-c-Direction-content-detail-remaining": "remaining",
+}
+
+_TAG = re.compile(r"<(/?)(div|img)\b([^>]*)>", re.IGNORECASE)
+_ATTR = re.compile(
+    r"""([a-zA-Z_:][-a-zA-Z0-9_:.]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))"""
+)
+_FIRST_SPAN = re.compile(r"<span\b[^>]*>(.*?)</span\s*>", re.IGNORECASE | re.DOTALL)
+_ANY_TAG = re.compile(r"<[^>]*>")
+_MINUTES = re.compile(r"(\d+)\s*min")
+_CLOCK = re.compile(r"(\d{1,2})[:h](\d{2})")
+
+_timezone = ZoneInfo(config.LIVE_TIMEZONE)
+
+
+def _attributes(raw: str) -> dict[str, str]:
+    attrs = {}
+    for match in _ATTR.finditer(raw):
+        name = match.group(1).lower()
+        if name not in attrs:
+            value = match.group(2)
+            if value is None:
+                value = match.group(3) if match.group(3) is not None else match.group(4)
+            attrs[name] = html.unescape(value)
+    return attrs
+
+
+def _text(fragment: str) -> str:
+    """Text content of an HTML fragment (tags dropped, entities decoded)."""
+    return html.unescape(_ANY_TAG.sub("", fragment))
+
+
+def _departure(time: str, remaining: str, now: datetime) -> Optional[datetime]:
+    """
+    Absolute departure of a passage shown at now.
+
+    Taken from the "HH:MM" time (may be tomorrow), or else from the
+    remaining minutes counted from now.
+    """
+    match = _CLOCK.search(time)
+    if match is not None:
+        hour, minute = int(match.group(1)), int(match.group(2))
+        if hour <= 23 and minute <= 59:
+            departure = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            # Times are upcoming: one well before now is past midnight
+            if departure < now - timedelta(hours=1):
+                departure += timedelta(days=1)
+            return departure
+    match = _MINUTES.search(remaining)
+    if match is not None:
+        return now + timedelta(minutes=int(match.group(1)))
+    return None
+
+
+def _build_passage(fields: dict, now: datetime) -> Optional[dict]:
+    """Turn the raw captured fields of one passage into the API shape."""
+    try:
+        span = _FIRST_SPAN.search(fields["direction"])
+        if span is None:
+            raise AttributeError("direction has no span")
+        time = _text(fields["time"])
+        remaining = _text(fields["remaining"])[1:]  # Remove first space character
+        departure = _departure(time, remaining, now)
+        return {
+            "line": fields["src"][LINE_SRC_OFFSET],
+            "direction": _text(span.group(1)),
+            "time": time,
+            "remaining": remaining,
+            "departure": departure.isoformat() if departure is not None else None,
+        }
+    except (IndexError, KeyError, AttributeError) as e:
+        logger.warning(f"Error parsing bus passage data: {e!r}")
+        return None
+
+
+def parse_live_page(content: Union[bytes, str], now: Optional[datetime] = None) -> list[dict]:
+    """
+    Extract upcoming bus passages from a live stop page.
+
+    Args:
+        content: Raw HTML of https://live.synchro-bus.fr/{bus_stop_id}
+        now: Time the page was fetched (defaults to now, in LIVE_TIMEZONE)
+
+    Returns:
+        list[dict]: Passages with line, direction, time and remaining as
+        shown, plus the departure as an ISO 8601 timestamp (minutes until
+        departure are computed when serving, see with_minutes)
+    """
+    page = content.decode("utf-8", "replace") if isinstance(content, bytes) else content
+    if now is None:
+        now = datetime.now(_timezone)
+
+    passages: list[dict] = []
+    fields: Optional[dict] = None  # raw fields of the passage being scanned
+    depth = 0  # div nesting inside the current nq-c-Direction block
+    capture: Optional[tuple[str, int, int]] = None  # (field, start, depth)
+
+    for match in _TAG.finditer(page):
+        is_closing, tag = match.group(1), match.group(2).lower()
+
+        if tag == "div" and is_closing:
+            if fields is None:
+                continue
+            if capture is not None and capture[2] == depth:
+                fields[capture[0]] = page[capture[1]:match.start()]
+                capture = None
+            depth -= 1
+            if depth == 0:
+                passage = _build_passage(fields, now)
+                if passage is not None:
+                    passages.append(passage)
+                fields = None
+            continue
+
+        if is_closing:
+            continue
+
+        attrs = _attributes(match.group(3))
+        classes = attrs.get("class", "").split()
+        if tag == "img":
+            if fields is not None and "img-line" in classes and "src" not in fields:
+                fields["src"] = attrs.get("src", "")
+            continue
+        if fields is None:
+            if "nq-c-Direction" in classes:
+                fields, depth = {}, 1
+            continue
+
+        depth += 1
+        if capture is None:
+            for css_class, field in _FIELD_CLASSES.items():
+                if css_class in classes and field not in fields:
+                    capture = (field, match.end(), depth)
+                    break
+
+    return passages
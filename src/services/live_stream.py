@@ -0,0 +1,221 @@
+"""Fan-out of live arrivals to streaming clients (SSE and WebSocket)."""
+import asyncio
+from typing import Optional
+
+from core import config
+from core.logging_config import logger
+from services.arrival_filter import with_minutes
+from services.live_cache import LiveCache, live_cache
+from services.scraper_service import LiveDataError
+
+# Fields identifying one passage; the others (e.g. "remaining") may change
+ARRIVAL_KEY = ("line", "direction", "time")
+# Events buffered per client before it is resynchronized with snapshots
+SUBSCRIPTION_QUEUE_SIZE = 64
+
+
+def _arrival_key(arrival: dict) -> tuple:
+    return tuple(arrival.get(field) for field in ARRIVAL_KEY)
+
+
+def arrivals_diff(old: list[dict], new: list[dict]) -> Optional[dict]:
+    """
+    Describe how a stop's arrivals changed.
+
+    Args:
+        old: Previously published arrivals
+        new: Current arrivals
+
+    Returns:
+        dict: "added" and "changed" arrivals and "removed" keys (line,
+        direction, time); None if unchanged
+    """
+    if old == new:
+        return None
+    before = {_arrival_key(arrival): arrival for arrival in old}
+    after = {_arrival_key(arrival): arrival for arrival in new}
+    return {
+        "added": [arrival for key, arrival in after.items() if key not in before],
+        "changed": [
+            arrival for key, arrival in after.items()
+            if key in before and before[key] != arrival
+        ],
+        "removed": [dict(zip(ARRIVAL_KEY, key)) for key in before if key not in after],
+    }
+
+
+class Subscription:
+    """Events queued for one client, across the stops it follows."""
+
+    def __init__(self):
+        self.bus_stop_ids: set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(SUBSCRIPTION_QUEUE_SIZE)
+
+    async def get(self) -> Optional[dict]:
+        """Next event, or None once the hub closed the subscription."""
+        return await self.queue.get()
+
+
+class StopFeed:
+    """Single poller of one stop, shared by all its subscribers."""
+
+    def __init__(self, bus_stop_id: str):
+        self.bus_stop_id = bus_stop_id
+        self.subscribers: set[Subscription] = set()
+        self.arrivals: Optional[list[dict]] = None
+        self.cache_status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot_event(self) -> Optional[dict]:
+        """Full state for a new subscriber, if anything was fetched yet."""
+        if self.error is not None:
+            return {"type": "error", "bus_stop_id": self.bus_stop_id, "error": self.error}
+        if self.arrivals is None:
+            return None
+        return {
+            "type": "snapshot",
+            "bus_stop_id": self.bus_stop_id,
+            "cache": self.cache_status,
+            "arrivals": with_minutes(self.arrivals),
+        }
+
+
+class LiveHub:
+    """
+    Shared polling of live stops for streaming subscribers.
+
+    Each followed stop gets one poller reading the live cache every
+    interval, however many clients follow it, so N watchers of a stop cost
+    one upstream request per cache TTL. Subscribers first receive a
+    snapshot of each stop, then only diffs when its arrivals change (and an
+    error event when fetching starts failing). Pollers stop with their
+    last subscriber.
+    """
+
+    def __init__(self, cache: LiveCache, interval: float):
+        self.cache = cache
+        self.interval = interval
+        self._feeds: dict[str, StopFeed] = {}
+        self._subscriptions: set[Subscription] = set()
+        self.events = 0
+        self.resyncs = 0
+
+    def subscribe(self, bus_stop_ids: list[str]) -> Subscription:
+        """Create a subscription following bus_stop_ids."""
+        subscription = Subscription()
+        self._subscriptions.add(subscription)
+        self.follow(subscription, bus_stop_ids)
+        return subscription
+
+    def follow(self, subscription: Subscription, bus_stop_ids: list[str]):
+        """Add stops to a subscription; known stops are snapshotted at once."""
+        for bus_stop_id in bus_stop_ids:
+            if bus_stop_id in subscription.bus_stop_ids:
+                continue
+            feed = self._feeds.get(bus_stop_id)
+            if feed is None:
+                feed = self._feeds[bus_stop_id] = StopFeed(bus_stop_id)
+                feed.task = asyncio.get_running_loop().create_task(self._poll(feed))
+            feed.subscribers.add(subscription)
+            subscription.bus_stop_ids.add(bus_stop_id)
+            event = feed.snapshot_event()
+            if event is not None:
+                self.deliver(subscription, event)
+
+    def unfollow(self, subscription: Subscription, bus_stop_ids: list[str]):
+        """Remove stops from a subscription, stopping orphaned pollers."""
+        for bus_stop_id in bus_stop_ids:
+            subscription.bus_stop_ids.discard(bus_stop_id)
+            feed = self._feeds.get(bus_stop_id)
+            if feed is None:
+                continue
+            feed.subscribers.discard(subscription)
+            if not feed.subscribers:
+                feed.task.cancel()
+                del self._feeds[bus_stop_id]
+
+    def unsubscribe(self, subscription: Subscription):
+        """Drop a subscription (client gone)."""
+        self.unfollow(subscription, list(subscription.bus_stop_ids))
+        self._subscriptions.discard(subscription)
+
+    async def _poll(self, feed: StopFeed):
+        while True:
+            try:
+                result = await self.cache.get(feed.bus_stop_id)
+            except LiveDataError as e:
+                if feed.error is None:
+                    logger.warning(f"Live stream of {feed.bus_stop_id} failing: {e}")
+                    feed.error = str(e)
+                    self._publish(feed, feed.snapshot_event())
+            except Exception as e:
+                logger.error(f"Live stream poller of {feed.bus_stop_id} failed: {e}")
+            else:
+                if feed.arrivals is None or feed.error is not None:
+                    feed.arrivals, feed.cache_status, feed.error = result.value, result.status, None
+                    self._publish(feed, feed.snapshot_event())
+                else:
+                    diff = arrivals_diff(feed.arrivals, result.value)
+                    feed.arrivals, feed.cache_status = result.value, result.status
+                    if diff is not None:
+                        self._publish(feed, {
+                            "type": "diff",
+                            "bus_stop_id": feed.bus_stop_id,
+                            "cache": result.status,
+                            "added": with_minutes(diff["added"]),
+                            "changed": with_minutes(diff["changed"]),
+                            "removed": diff["removed"],
+                        })
+            await asyncio.sleep(self.interval)
+
+    def _publish(self, feed: StopFeed, event: dict):
+        for subscription in list(feed.subscribers):
+            self.deliver(subscription, event)
+
+    def deliver(self, subscription: Subscription, event: dict):
+        """Queue an event; a client too far behind gets fresh snapshots instead."""
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resyncs += 1
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            for bus_stop_id in subscription.bus_stop_ids:
+                snapshot = self._feeds[bus_stop_id].snapshot_event()
+                if snapshot is not None:
+                    subscription.queue.put_nowait(snapshot)
+            return
+        self.events += 1
+
+    async def stop(self):
+        """Stop every poller and end every subscription."""
+        for feed in self._feeds.values():
+            feed.task.cancel()
+        await asyncio.gather(
+            *(feed.task for feed in self._feeds.values()), return_exceptions=True
+        )
+        self._feeds.clear()
+        for subscription in self._subscriptions:
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(None)
+        self._subscriptions.clear()
+
+    def stats(self) -> dict:
+        """
+        Return streaming counters.
+
+        Returns:
+            dict: Followed stops (one poller each), connected subscribers,
+            events delivered and slow-client resynchronizations
+        """
+        return {
+            "stops": len(self._feeds),
+            "subscribers": len(self._subscriptions),
+            "events": self.events,
+            "resyncs": self.resyncs,
+        }
+
+
+live_hub = LiveHub(live_cache, interval=config.LIVE_STREAM_INTERVAL)
@@ -0,0 +1,200 @@
+"""Incremental refresh of the static network while the API is running.
+
+Refreshes are serialized across every worker and host sharing the database
+by a lease row (network_refresh_lease): a worker refreshes only after
+taking it, so N workers running the schedule still fetch and write the
+network once per interval.
+"""
+import asyncio
+import secrets
+import time
+from typing import Optional
+
+from core import config
+from core.logging_config import logger
+from services.network_snapshot import reload_snapshot_async, save_snapshot_file
+
+
+class RefreshInProgressError(Exception):
+    """Raised when another worker holds the refresh lease (or just refreshed)."""
+
+
+def _claim_lease(owner: str, min_age: float) -> bool:
+    """
+    Take the refresh lease, unless it is held or was released too recently.
+
+    Args:
+        owner: Token identifying this refresh
+        min_age: Skip if a refresh completed less than this many seconds ago
+
+    Returns:
+        bool: Whether the lease was taken
+    """
+    from sqlalchemy import update
+    from sqlalchemy.exc import IntegrityError
+
+    from database.Database import timed_session
+    from database.Table import NetworkRefreshLease
+
+    now = time.time()
+    expires_at = now + config.NETWORK_REFRESH_LEASE_TTL
+    session = timed_session()
+    try:
+        claimed = session.execute(
+            update(NetworkRefreshLease)
+            .where(
+                NetworkRefreshLease.id == 1,
+                NetworkRefreshLease.expires_at < now,
+                NetworkRefreshLease.refreshed_at <= now - min_age,
+            )
+            .values(owner=owner, expires_at=expires_at)
+        ).rowcount == 1
+        if not claimed and session.get(NetworkRefreshLease, 1) is None:
+            # Migration 0004 seeds the row; without it no refresh could ever run
+            logger.error("Network refresh lease row missing, recreating it")
+            session.add(NetworkRefreshLease(id=1, owner=owner, expires_at=expires_at, refreshed_at=0.0))
+            try:
+                session.commit()
+            except IntegrityError:
+                # Another worker recreated it first and holds the lease
+                session.rollback()
+                return False
+            return True
+        session.commit()
+        return claimed
+    finally:
+        session.close()
+
+
+def _release_lease(owner: str, refreshed: bool):
+    """Give the lease back, recording the completion time if the refresh succeeded."""
+    from sqlalchemy import update
+
+    from database.Database import timed_session
+    from database.Table import NetworkRefreshLease
+
+    values = {"expires_at": 0.0}
+    if refreshed:
+        values["refreshed_at"] = time.time()
+    session = timed_session()
+    try:
+        session.execute(
+            update(NetworkRefreshLease)
+            .where(NetworkRefreshLease.id == 1, NetworkRefreshLease.owner == owner)
+            .values(**values)
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def _synchronize(upstream) -> dict:
+    from database.Database import timed_session
+    from services.ingest_service import synchronize
+
+    session = timed_session()
+    try:
+        return synchronize(session, upstream)
+    finally:
+        session.close()
+
+
+async def refresh_network(bus_list: Optional[list[str]] = None, min_age: float = 0) -> dict:
+    """
+    Apply upstream network changes to the database and reload the snapshot.
+
+    Only the rows that differ are inserted or deleted, in one transaction
+    that bumps the dataset version; other workers pick the new version up
+    through their SnapshotWatcher. The snapshot file is rewritten for
+    workers started later.
+
+    Args:
+        bus_list: Bus line identifiers (defaults to NETWORK_BUS_LINES)
+        min_age: Skip the refresh if any worker completed one less than
+            this many seconds ago
+
+    Returns:
+        dict: Dataset version, whether anything changed, per-table insert
+        and delete counts, and phase timings
+
+    Raises:
+        RefreshInProgressError: If another worker is refreshing (or
+            refreshed within min_age)
+        httpx.HTTPError: If the upstream network cannot be fetched
+    """
+    # Ingestion pulls in SQLAlchemy; imported here to keep it off startup
+    from services.ingest_service import fetch_lines, transform
+
+    owner = secrets.token_hex(8)
+    if not await asyncio.to_thread(_claim_lease, owner, min_age):
+        raise RefreshInProgressError("Another worker is refreshing the network")
+    refreshed = False
+    try:
+        timings = {}
+
+        start = time.perf_counter()
+        lines = await fetch_lines(bus_list or config.NETWORK_BUS_LINES)
+        timings["fetch"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        upstream = transform(lines)
+        timings["transform"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = await asyncio.to_thread(_synchronize, upstream)
+        timings["write"] = time.perf_counter() - start
+
+        if report["changed"]:
+            snapshot = await reload_snapshot_async()
+            await asyncio.to_thread(save_snapshot_file, snapshot)
+
+        timings["total"] = sum(timings.values())
+        logger.info(
+            f"Network refresh: version={report['version']}, changed={report['changed']}, "
+            f"took {timings['total']:.3f}s"
+        )
+        refreshed = True
+        return {**report, "timings": timings}
+    finally:
+        await asyncio.to_thread(_release_lease, owner, refreshed)
+
+
+class NetworkRefreshScheduler:
+    """
+    Run refresh_network periodically.
+
+    Every worker runs the schedule; a worker skips its turn when another
+    one holds the refresh lease or completed a refresh within the last
+    half interval, so the cluster refreshes about once per interval.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the schedule on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Network refresh scheduled every {self.interval}s")
+
+    async def stop(self):
+        """Stop the schedule."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await refresh_network(min_age=self.interval / 2)
+            except RefreshInProgressError:
+                logger.debug("Scheduled network refresh skipped: done by another worker")
+            except Exception as e:
+                logger.error(f"Scheduled network refresh failed: {e}")
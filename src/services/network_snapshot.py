@@ -0,0 +1,432 @@
+"""Immutable in-memory snapshot of the static bus network.
+
+The network (lines, directions, stops and their links) only changes when it
+is re-ingested, so it is loaded once into read-only indexes and every static
+endpoint is answered from memory. Reloading builds a new snapshot and swaps
+the module-level reference, so readers always see one complete version.
+
+Each worker watches the dataset_version row bumped by network refreshes and
+reloads its snapshot when it changes, without a restart.
+
+Ingestion also writes the snapshot to a compact file (NETWORK_SNAPSHOT_FILE)
+that a starting worker loads without touching the database. SQLAlchemy is
+only imported by the functions that read the database, so a worker started
+from the file does not pay for it before serving requests.
+"""
+import asyncio
+import hashlib
+import json
+import marshal
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Union
+
+from core import config
+from core.logging_config import logger
+from services.pagination import KeysetIndex
+from services.search_index import StopSearchIndex
+from services.suggest_index import StopSuggestIndex
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+# Snapshot file header: format tag, file format version, marshal version
+_FILE_MAGIC = b"SBNET" + bytes([1, marshal.version])
+
+
+@dataclass(frozen=True)
+class NetworkSnapshot:
+    """Read-only network data with precomputed lookup indexes."""
+    version: str  # hash of the content
+    dataset_version: int  # dataset_version row the snapshot was built from
+    buses: tuple[str, ...]
+    directions: tuple[dict, ...]
+    bus_stops: tuple[dict, ...]
+    directions_by_bus: Mapping[str, tuple[dict, ...]]
+    buses_by_direction: Mapping[int, tuple[str, ...]]
+    bus_stops_by_direction: Mapping[int, tuple[dict, ...]]
+    directions_by_bus_stop: Mapping[str, tuple[dict, ...]]
+    buses_by_bus_stop: Mapping[str, tuple[str, ...]]
+    search_index: StopSearchIndex
+    suggest_index: StopSuggestIndex
+    directions_by_id: KeysetIndex  # for paginated listings
+    bus_stops_by_id: KeysetIndex
+
+    def get_directions_by_bus(self, bus_id: str) -> tuple[dict, ...]:
+        """Directions served by a bus line."""
+        return self.directions_by_bus.get(bus_id, ())
+
+    def get_buses_by_direction(self, direction_id: Union[int, str]) -> tuple[str, ...]:
+        """Bus lines running in a direction."""
+        return self.buses_by_direction.get(_direction_key(direction_id), ())
+
+    def get_bus_stops_by_direction(self, direction_id: Union[int, str]) -> tuple[dict, ...]:
+        """Bus stops along a direction."""
+        return self.bus_stops_by_direction.get(_direction_key(direction_id), ())
+
+    def get_directions_by_bus_stop(self, bus_stop_id: str) -> tuple[dict, ...]:
+        """Directions serving a bus stop."""
+        return self.directions_by_bus_stop.get(bus_stop_id, ())
+
+
+def _direction_key(direction_id: Union[int, str]) -> Optional[int]:
+    """Direction ids arrive as str on some routes; the index is keyed by int."""
+    try:
+        return int(direction_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def _group(pairs, outer_rows, key_of, value_of) -> Mapping:
+    """
+    Index outer rows by the keys they are linked to.
+
+    Rows keep the order of outer_rows (the table order the SQL queries
+    returned), whatever the order of the link table. Runs in one pass over
+    each input (plus sorting each group), not one scan of outer_rows per key.
+    """
+    positions = {key_of(row): position for position, row in enumerate(outer_rows)}
+    values = [value_of(row) for row in outer_rows]
+    links: dict = {}
+    for key, member in pairs:
+        members = links.setdefault(key, set())
+        position = positions.get(member)
+        if position is not None:
+            members.add(position)
+    index = {
+        key: tuple(values[position] for position in sorted(members))
+        for key, members in links.items()
+    }
+    return MappingProxyType(index)
+
+
+def read_dataset_version(session: "Session") -> int:
+    """Return the current dataset version (0 if the network was never loaded)."""
+    from sqlalchemy import select
+    from database.Table import DatasetVersion
+
+    version = session.execute(
+        select(DatasetVersion.version).where(DatasetVersion.id == 1)
+    ).scalar()
+    return version or 0
+
+
+def build_snapshot(session: "Session", dataset_version: int = 0) -> NetworkSnapshot:
+    """
+    Read every network table and build a snapshot from them.
+
+    Args:
+        session: Database session
+        dataset_version: Dataset version the tables are expected to be at
+
+    Returns:
+        NetworkSnapshot: The new snapshot
+    """
+    from sqlalchemy import select
+    from database.Table import Bus, BusDirection, BusStop, BusStopBus, BusStopDirection, Direction
+
+    return snapshot_from_tables(
+        dataset_version,
+        buses=[row[0] for row in session.execute(select(Bus.id))],
+        directions=session.execute(select(Direction.id, Direction.name)).all(),
+        bus_stops=session.execute(select(BusStop.id, BusStop.name)).all(),
+        bus_direction=session.execute(select(BusDirection.bus_id, BusDirection.direction_id)).all(),
+        bus_stop_direction=session.execute(
+            select(BusStopDirection.bus_stop_id, BusStopDirection.direction_id)
+        ).all(),
+        bus_stop_bus=session.execute(select(BusStopBus.bus_stop_id, BusStopBus.bus_id)).all(),
+    )
+
+
+def snapshot_from_tables(
+    dataset_version: int,
+    buses: Iterable[str],
+    directions: Iterable[tuple[int, str]],
+    bus_stops: Iterable[tuple[str, str]],
+    bus_direction: Iterable[tuple[str, int]],
+    bus_stop_direction: Iterable[tuple[str, int]],
+    bus_stop_bus: Iterable[tuple[str, str]],
+) -> NetworkSnapshot:
+    """
+    Build a snapshot from the rows of the network tables.
+
+    Args:
+        dataset_version: Dataset version the rows belong to
+        buses: Bus ids, in table order
+        directions: (id, name) rows, in table order
+        bus_stops: (id, name) rows, in table order
+        bus_direction: (bus_id, direction_id) links
+        bus_stop_direction: (bus_stop_id, direction_id) links
+        bus_stop_bus: (bus_stop_id, bus_id) links
+
+    Returns:
+        NetworkSnapshot: The new snapshot
+    """
+    buses = tuple(buses)
+    directions = tuple({"id": id, "name": name} for id, name in directions)
+    bus_stops = tuple({"id": id, "name": name} for id, name in bus_stops)
+    bus_direction = [tuple(pair) for pair in bus_direction]
+    bus_stop_direction = [tuple(pair) for pair in bus_stop_direction]
+    bus_stop_bus = [tuple(pair) for pair in bus_stop_bus]
+
+    content = json.dumps(
+        [buses, directions, bus_stops,
+         sorted(bus_direction), sorted(bus_stop_direction), sorted(bus_stop_bus)],
+        ensure_ascii=False,
+    )
+    version = hashlib.sha256(content.encode()).hexdigest()[:16]
+
+    directions_by_bus_stop = _group(
+        bus_stop_direction, directions, lambda d: d["id"], lambda d: d
+    )
+    buses_by_bus_stop = _group(bus_stop_bus, buses, lambda b: b, lambda b: b)
+
+    return NetworkSnapshot(
+        version=version,
+        dataset_version=dataset_version,
+        buses=buses,
+        directions=directions,
+        bus_stops=bus_stops,
+        directions_by_bus=_group(
+            bus_direction, directions, lambda d: d["id"], lambda d: d
+        ),
+        buses_by_direction=_group(
+            ((direction_id, bus_id) for bus_id, direction_id in bus_direction),
+            buses, lambda b: b, lambda b: b,
+        ),
+        bus_stops_by_direction=_group(
+            ((direction_id, bus_stop_id) for bus_stop_id, direction_id in bus_stop_direction),
+            bus_stops, lambda s: s["id"], lambda s: s,
+        ),
+        directions_by_bus_stop=directions_by_bus_stop,
+        buses_by_bus_stop=buses_by_bus_stop,
+        search_index=StopSearchIndex(bus_stops),
+        suggest_index=StopSuggestIndex(bus_stops, buses_by_bus_stop, directions_by_bus_stop),
+        directions_by_id=KeysetIndex(directions, lambda d: d["id"]),
+        bus_stops_by_id=KeysetIndex(bus_stops, lambda s: s["id"]),
+    )
+
+
+_snapshot: Optional[NetworkSnapshot] = None
+_MAX_LOAD_ATTEMPTS = 3
+
+
+def _load_consistent_snapshot(session: "Session") -> NetworkSnapshot:
+    """Build a snapshot whose tables all belong to one dataset version."""
+    # A refresh commits in one transaction; if the version moved while
+    # the tables were read, read them again so versions never mix
+    for _ in range(_MAX_LOAD_ATTEMPTS):
+        dataset_version = read_dataset_version(session)
+        snapshot = build_snapshot(session, dataset_version)
+        if read_dataset_version(session) == dataset_version:
+            return snapshot
+        session.rollback()
+    raise RuntimeError("Network data kept changing while loading the snapshot")
+
+
+def reload_snapshot() -> NetworkSnapshot:
+    """
+    Load the network from the database and swap it in atomically.
+
+    Returns:
+        NetworkSnapshot: The snapshot now being served
+    """
+    from database.Database import timed_session
+
+    session = timed_session()
+    try:
+        snapshot = _load_consistent_snapshot(session)
+    finally:
+        session.close()
+    return _install_snapshot(snapshot)
+
+
+async def reload_snapshot_async() -> NetworkSnapshot:
+    """
+    reload_snapshot() without blocking the event loop.
+
+    Reads go through the async engine when there is one, otherwise the
+    synchronous load runs in a worker thread.
+
+    Returns:
+        NetworkSnapshot: The snapshot now being served
+    """
+    from database.Database import get_async_engine, timed_async_session
+
+    if get_async_engine() is None:
+        return await asyncio.to_thread(reload_snapshot)
+    async with timed_async_session() as session:
+        snapshot = await session.run_sync(_load_consistent_snapshot)
+    return _install_snapshot(snapshot)
+
+
+def write_snapshot_file(snapshot: NetworkSnapshot, path: str):
+    """
+    Save a snapshot's tables to a file for load_snapshot_file().
+
+    The file is replaced atomically, so workers starting meanwhile read
+    either the old or the new network.
+
+    Args:
+        snapshot: Snapshot to save
+        path: Destination file
+    """
+    tables = {
+        "dataset_version": snapshot.dataset_version,
+        "version": snapshot.version,
+        "buses": snapshot.buses,
+        "directions": tuple((d["id"], d["name"]) for d in snapshot.directions),
+        "bus_stops": tuple((s["id"], s["name"]) for s in snapshot.bus_stops),
+        "bus_direction": tuple(
+            (bus, d["id"]) for bus, directions in snapshot.directions_by_bus.items() for d in directions
+        ),
+        "bus_stop_direction": tuple(
+            (bus_stop, d["id"])
+            for bus_stop, directions in snapshot.directions_by_bus_stop.items() for d in directions
+        ),
+        "bus_stop_bus": tuple(
+            (bus_stop, bus) for bus_stop, buses in snapshot.buses_by_bus_stop.items() for bus in buses
+        ),
+    }
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(_FILE_MAGIC + marshal.dumps(tables))
+    os.replace(temporary, path)
+    logger.info(f"Network snapshot {snapshot.version} written to {path}")
+
+
+def save_snapshot_file(snapshot: NetworkSnapshot):
+    """Write the snapshot to NETWORK_SNAPSHOT_FILE, if set; failures are only logged."""
+    if not config.NETWORK_SNAPSHOT_FILE:
+        return
+    try:
+        write_snapshot_file(snapshot, config.NETWORK_SNAPSHOT_FILE)
+    except OSError as e:
+        logger.warning(f"Cannot write network snapshot file {config.NETWORK_SNAPSHOT_FILE}: {e}")
+
+
+def read_snapshot_file(path: str) -> Optional[NetworkSnapshot]:
+    """
+    Build a snapshot from a file written by write_snapshot_file().
+
+    Returns:
+        Optional[NetworkSnapshot]: The snapshot, or None if the file is
+        missing, was written by another format or Python version, or is
+        damaged
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Cannot read network snapshot file {path}: {e}")
+        return None
+    if not data.startswith(_FILE_MAGIC):
+        logger.warning(f"Ignoring network snapshot file {path}: unknown format")
+        return None
+    try:
+        tables = marshal.loads(data[len(_FILE_MAGIC):])
+        version = tables.pop("version")
+        snapshot = snapshot_from_tables(**tables)
+    except (EOFError, ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Ignoring damaged network snapshot file {path}: {e!r}")
+        return None
+    if snapshot.version != version:
+        logger.warning(f"Ignoring damaged network snapshot file {path}: content hash mismatch")
+        return None
+    return snapshot
+
+
+def load_snapshot_file(path: str = config.NETWORK_SNAPSHOT_FILE) -> Optional[NetworkSnapshot]:
+    """
+    Serve the snapshot saved in a file, if it can be read.
+
+    The file may lag behind the database; the SnapshotWatcher reloads from
+    the database once it sees a newer dataset version.
+
+    Returns:
+        Optional[NetworkSnapshot]: The snapshot now being served, or None
+        if the file cannot be used (see read_snapshot_file)
+    """
+    snapshot = read_snapshot_file(path) if path else None
+    return _install_snapshot(snapshot) if snapshot is not None else None
+
+
+def _install_snapshot(snapshot: NetworkSnapshot) -> NetworkSnapshot:
+    global _snapshot
+    _snapshot = snapshot
+    logger.info(
+        f"Network snapshot {snapshot.version} (dataset v{snapshot.dataset_version}) "
+        f"loaded: {len(snapshot.buses)} buses, "
+        f"{len(snapshot.directions)} directions, {len(snapshot.bus_stops)} bus stops"
+    )
+    return snapshot
+
+
+def get_snapshot() -> NetworkSnapshot:
+    """Return the current snapshot, loading it on first use."""
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = reload_snapshot()
+    return snapshot
+
+
+def current_dataset_version() -> int:
+    """Read the dataset version from the database."""
+    from database.Database import timed_session
+
+    session = timed_session()
+    try:
+        return read_dataset_version(session)
+    finally:
+        session.close()
+
+
+async def current_dataset_version_async() -> int:
+    """current_dataset_version() without blocking the event loop."""
+    from database.Database import get_async_engine, timed_async_session
+
+    if get_async_engine() is None:
+        return await asyncio.to_thread(current_dataset_version)
+    async with timed_async_session() as session:
+        return await session.run_sync(read_dataset_version)
+
+
+class SnapshotWatcher:
+    """Reload the snapshot when another process bumps the dataset version."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start polling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop polling."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Dataset version check failed: {e}")
+
+    async def check(self):
+        """Reload the snapshot if the dataset version changed."""
+        version = await current_dataset_version_async()
+        if version != get_snapshot().dataset_version:
+            await reload_snapshot_async()
@@ -0,0 +1,87 @@
+"""Keyset pagination and field projection for the network list endpoints."""
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Union
+
+Key = Union[int, str]
+
+
+class KeysetIndex:
+    """
+    Rows sorted by id, for keyset pagination.
+
+    A page starts right after the last id of the previous one (binary
+    search), so its cost depends on the page size, not on its position or
+    the size of the list, and pages stay consistent when rows are added or
+    removed between requests.
+    """
+
+    def __init__(self, rows: Iterable[dict], key: Callable[[dict], Key]):
+        self.rows = tuple(sorted(rows, key=key))
+        self.keys = tuple(key(row) for row in self.rows)
+
+    def page(self, after: Optional[Key], limit: Optional[int]) -> tuple[tuple[dict, ...], Optional[Key]]:
+        """
+        Return the rows following after, and the key to continue from.
+
+        Args:
+            after: Last key of the previous page (None for the first page)
+            limit: Maximum rows (None for every remaining row)
+
+        Returns:
+            tuple: The rows, and the last row's key if more rows follow
+            (None on the last page)
+        """
+        start = 0 if after is None else bisect_right(self.keys, after)
+        end = len(self.rows) if limit is None else min(len(self.rows), start + limit)
+        next_key = self.keys[end - 1] if end < len(self.rows) else None
+        return self.rows[start:end], next_key
+
+
+def encode_cursor(key: Key) -> str:
+    """Opaque cursor for the page after key."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Key:
+    """
+    Key encoded in a cursor made by encode_cursor().
+
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor()
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if isinstance(key, bool) or not isinstance(key, (int, str)):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+@dataclass(frozen=True)
+class ListPage:
+    """
+    Page and fields requested from a list endpoint.
+
+    Attributes:
+        after: Key the page starts after (decoded cursor)
+        limit: Maximum rows (None for every remaining row)
+        fields: Fields to keep, in the endpoint's order (None keeps all)
+    """
+    after: Optional[Key] = None
+    limit: Optional[int] = None
+    fields: Optional[tuple[str, ...]] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.after is not None or self.limit is not None
+
+    def project(self, rows: Iterable[dict]) -> list[dict]:
+        """Keep only the requested fields of each row."""
+        if self.fields is None:
+            return list(rows)
+        return [{field: row[field] for field in self.fields} for row in rows]
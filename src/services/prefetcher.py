@@ -0,0 +1,94 @@
+"""Background refresh of the most requested live stops."""
+import asyncio
+from typing import Optional
+
+from core import config
+from core.logging_config import logger
+from services.live_cache import LiveCache, live_cache
+
+
+class LivePrefetcher:
+    """
+    Periodically reload the hottest stops before their cache entries expire.
+
+    Every interval, the cache's demand counters give the hot set: stops
+    requested at least `min_demand` times (counters halve every cycle).
+    Their cached entries that would expire before the next cycle are
+    reloaded concurrently, with at most `budget` upstream requests per
+    cycle. Stops without a cached entry (never loaded, or only failing)
+    are left to requests.
+    """
+
+    def __init__(self, cache: LiveCache, interval: float, hot_stops: int, budget: int, min_demand: float):
+        self.cache = cache
+        self.interval = interval
+        self.hot_stops = hot_stops
+        self.budget = budget
+        self.min_demand = min_demand
+        self._task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the refresh loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(
+                f"Live prefetcher started (interval={self.interval}s, "
+                f"hot_stops={self.hot_stops}, budget={self.budget}, "
+                f"min_demand={self.min_demand})"
+            )
+
+    async def stop(self):
+        """Cancel the refresh loop and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_hot()
+            except Exception as e:
+                logger.error(f"Live prefetch cycle failed: {e}")
+
+    def due_stops(self) -> list[str]:
+        """Hot stops that will expire before the next cycle, within budget."""
+        due = [
+            bus_stop_id
+            for bus_stop_id in self.cache.hottest(self.hot_stops, self.min_demand)
+            # -inf: no successful load cached
+            if float("-inf") < self.cache.expires_in(bus_stop_id) <= self.interval
+            and not self.cache.is_loading(bus_stop_id)
+        ]
+        return due[:self.budget]
+
+    async def refresh_hot(self):
+        """Run one prefetch cycle."""
+        due = self.due_stops()
+        self.cache.decay_demand()
+        if not due:
+            return
+        results = await asyncio.gather(
+            *(self.cache.refresh(bus_stop_id) for bus_stop_id in due),
+            return_exceptions=True,
+        )
+        failures = sum(isinstance(result, BaseException) for result in results)
+        self.refreshed += len(results) - failures
+        self.failed += failures
+        logger.debug(f"Prefetched {len(results) - failures}/{len(results)} hot stops")
+
+
+live_prefetcher = LivePrefetcher(
+    live_cache,
+    interval=config.LIVE_PREFETCH_INTERVAL,
+    hot_stops=config.LIVE_PREFETCH_HOT_STOPS,
+    budget=config.LIVE_PREFETCH_BUDGET,
+    min_demand=config.LIVE_PREFETCH_MIN_DEMAND,
+)
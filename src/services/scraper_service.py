@@ -0,0 +1,97 @@
+"""Scraping of real-time arrivals from the Synchro-Bus live website."""
+import time
+
+import httpx
+
+from core import config, metrics
+from services.http_client import get_http_client
+from services.live_parser import parse_live_page
+from services.upstream_guard import UpstreamRejectedError, live_breaker, upstream_limiter
+
+
+class LiveDataError(Exception):
+    """Raised when live data cannot be fetched from the upstream website."""
+
+
+class UpstreamUnavailableError(LiveDataError):
+    """Raised without calling the website (circuit open or rate limited)."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _is_upstream_failure(error: httpx.HTTPError) -> bool:
+    """Whether an error counts against the circuit breaker (not 4xx answers)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return True
+
+
+async def fetch_live_page(bus_stop_id: str) -> bytes:
+    """
+    Download the live page of a bus stop with the shared async client.
+
+    Calls go through the circuit breaker and the global rate limiter, and
+    are bounded by LIVE_FETCH_TIMEOUT rather than the client's default.
+
+    Args:
+        bus_stop_id: The bus stop identifier (e.g., "GAMBE1")
+
+    Returns:
+        bytes: Raw HTML page
+
+    Raises:
+        UpstreamUnavailableError: If the call was refused without being made
+        LiveDataError: On network errors or non-2xx responses
+    """
+    try:
+        probe = live_breaker.before_call()
+        try:
+            await upstream_limiter.acquire()
+        except BaseException:
+            live_breaker.release(probe)
+            raise
+    except UpstreamRejectedError as e:
+        raise UpstreamUnavailableError(str(e), e.retry_after) from e
+
+    start = time.perf_counter()
+    try:
+        client = await get_http_client()
+        page = await client.get(
+            f"{config.SYNCHROBUS_LIVE_URL}/{bus_stop_id}", timeout=config.LIVE_FETCH_TIMEOUT
+        )
+        page.raise_for_status()
+    except httpx.HTTPError as e:
+        metrics.upstream_errors.inc("live", type(e).__name__)
+        if _is_upstream_failure(e):
+            live_breaker.record_failure(probe)
+        else:
+            live_breaker.record_success(probe)
+        raise LiveDataError(str(e)) from e
+    finally:
+        live_breaker.release(probe)
+        metrics.upstream_request_duration.observe(time.perf_counter() - start, "live")
+    live_breaker.record_success(probe)
+    return page.content
+
+
+async def get_live_arrivals(bus_stop_id: str) -> list[dict]:
+    """
+    Fetch and parse upcoming arrivals for a bus stop.
+
+    Args:
+        bus_stop_id: The bus stop identifier (e.g., "GAMBE1")
+
+    Returns:
+        list[dict]: Upcoming bus passages
+
+    Raises:
+        LiveDataError: If the upstream page cannot be fetched
+    """
+    content = await fetch_live_page(bus_stop_id)
+    start = time.perf_counter()
+    arrivals = parse_live_page(content)
+    metrics.live_parse_duration.observe(time.perf_counter() - start)
+    return arrivals
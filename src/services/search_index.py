@@ -0,0 +1,151 @@
+"""In-memory search index over bus stop names.
+
+Names are normalized (accents folded, case folded, punctuation dropped) and
+split into tokens. Query tokens find candidate stops through a trigram
+index (or a short-prefix index for one or two letter tokens), so lookups
+touch only the stops sharing letters with the query, not the whole catalogue.
+Candidates are ranked by how well each query token matches one of their
+tokens: exact, prefix, substring, then trigram similarity for typos.
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterable
+
+# Score of a query token against a name token, by kind of match
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+SUBSTRING_SCORE = 0.7
+TYPO_SCORE = 0.6  # multiplied by the trigram similarity
+# Minimum trigram similarity (Dice coefficient) for a typo to match
+TYPO_MIN_SIMILARITY = 0.45
+# Bonus when the whole normalized name starts with the normalized query
+NAME_PREFIX_BONUS = 0.5
+SHORT_TOKEN_LENGTH = 2
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Fold accents and case, and replace punctuation with spaces.
+
+    Example:
+        normalize("Université - Jacob") == "universite jacob"
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", stripped).strip()
+
+
+def trigrams(token: str, padded: bool = True) -> set[str]:
+    """Character trigrams of a token, padded with `$` at both ends by default."""
+    if padded:
+        token = f"${token}$"
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def _similarity(left: set[str], right: set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+class StopSearchIndex:
+    """Immutable search index built from a list of bus stops."""
+
+    def __init__(self, bus_stops: Iterable[dict]):
+        self._stops: list[dict] = []
+        self._names: list[str] = []
+        self._tokens: list[tuple[str, ...]] = []
+        self._token_trigrams: list[tuple[set[str], ...]] = []
+        self._trigram_postings: dict[str, set[int]] = {}
+        self._prefix_postings: dict[str, set[int]] = {}
+
+        for position, bus_stop in enumerate(bus_stops):
+            name = normalize(bus_stop["name"] or "")
+            tokens = tuple(dict.fromkeys(name.split()))
+            self._stops.append(bus_stop)
+            self._names.append(name)
+            self._tokens.append(tokens)
+            self._token_trigrams.append(tuple(trigrams(token) for token in tokens))
+            for token in tokens:
+                for trigram in trigrams(token):
+                    self._trigram_postings.setdefault(trigram, set()).add(position)
+                for length in range(1, SHORT_TOKEN_LENGTH + 1):
+                    self._prefix_postings.setdefault(token[:length], set()).add(position)
+
+    def __len__(self) -> int:
+        return len(self._stops)
+
+    def _candidates(self, query_token: str) -> set[int]:
+        """Stops that may match a query token."""
+        if len(query_token) <= SHORT_TOKEN_LENGTH:
+            return self._prefix_postings.get(query_token, set())
+        # Unpadded trigrams so tokens containing the query in the middle match
+        query_trigrams = trigrams(query_token, padded=False)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._trigram_postings.get(trigram, ()))
+        # Half the trigrams must be shared, which still lets typos through
+        needed = max(1, len(query_trigrams) // 2)
+        return {position for position, count in shared.items() if count >= needed}
+
+    def _token_score(self, position: int, query_token: str, query_trigrams: set[str]) -> float:
+        """Best score of a query token against the tokens of one stop."""
+        best = 0.0
+        for token, token_trigrams in zip(self._tokens[position], self._token_trigrams[position]):
+            if token == query_token:
+                return EXACT_SCORE
+            if token.startswith(query_token):
+                best = max(best, PREFIX_SCORE)
+            elif query_token in token:
+                best = max(best, SUBSTRING_SCORE)
+            elif len(query_token) > SHORT_TOKEN_LENGTH:
+                similarity = _similarity(query_trigrams, token_trigrams)
+                if similarity >= TYPO_MIN_SIMILARITY:
+                    best = max(best, TYPO_SCORE * similarity)
+        return best
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """
+        Return the best matching stops for a query, best first.
+
+        Every query token must match a token of the stop name (exactly, as a
+        prefix, as a substring or with a typo).
+
+        Args:
+            query: Free text, e.g. "universite jac"
+            limit: Maximum number of results
+
+        Returns:
+            list[dict]: Matching bus stops ({"id", "name"})
+        """
+        normalized = normalize(query)
+        query_tokens = list(dict.fromkeys(normalized.split()))
+        if not query_tokens or limit <= 0:
+            return []
+
+        candidates = None
+        for query_token in query_tokens:
+            token_candidates = self._candidates(query_token)
+            candidates = token_candidates if candidates is None else candidates & token_candidates
+            if not candidates:
+                return []
+
+        query_trigrams = {query_token: trigrams(query_token) for query_token in query_tokens}
+        scored = []
+        for position in candidates:
+            score = 0.0
+            for query_token in query_tokens:
+                token_score = self._token_score(position, query_token, query_trigrams[query_token])
+                if not token_score:
+                    break
+                score += token_score
+            else:
+                if self._names[position].startswith(normalized):
+                    score += NAME_PREFIX_BONUS
+                scored.append((-score, len(self._names[position]), self._names[position], position))
+
+        scored.sort()
+        return [self._stops[position] for *_, position in scored[:limit]]
@@ -0,0 +1,140 @@
+"""Pre-serialized, pre-compressed bodies of the static network routes.
+
+Static responses only change with the network snapshot, so each one is
+serialized to JSON once per snapshot version, compressed once with gzip and
+brotli (when the optional `brotli` package is installed), and kept as bytes.
+A request then only picks the variant matching its Accept-Encoding.
+"""
+import gzip
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Optional
+
+from core import config
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass(frozen=True)
+class RenderedBody:
+    """A JSON body and its compressed variants (only those that are smaller)."""
+    identity: bytes
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def select(self, accept_encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        """Return the body to send and its Content-Encoding (None for identity)."""
+        encoding = negotiate_encoding(accept_encoding, self.encoded)
+        if encoding is None:
+            return self.identity, None
+        return self.encoded[encoding], encoding
+
+
+def render(content: Any) -> RenderedBody:
+    """
+    Serialize content like FastAPI's JSONResponse and compress it.
+
+    Args:
+        content: JSON-compatible value (tuples become arrays)
+
+    Returns:
+        RenderedBody: Identity bytes plus gzip/brotli variants
+    """
+    identity = json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+    variants = {"gzip": gzip.compress(identity, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(identity, quality=11)
+    return RenderedBody(
+        identity=identity,
+        encoded={name: body for name, body in variants.items() if len(body) < len(identity)},
+    )
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Pick the preferred encoding among the available ones.
+
+    Codings with q=0 are refused; otherwise our own preference order
+    (brotli, then gzip) wins over the client's q-values.
+    """
+    if not accept_encoding or not available:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class StaticResponseCache:
+    """LRU of rendered bodies for the current snapshot version."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._version: Optional[str] = None
+        self._bodies: OrderedDict[Hashable, RenderedBody] = OrderedDict()
+        self.renders = 0
+
+    def get(self, version: str, key: Hashable, content: Any) -> RenderedBody:
+        """
+        Return the rendered body for a route and key, rendering it on first use.
+
+        Empty results share a single entry, so unknown ids do not fill the
+        cache.
+
+        Args:
+            version: Snapshot version the content comes from
+            key: Route and parameter identifying the response
+            content: The response content (only rendered on a miss)
+
+        Returns:
+            RenderedBody: Cached serialized body
+        """
+        if version != self._version:
+            self._bodies.clear()
+            self._version = version
+        if not content:
+            key = ("empty", type(content).__name__)
+
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+            return body
+
+        body = render(content)
+        self.renders += 1
+        self._bodies[key] = body
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+        return body
+
+    def stats(self) -> dict:
+        """Cached entry count and number of renders since startup."""
+        return {
+            "version": self._version,
+            "entries": len(self._bodies),
+            "max_entries": self.max_entries,
+            "renders": self.renders,
+            "encodings": list(ENCODINGS),
+        }
+
+
+static_responses = StaticResponseCache(config.STATIC_RESPONSE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,79 @@
+"""Typeahead over bus stop names backed by sorted prefix arrays.
+
+Each stop is indexed under its normalized full name and under every suffix
+starting at a word boundary ("universite jacob" and "jacob"), in two sorted
+arrays. A query is a binary search followed by a scan of at most `limit`
+matching keys per array; suggestions (with lines and directions) are built
+once when the index is created, so a lookup allocates almost nothing.
+"""
+from bisect import bisect_left
+from typing import Iterable, Mapping
+
+from services.search_index import normalize
+
+
+class StopSuggestIndex:
+    """Immutable prefix index returning ready-made stop suggestions."""
+
+    def __init__(
+        self,
+        bus_stops: Iterable[dict],
+        buses_by_bus_stop: Mapping[str, tuple[str, ...]],
+        directions_by_bus_stop: Mapping[str, tuple[dict, ...]],
+    ):
+        self._suggestions: list[dict] = []
+        name_keys: list[tuple[str, int]] = []
+        word_keys: list[tuple[str, int]] = []
+
+        for position, bus_stop in enumerate(bus_stops):
+            self._suggestions.append({
+                "id": bus_stop["id"],
+                "name": bus_stop["name"],
+                "lines": list(buses_by_bus_stop.get(bus_stop["id"], ())),
+                "directions": list(directions_by_bus_stop.get(bus_stop["id"], ())),
+            })
+            name = normalize(bus_stop["name"] or "")
+            name_keys.append((name, position))
+            words = name.split(" ")
+            for start in range(1, len(words)):
+                word_keys.append((" ".join(words[start:]), position))
+
+        name_keys.sort()
+        word_keys.sort()
+        # Parallel arrays: keys for bisect, positions for the result
+        self._name_keys = [key for key, _ in name_keys]
+        self._name_positions = [position for _, position in name_keys]
+        self._word_keys = [key for key, _ in word_keys]
+        self._word_positions = [position for _, position in word_keys]
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    @staticmethod
+    def _scan(keys: list[str], positions: list[int], prefix: str, found: dict, limit: int):
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and len(found) < limit and keys[index].startswith(prefix):
+            found.setdefault(positions[index], None)
+            index += 1
+
+    def suggest(self, query: str, limit: int) -> list[dict]:
+        """
+        Return up to `limit` stops whose name (or a word of it) starts with query.
+
+        Stops whose full name matches come first, in alphabetical order, then
+        stops matching on a later word.
+
+        Args:
+            query: What the user typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            list[dict]: Suggestions with id, name, lines and directions
+        """
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        found: dict[int, None] = {}
+        self._scan(self._name_keys, self._name_positions, prefix, found, limit)
+        self._scan(self._word_keys, self._word_positions, prefix, found, limit)
+        return [self._suggestions[position] for position in found]
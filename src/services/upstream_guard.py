@@ -0,0 +1,193 @@
+"""Protection of the Synchro-Bus live website: circuit breaker and rate limit.
+
+The circuit breaker stops calling the upstream after repeated failures and
+fails fast instead, so requests don't each wait for a timeout while the
+site is down. After a recovery delay a single probe request is let through
+(half-open); its outcome closes the circuit or opens it again.
+
+The token bucket caps the rate of outbound requests across the process, so
+a burst of cache misses cannot hammer the upstream. A request waits a
+bounded time for a token and is rejected past that.
+"""
+import asyncio
+import time
+
+from core import config, metrics
+from core.logging_config import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamRejectedError(Exception):
+    """Raised instead of calling the upstream (circuit open or rate limited)."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds the circuit stays open before a probe
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 if calls are allowed)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+
+    def before_call(self) -> bool:
+        """
+        Check that a call may go through.
+
+        Returns:
+            bool: True if the call is the half-open probe; pass it back to
+            record_success, record_failure or release when the call ends
+
+        Raises:
+            UpstreamRejectedError: If the circuit is open, or half-open
+            with its probe already in flight
+        """
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self._reject()
+            self.state = HALF_OPEN
+            logger.info("Upstream circuit half-open, probing")
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject()
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, probe: bool = False):
+        if self.state != CLOSED:
+            logger.info("Upstream circuit closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.release(probe)
+
+    def record_failure(self, probe: bool = False):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"Upstream circuit opened after {self.failures} failures "
+                    f"(retry in {self.recovery_timeout:.0f}s)"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        self.release(probe)
+
+    def release(self, probe: bool):
+        """
+        End a call, e.g. one cancelled without a verdict.
+
+        Only the probe frees the half-open slot: calls let through while
+        the circuit was closed may end during a probe without allowing
+        another one.
+        """
+        if probe:
+            self._probing = False
+
+    def _reject(self):
+        self.rejected += 1
+        metrics.upstream_rejected.inc("circuit_open")
+        retry_after = self.retry_after() or self.recovery_timeout
+        raise UpstreamRejectedError(
+            f"Synchro-Bus indisponible, nouvel essai dans {retry_after:.0f} s", retry_after
+        )
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+            "rejected": self.rejected,
+        }
+
+
+class TokenBucket:
+    """
+    Token bucket shared by all outbound requests of the process.
+
+    Args:
+        rate: Tokens added per second (0 disables the limit)
+        burst: Maximum tokens stored
+        max_wait: Longest a request may wait for a token, in seconds
+    """
+
+    def __init__(self, rate: float, burst: float, max_wait: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_wait = max_wait
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        Take a token, waiting for it if needed.
+
+        Tokens are reserved immediately (the count may go negative), so
+        concurrent waiters queue up in order without re-checking.
+
+        Raises:
+            UpstreamRejectedError: If the wait would exceed max_wait
+        """
+        if self.rate <= 0:
+            return
+        self._refill(time.monotonic())
+        wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+        if wait > self.max_wait:
+            self.rejected += 1
+            metrics.upstream_rejected.inc("rate_limited")
+            raise UpstreamRejectedError(
+                "Trop de requêtes vers Synchro-Bus, réessayez plus tard", wait
+            )
+        self.tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> dict:
+        if self.rate > 0:
+            self._refill(time.monotonic())
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "rejected": self.rejected,
+        }
+
+
+live_breaker = CircuitBreaker(
+    config.UPSTREAM_BREAKER_FAILURES, config.UPSTREAM_BREAKER_RECOVERY
+)
+upstream_limiter = TokenBucket(
+    config.UPSTREAM_RATE_LIMIT, config.UPSTREAM_RATE_BURST, config.UPSTREAM_RATE_MAX_WAIT
+)
+
+
+def upstream_status() -> dict:
+    """Circuit breaker and rate limiter state."""
+    return {"circuit": live_breaker.stats(), "rate_limit": upstream_limiter.stats()}
@@ -0,0 +1,156 @@
+"""
+Shared test setup: databases built through the Alembic migrations, and
+the API served from one of them.
+
+The seeded databases hold NETWORK, a small network in the linesshape
+format, imported through the regular ingest code. Live routes read the
+local Synchro-Bus stand-in of benchmarks/fake_upstream.py, serving
+NETWORK and the sample live pages. Settings are read from the environment
+when core.config is imported, so they are set here, before any
+application module is imported.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent / "src" / "database"
+# Database of the API started by the client fixture
+DATABASE = Path(tempfile.mkdtemp(prefix="synchrobus-tests-")) / "api.sqlite"
+
+os.environ.update({
+    "DB_URL": f"sqlite:///{DATABASE}",
+    "NETWORK_SNAPSHOT_FILE": "",
+    "NETWORK_VERSION_POLL_INTERVAL": "3600",
+    "NETWORK_REFRESH_INTERVAL": "0",
+    "LIVE_PREFETCH_ENABLED": "false",
+    "LIVE_CACHE_BACKEND": "memory",
+    "LOG_QUEUE": "false",
+    "LOG_LEVEL": "WARNING",
+    "ACCESS_LOG_SAMPLE_RATE": "0",
+})
+
+
+def _line(*stops: tuple[str, str]) -> list[dict]:
+    """Both directions of a line through stops, named after their terminus."""
+    points = [{"id": bus_stop_id, "name": name} for bus_stop_id, name in stops]
+    return [
+        {"display": stops[-1][1].upper(), "stopPoints": points},
+        {"display": stops[0][1].upper(), "stopPoints": points[::-1]},
+    ]
+
+
+# Line identifier to its directions, as returned by linesshape
+NETWORK = {
+    "A": _line(
+        ("GARE1", "Gare"), ("GAMBE1", "Gambetta"), ("CURIA1", "Curial"),
+        ("MAIRI1", "Mairie"), ("UJACO1", "Université Jacob"),
+    ),
+    "B": _line(
+        ("BISSY1", "Bissy"), ("GAMBE1", "Gambetta"), ("GARE1", "Gare"),
+        ("LANDI1", "Landiers"), ("CHAMN1", "Chamnord"),
+    ),
+    "C": _line(("COGNI1", "Cognin"), ("GARE1", "Gare"), ("VERNE1", "Verney"), ("BARBE1", "Barberaz")),
+    "D": _line(
+        ("BASSE1", "Bassens"), ("CURIA1", "Curial"), ("LYCEE1", "Lycée"),
+        ("HOPIT1", "Hôpital"), ("TECHN1", "Technolac"), ("PLAGE1", "Plage"),
+    ),
+}
+
+
+def migrate(path: Path) -> str:
+    """
+    Create a SQLite database at path with the Alembic migrations.
+
+    Args:
+        path: SQLite file to create
+
+    Returns:
+        str: Database URL
+    """
+    url = f"sqlite:///{path}"
+    alembic_config = Config(str(DATABASE_DIR / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(DATABASE_DIR / "alembic"))
+    alembic_config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(alembic_config, "head")
+    return url
+
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    """Engine on an empty database at the latest migration."""
+    engine = create_engine(migrate(tmp_path / "migrated.sqlite"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def seeded_template(tmp_path_factory) -> Path:
+    """A migrated database holding NETWORK (do not modify)."""
+    from services.ingest_service import synchronize, transform
+
+    path = tmp_path_factory.mktemp("template") / "network.sqlite"
+    engine = create_engine(migrate(path))
+    try:
+        with Session(engine) as session:
+            synchronize(session, transform(NETWORK))
+    finally:
+        engine.dispose()
+    return path
+
+
+@pytest.fixture
+def network_session(seeded_template, tmp_path):
+    """Session on a private copy of the seeded database, with its own engine."""
+    path = tmp_path / "network.sqlite"
+    shutil.copy(seeded_template, path)
+    engine = create_engine(f"sqlite:///{path}")
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(seeded_template):
+    """TestClient of the API, started on a copy of the seeded database."""
+    from fastapi.testclient import TestClient
+
+    shutil.copy(seeded_template, DATABASE)
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def fake_upstream():
+    """Local stand-in for Synchro-Bus, without latency or errors."""
+    from fake_upstream import make_handler
+    from fixtures import live_pages
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(NETWORK, live_pages(), 0, 0, 0))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def live_client(client, fake_upstream, monkeypatch):
+    """API client whose live routes read the fake upstream, starting with an empty cache."""
+    from core import config
+    from services.live_cache import live_cache
+
+    monkeypatch.setattr(config, "SYNCHROBUS_LIVE_URL", fake_upstream)
+    live_cache.clear()
+    yield client
+    live_cache.clear()
@@ -0,0 +1,107 @@
+"""Live cache shared between workers through the SQLite and Redis backends."""
+import asyncio
+import time
+
+import pytest
+
+from fake_redis import Store, make_handler
+from services.cache_backends import RedisBackend, SQLiteBackend
+from services.live_cache import LiveCache
+
+TTL = 5
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, key: str) -> list[dict]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [{"line": "A", "stop": key}]
+
+
+async def _backends(kind: str, tmp_path):
+    """Two backend connections to one store, as two workers would open."""
+    if kind == "sqlite":
+        path = str(tmp_path / "live_cache.sqlite")
+        return (SQLiteBackend(path), SQLiteBackend(path)), None
+    server = await asyncio.start_server(make_handler(Store()), "127.0.0.1", 0)
+    url = f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0"
+    return (RedisBackend(url), RedisBackend(url)), server
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_workers_share_one_upstream_fetch(kind, tmp_path):
+    async def scenario():
+        backends, server = await _backends(kind, tmp_path)
+        loaders = (CountingLoader(), CountingLoader())
+        workers = [
+            LiveCache(loader, ttl=TTL, max_entries=10, backend=backend, lock_timeout=2)
+            for loader, backend in zip(loaders, backends)
+        ]
+        try:
+            results = await asyncio.gather(*(worker.get("GAMBE1") for worker in workers))
+            later = await workers[1].get("GARE1"), await workers[0].get("GARE1")
+        finally:
+            for worker in workers:
+                await worker.close()
+            if server is not None:
+                server.close()
+        return loaders, workers, results, later
+
+    loaders, workers, results, later = asyncio.run(scenario())
+
+    assert sum(loader.calls for loader in loaders) == 2
+    assert sorted(result.status for result in results) == ["HIT", "MISS"]
+    assert results[0].value == results[1].value == [{"line": "A", "stop": "GAMBE1"}]
+    assert [result.status for result in later] == ["MISS", "HIT"]
+    assert workers[0].shared_hits + workers[1].shared_hits == 2
+
+
+def test_unreachable_backend_falls_back_to_local_loading():
+    async def scenario():
+        loader = CountingLoader()
+        cache = LiveCache(loader, ttl=TTL, max_entries=10, backend=RedisBackend("redis://127.0.0.1:1/0"))
+        try:
+            return loader, cache, await cache.get("GAMBE1")
+        finally:
+            await cache.close()
+
+    loader, cache, result = asyncio.run(scenario())
+
+    assert result.status == "MISS"
+    assert loader.calls == 1
+    assert cache.backend_errors == 1
+
+
+async def _store_garbage(backend, key: str):
+    if isinstance(backend, SQLiteBackend):
+        await asyncio.to_thread(
+            backend._execute, "INSERT INTO live_cache VALUES (?, ?, ?, ?)",
+            (key, "{not json", time.time(), time.time() + TTL),
+        )
+    else:
+        await backend.command("SET", backend.prefix + key, "{not json")
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_unreadable_entry_falls_back_to_local_loading(kind, tmp_path):
+    async def scenario():
+        (backend, _), server = await _backends(kind, tmp_path)
+        loader = CountingLoader()
+        cache = LiveCache(loader, ttl=TTL, max_entries=10, backend=backend)
+        try:
+            await _store_garbage(backend, "GAMBE1")
+            return loader, cache, await cache.get("GAMBE1")
+        finally:
+            await cache.close()
+            if server is not None:
+                server.close()
+
+    loader, cache, result = asyncio.run(scenario())
+
+    assert result.status == "MISS"
+    assert result.value == [{"line": "A", "stop": "GAMBE1"}]
+    assert loader.calls == 1
+    assert cache.backend_errors == 1
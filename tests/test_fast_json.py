@@ -0,0 +1,59 @@
+"""FAST_JSON: same bodies and headers without the second validation pass."""
+import pytest
+
+from core import config
+from services.live_cache import live_cache
+
+
+@pytest.mark.parametrize("url", [
+    "/v1/bus_stop/search/gare",
+    "/v1/bus_stop/search/universite",
+    "/v1/bus_stop/suggest?q=ga",
+])
+def test_dynamic_routes_do_not_depend_on_fast_json(client, monkeypatch, url):
+    monkeypatch.setattr(config, "FAST_JSON", False)
+    standard = client.get(url)
+    monkeypatch.setattr(config, "FAST_JSON", True)
+    fast = client.get(url)
+
+    assert standard.status_code == fast.status_code == 200
+    assert fast.json() == standard.json() != []
+    assert fast.headers["ETag"] == standard.headers["ETag"]
+    assert fast.headers["Cache-Control"] == standard.headers["Cache-Control"]
+
+
+@pytest.mark.parametrize("url", [
+    "/v1/bus_stop/?limit=5",
+    "/v1/direction/?limit=3&fields=id",
+])
+def test_pages_do_not_depend_on_fast_json(client, monkeypatch, url):
+    monkeypatch.setattr(config, "FAST_JSON", False)
+    standard = client.get(url)
+    monkeypatch.setattr(config, "FAST_JSON", True)
+    fast = client.get(url)
+
+    assert standard.status_code == fast.status_code == 200
+    assert fast.json() == standard.json() != []
+    for header in ("ETag", "X-Next-Cursor", "Link"):
+        assert fast.headers[header] == standard.headers[header]
+
+
+def test_live_headers_are_kept_in_fast_mode(client, monkeypatch):
+    arrivals = [{"line": "A", "direction": "Gare", "time": "14:26", "remaining": "3 min"}]
+
+    async def loader(bus_stop_id: str) -> list[dict]:
+        return arrivals
+
+    monkeypatch.setattr(config, "FAST_JSON", True)
+    monkeypatch.setattr(live_cache, "_loader", loader)
+    live_cache.clear()
+    try:
+        response = client.get("/v1/bus_stop/live/GAMBE1")
+    finally:
+        live_cache.clear()
+
+    assert response.status_code == 200
+    # No departure to count down from, so no minutes either
+    assert response.json() == [{**arrival, "minutes": None} for arrival in arrivals]
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
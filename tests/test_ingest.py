@@ -0,0 +1,90 @@
+"""Network ingestion: deduplication and incremental synchronize."""
+import copy
+
+from sqlalchemy import event
+
+from conftest import NETWORK
+from services.ingest_service import load_current, synchronize, transform
+from services.network_snapshot import read_dataset_version
+
+_TABLES = (
+    "buses", "directions", "bus_stops",
+    "bus_directions", "bus_stop_buses", "bus_stop_directions",
+)
+
+
+def _as_sets(data) -> dict:
+    return {
+        table: set(rows.items()) if isinstance(rows, dict) else set(rows)
+        for table, rows in ((table, getattr(data, table)) for table in _TABLES)
+    }
+
+
+def test_transform_keeps_each_entity_and_link_once():
+    data = transform(NETWORK)
+
+    assert data.buses == ["A", "B", "C", "D"]
+    assert data.directions[:2] == ["Université jacob", "Gare"]
+    assert len(data.bus_stops) == 16
+    # Stops shared by several lines are linked to each of them
+    assert [bus for bus_stop_id, bus in data.bus_stop_buses if bus_stop_id == "GARE1"] == ["A", "B", "C"]
+    for table in _TABLES:
+        rows = getattr(data, table)
+        assert len(set(rows)) == len(rows), table
+
+
+def test_seeded_database_holds_the_upstream_network(network_session):
+    assert read_dataset_version(network_session) == 1
+    assert _as_sets(load_current(network_session)) == _as_sets(transform(NETWORK))
+
+
+def test_synchronize_without_changes_keeps_the_version(network_session):
+    report = synchronize(network_session, transform(NETWORK))
+
+    assert report["changed"] is False
+    assert report["version"] == 1
+    assert read_dataset_version(network_session) == 1
+
+
+def test_synchronize_applies_only_the_difference(network_session):
+    shapes = copy.deepcopy(NETWORK)
+    del shapes["D"]
+    renamed = shapes["A"][0]["stopPoints"][0]
+    renamed["name"] = "Nouveau nom"
+    shapes["A"][0]["stopPoints"].append({"id": "NEWSTOP1", "name": "Nouvel arrêt"})
+    upstream = transform(shapes)
+
+    report = synchronize(network_session, upstream)
+
+    assert report["changed"] is True
+    assert report["version"] == 2
+    assert report["deleted"]["buses"] == 1
+    assert report["inserted"]["bus_stops"] == 1
+    assert report["renamed_bus_stops"] == 1
+    assert read_dataset_version(network_session) == 2
+    current = load_current(network_session)
+    # Renamed stops keep their id; the first name seen upstream wins
+    assert current.bus_stops[renamed["id"]] == upstream.bus_stops[renamed["id"]]
+    assert _as_sets(current) == _as_sets(upstream)
+
+
+def test_link_deletes_run_once_per_table(network_session):
+    shapes = copy.deepcopy(NETWORK)
+    del shapes["D"]
+    deletes = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM"):
+            deletes.append((statement.split()[2], executemany))
+
+    event.listen(network_session.get_bind(), "before_cursor_execute", record)
+    try:
+        synchronize(network_session, transform(shapes))
+    finally:
+        event.remove(network_session.get_bind(), "before_cursor_execute", record)
+
+    links = [entry for entry in deletes if entry[0] in ("bus_direction", "bus_stop_bus", "bus_stop_direction")]
+    # Line D has several rows in each junction table
+    assert sorted(links) == [
+        ("bus_direction", True), ("bus_stop_bus", True), ("bus_stop_direction", True),
+    ]
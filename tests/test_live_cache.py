@@ -0,0 +1,171 @@
+"""Live cache: TTL, LRU bound, single-flight loading, STALE and FALLBACK entries."""
+import asyncio
+
+import pytest
+
+from services.live_cache import LiveCache
+from services.prefetcher import LivePrefetcher
+from services.scraper_service import LiveDataError
+
+TTL = 0.1
+STALE_TTL = 0.3
+FALLBACK_TTL = 0.8
+
+
+class CountingLoader:
+    """Loader returning numbered arrivals, or failing while `failing` is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+
+    async def __call__(self, key: str) -> list[dict]:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.failing:
+            raise LiveDataError("upstream down")
+        return [{"line": "A", "call": self.calls}]
+
+
+def _cache(loader: CountingLoader, max_entries: int = 10) -> LiveCache:
+    return LiveCache(loader, ttl=TTL, max_entries=max_entries)
+
+
+def test_miss_then_hit_until_the_ttl_expires():
+    async def scenario():
+        loader = CountingLoader()
+        cache = _cache(loader)
+
+        first = await cache.get("GAMBE1")
+        hit = await cache.get("GAMBE1")
+        await asyncio.sleep(TTL * 1.5)
+        expired = await cache.get("GAMBE1")
+        return loader, first, hit, expired
+
+    loader, first, hit, expired = asyncio.run(scenario())
+
+    assert (first.status, hit.status, expired.status) == ("MISS", "HIT", "MISS")
+    assert hit.value == first.value
+    assert expired.value == [{"line": "A", "call": 2}]
+    assert loader.calls == 2
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        loader = CountingLoader()
+        cache = _cache(loader)
+        results = await asyncio.gather(*(cache.get("GARE1") for _ in range(10)))
+        return loader, cache, results
+
+    loader, cache, results = asyncio.run(scenario())
+
+    assert loader.calls == 1
+    assert cache.coalesced == 9
+    assert all(result.status == "MISS" for result in results)
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def scenario():
+        loader = CountingLoader()
+        cache = _cache(loader, max_entries=2)
+        await cache.get("GAMBE1")
+        await cache.get("GARE1")
+        await cache.get("GAMBE1")
+        await cache.get("UJACO1")
+        return loader, cache, await cache.get("GAMBE1"), await cache.get("GARE1")
+
+    loader, cache, kept, evicted = asyncio.run(scenario())
+
+    assert (kept.status, evicted.status) == ("HIT", "MISS")
+    assert cache.evictions == 2
+    assert cache.stats()["entries"] == 2
+
+
+def test_stale_entry_is_served_while_refreshing():
+    async def scenario():
+        loader = CountingLoader()
+        cache = LiveCache(loader, ttl=TTL, max_entries=10, stale_ttl=STALE_TTL)
+
+        first = await cache.get("GAMBE1")
+        await asyncio.sleep(TTL * 1.5)
+        stale = await cache.get("GAMBE1")
+        # The stale read started a background refresh; let it finish
+        await asyncio.sleep(0.05)
+        refreshed = await cache.get("GAMBE1")
+        await asyncio.sleep(TTL + STALE_TTL)
+        expired = await cache.get("GAMBE1")
+        return loader, first, stale, refreshed, expired
+
+    loader, first, stale, refreshed, expired = asyncio.run(scenario())
+
+    assert (stale.status, refreshed.status, expired.status) == ("STALE", "HIT", "MISS")
+    assert stale.value == first.value
+    assert stale.age >= TTL
+    assert refreshed.value == [{"line": "A", "call": 2}]
+    assert loader.calls == 3
+
+
+def test_hottest_follows_decayed_demand():
+    async def scenario():
+        cache = _cache(CountingLoader())
+        for key in ("GARE1", "GAMBE1", "GAMBE1", "UJACO1", "GAMBE1", "UJACO1"):
+            await cache.get(key)
+        hottest = cache.hottest(2)
+        cache.decay_demand(factor=0.001)
+        return hottest, cache.hottest(2)
+
+    hottest, decayed = asyncio.run(scenario())
+
+    assert hottest == ["GAMBE1", "UJACO1"]
+    assert decayed == []
+
+
+def test_prefetch_skips_one_off_and_failing_stops():
+    async def scenario():
+        loader = CountingLoader()
+        cache = _cache(loader)
+        for key in ("GAMBE1", "GAMBE1", "GARE1"):
+            await cache.get(key)
+        loader.failing = True
+        for _ in range(2):
+            with pytest.raises(LiveDataError):
+                await cache.get("UJACO1")
+        prefetcher = LivePrefetcher(cache, interval=TTL, hot_stops=10, budget=10, min_demand=2)
+        return prefetcher.due_stops()
+
+    # GARE1 was requested once, UJACO1 has nothing cached to refresh
+    assert asyncio.run(scenario()) == ["GAMBE1"]
+
+
+def test_failed_load_is_not_cached():
+    async def scenario():
+        loader = CountingLoader()
+        cache = _cache(loader)
+        loader.failing = True
+        with pytest.raises(LiveDataError):
+            await cache.get("GAMBE1")
+        loader.failing = False
+        return await cache.get("GAMBE1")
+
+    assert asyncio.run(scenario()).status == "MISS"
+
+
+def test_failed_load_falls_back_to_last_known_arrivals():
+    async def scenario():
+        loader = CountingLoader()
+        cache = LiveCache(loader, ttl=TTL, max_entries=10, stale_ttl=STALE_TTL, fallback_ttl=FALLBACK_TTL)
+        known = await cache.get("UJACO1")
+        await asyncio.sleep(TTL + STALE_TTL)
+        loader.failing = True
+        fallback = await cache.get("UJACO1")
+        await asyncio.sleep(FALLBACK_TTL)
+        with pytest.raises(LiveDataError):
+            await cache.get("UJACO1")
+        return cache, known, fallback
+
+    cache, known, fallback = asyncio.run(scenario())
+
+    assert fallback.status == "FALLBACK"
+    assert fallback.value == known.value
+    assert fallback.age >= TTL + STALE_TTL
+    assert cache.fallbacks == 1
@@ -0,0 +1,69 @@
+"""Live routes served through the cache from a fake Synchro-Bus."""
+from services.live_cache import live_cache
+
+
+def _as_fetched(arrivals: list[dict]) -> list[dict]:
+    """Arrivals without minutes, which are computed per response."""
+    return [{key: value for key, value in arrival.items() if key != "minutes"} for arrival in arrivals]
+
+
+def test_live_arrivals_are_cached(live_client):
+    before = live_cache.stats()
+
+    miss = live_client.get("/v1/bus_stop/live/GAMBE1")
+    hit = live_client.get("/v1/bus_stop/live/GAMBE1")
+
+    assert miss.status_code == hit.status_code == 200
+    assert (miss.headers["X-Cache"], hit.headers["X-Cache"]) == ("MISS", "HIT")
+    assert _as_fetched(hit.json()) == _as_fetched(miss.json())
+    assert hit.headers["Cache-Control"].startswith("public, max-age=")
+    after = live_cache.stats()
+    assert (after["misses"], after["hits"]) == (before["misses"] + 1, before["hits"] + 1)
+
+
+def test_arrivals_carry_minutes_until_departure(live_client):
+    arrivals = live_client.get("/v1/bus_stop/live/GARE1").json()
+
+    assert arrivals
+    for arrival in arrivals:
+        assert set(arrival) == {"line", "direction", "time", "remaining", "minutes", "departure"}
+        assert arrival["minutes"] is None or arrival["minutes"] >= 0
+
+
+def test_filters_share_the_cached_entry(live_client):
+    everything = live_client.get("/v1/bus_stop/live/GARE1").json()
+    line = everything[0]["line"]
+
+    filtered = live_client.get(f"/v1/bus_stop/live/GARE1?line={line}&limit=1")
+
+    assert filtered.headers["X-Cache"] == "HIT"
+    assert _as_fetched(filtered.json()) == _as_fetched(everything[:1])
+
+
+def test_max_minutes_keeps_arrivals_due_in_time(live_client):
+    everything = live_client.get("/v1/bus_stop/live/GARE1").json()
+    horizon = sorted(arrival["minutes"] for arrival in everything if arrival["minutes"] is not None)[0]
+
+    soon = live_client.get(f"/v1/bus_stop/live/GARE1?max_minutes={horizon}").json()
+
+    assert soon
+    assert all(arrival["minutes"] is not None and arrival["minutes"] <= horizon for arrival in soon)
+    assert _as_fetched(soon) == _as_fetched([
+        arrival for arrival in everything if arrival["minutes"] is not None and arrival["minutes"] <= horizon
+    ])
+
+
+def test_unknown_direction_is_not_found(live_client):
+    assert live_client.get("/v1/bus_stop/live/GARE1?direction_id=999").status_code == 404
+
+
+def test_batch_returns_every_stop(live_client):
+    live_client.get("/v1/bus_stop/live/GAMBE1")
+
+    response = live_client.get("/v1/bus_stop/live?ids=GAMBE1,GARE1,GAMBE1")
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert list(batch) == ["GAMBE1", "GARE1"]
+    assert (batch["GAMBE1"]["cache"], batch["GARE1"]["cache"]) == ("HIT", "MISS")
+    assert all(entry["error"] is None and entry["arrivals"] for entry in batch.values())
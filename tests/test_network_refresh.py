@@ -0,0 +1,44 @@
+"""Network refresh lease shared by every worker using the database."""
+from sqlalchemy import delete
+
+from database.Database import timed_session
+from database.Table import NetworkRefreshLease
+from services.network_refresh import _claim_lease, _release_lease
+
+
+def test_lease_is_held_by_one_refresh_at_a_time(client):
+    assert _claim_lease("first", min_age=0) is True
+    try:
+        assert _claim_lease("second", min_age=0) is False
+        # Only the owner can give the lease back
+        _release_lease("second", refreshed=True)
+        assert _claim_lease("second", min_age=0) is False
+    finally:
+        _release_lease("first", refreshed=False)
+
+    assert _claim_lease("second", min_age=0) is True
+    _release_lease("second", refreshed=False)
+
+
+def test_recent_refresh_skips_the_scheduled_one(client):
+    assert _claim_lease("manual", min_age=0) is True
+    _release_lease("manual", refreshed=True)
+
+    assert _claim_lease("scheduled", min_age=60) is False
+    assert _claim_lease("scheduled", min_age=0) is True
+    _release_lease("scheduled", refreshed=False)
+
+
+def test_missing_lease_row_is_recreated(client):
+    session = timed_session()
+    try:
+        session.execute(delete(NetworkRefreshLease))
+        session.commit()
+    finally:
+        session.close()
+
+    assert _claim_lease("first", min_age=0) is True
+    assert _claim_lease("second", min_age=0) is False
+    _release_lease("first", refreshed=False)
+    assert _claim_lease("second", min_age=0) is True
+    _release_lease("second", refreshed=False)
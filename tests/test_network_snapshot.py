@@ -0,0 +1,130 @@
+"""Network snapshot: loading from the database and files, and version polling."""
+import copy
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from conftest import DATABASE, NETWORK
+from database.Database import get_async_engine
+from services.ingest_service import synchronize, transform
+from services.network_snapshot import (
+    SnapshotWatcher,
+    build_snapshot,
+    get_snapshot,
+    read_dataset_version,
+    read_snapshot_file,
+    reload_snapshot,
+    reload_snapshot_async,
+    snapshot_from_tables,
+    write_snapshot_file,
+)
+
+
+def _tables(**overrides) -> dict:
+    tables = {
+        "dataset_version": 1,
+        "buses": ["A", "B"],
+        "directions": [(1, "Gare"), (2, "Université")],
+        "bus_stops": [("GARE1", "Gare"), ("GAMBE1", "Gambetta"), ("UJACO1", "Université Jacob")],
+        # Link rows in another order than the tables
+        "bus_direction": [("B", 2), ("A", 2), ("A", 1)],
+        "bus_stop_direction": [("UJACO1", 2), ("GARE1", 1), ("GAMBE1", 1), ("GAMBE1", 2)],
+        "bus_stop_bus": [("UJACO1", "B"), ("GAMBE1", "B"), ("GAMBE1", "A"), ("GARE1", "A")],
+    }
+    return {**tables, **overrides}
+
+
+def test_links_follow_table_order():
+    snapshot = snapshot_from_tables(**_tables())
+
+    assert [d["id"] for d in snapshot.get_directions_by_bus("A")] == [1, 2]
+    assert snapshot.get_buses_by_direction(2) == ("A", "B")
+    assert [s["id"] for s in snapshot.get_bus_stops_by_direction(1)] == ["GARE1", "GAMBE1"]
+    assert snapshot.buses_by_bus_stop["GAMBE1"] == ("A", "B")
+    assert snapshot.get_bus_stops_by_direction("unknown") == ()
+
+
+def test_version_depends_on_content_only():
+    shuffled = _tables(bus_stop_bus=list(reversed(_tables()["bus_stop_bus"])), dataset_version=7)
+
+    assert snapshot_from_tables(**shuffled).version == snapshot_from_tables(**_tables()).version
+    renamed = _tables(bus_stops=[("GARE1", "Gare SNCF"), ("GAMBE1", "Gambetta"), ("UJACO1", "Université Jacob")])
+    assert snapshot_from_tables(**renamed).version != snapshot_from_tables(**_tables()).version
+
+
+def test_build_snapshot_reads_every_table(network_session):
+    upstream = transform(NETWORK)
+
+    snapshot = build_snapshot(network_session, read_dataset_version(network_session))
+
+    assert snapshot.dataset_version == 1
+    assert snapshot.buses == tuple(upstream.buses)
+    assert {s["id"]: s["name"] for s in snapshot.bus_stops} == upstream.bus_stops
+    assert [s["id"] for s in snapshot.bus_stops_by_direction[1]] == [
+        stop["id"] for stop in NETWORK["A"][0]["stopPoints"]
+    ]
+    assert snapshot.get_buses_by_direction(2) == ("A",)
+
+
+def test_snapshot_file_round_trip(network_session, tmp_path):
+    snapshot = build_snapshot(network_session, read_dataset_version(network_session))
+    path = tmp_path / "network.snapshot"
+
+    write_snapshot_file(snapshot, str(path))
+    loaded = read_snapshot_file(str(path))
+
+    assert loaded is not None
+    assert loaded.version == snapshot.version
+    assert loaded.dataset_version == snapshot.dataset_version
+    assert loaded.bus_stops == snapshot.bus_stops
+    assert dict(loaded.directions_by_bus_stop) == dict(snapshot.directions_by_bus_stop)
+
+
+def test_unusable_snapshot_files_are_ignored(tmp_path):
+    path = tmp_path / "network.snapshot"
+    assert read_snapshot_file(str(path)) is None
+
+    path.write_bytes(b"not a snapshot")
+    assert read_snapshot_file(str(path)) is None
+
+    write_snapshot_file(snapshot_from_tables(**_tables()), str(path))
+    path.write_bytes(path.read_bytes()[:-10])
+    assert read_snapshot_file(str(path)) is None
+
+
+def test_async_reload_matches_the_sync_reload(client):
+    assert get_async_engine() is not None
+
+    loaded = client.portal.call(reload_snapshot_async)
+
+    assert get_snapshot() is loaded
+    assert loaded.version == reload_snapshot().version
+
+
+def _synchronize_api_database(shapes: dict) -> dict:
+    engine = create_engine(f"sqlite:///{DATABASE}")
+    try:
+        with Session(engine) as session:
+            return synchronize(session, transform(shapes))
+    finally:
+        engine.dispose()
+
+
+def test_watcher_reloads_a_new_dataset_version(client):
+    # Checks run on the API's event loop, where its async engine lives
+    watcher = SnapshotWatcher(interval=3600)
+    original = get_snapshot()
+    shapes = copy.deepcopy(NETWORK)
+    del shapes["D"]
+
+    report = _synchronize_api_database(shapes)
+    try:
+        client.portal.call(watcher.check)
+        assert get_snapshot().dataset_version == report["version"]
+        assert client.get("/v1/bus/").json() == ["A", "B", "C"]
+    finally:
+        _synchronize_api_database(NETWORK)
+        client.portal.call(watcher.check)
+
+    assert get_snapshot().dataset_version == report["version"] + 1
+    assert get_snapshot().version == original.version
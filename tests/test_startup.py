@@ -0,0 +1,32 @@
+"""Application lifespan: background startup work."""
+import asyncio
+import logging
+
+from core.logging_config import logger
+
+
+def test_background_startup_failure_is_logged_when_it_happens(client, caplog, monkeypatch):
+    from main import _start_in_background
+
+    async def failing():
+        raise RuntimeError("database unreachable")
+
+    async def scenario():
+        task = _start_in_background(failing(), "database")
+        # Still running afterwards, like the API would be
+        await asyncio.sleep(0.01)
+        return task
+
+    # The Alembic fileConfig run by the test migrations disables existing loggers
+    monkeypatch.setattr(logger, "disabled", False)
+    logger.addHandler(caplog.handler)
+    try:
+        with caplog.at_level(logging.ERROR, logger=logger.name):
+            task = asyncio.run(scenario())
+    finally:
+        logger.removeHandler(caplog.handler)
+
+    assert task.done()
+    [record] = caplog.records
+    assert "(database)" in record.getMessage()
+    assert record.exc_info[1] is task.exception()
@@ -0,0 +1,94 @@
+"""Static network routes: ETag revalidation, pre-compressed bodies and keyset pagination."""
+import pytest
+
+
+def test_static_list_carries_etag_and_cache_control(client):
+    response = client.get("/v1/bus_stop/")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('"')
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+
+def test_matching_if_none_match_is_not_modified(client):
+    etag = client.get("/v1/bus/").headers["ETag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/v1/bus/", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+
+def test_stale_if_none_match_gets_the_body(client):
+    response = client.get("/v1/bus/", headers={"If-None-Match": '"outdated"'})
+
+    assert response.status_code == 200
+    assert response.json() == ["A", "B", "C", "D"]
+
+
+def test_each_encoding_has_its_own_etag(client):
+    identity = client.get("/v1/bus_stop/", headers={"Accept-Encoding": "identity"})
+    gzip = client.get("/v1/bus_stop/", headers={"Accept-Encoding": "gzip"})
+
+    assert gzip.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in gzip.headers["Vary"]
+    assert gzip.json() == identity.json()
+    assert gzip.headers["ETag"] != identity.headers["ETag"]
+    revalidated = client.get(
+        "/v1/bus_stop/", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def _all_pages(client, url: str) -> list[list[dict]]:
+    pages = []
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            return pages
+        assert 'rel="next"' in response.headers["Link"]
+        url = f"{url.split('&cursor=')[0]}&cursor={cursor}"
+
+
+def test_pages_cover_the_list_once_in_id_order(client):
+    everything = client.get("/v1/bus_stop/").json()
+
+    pages = _all_pages(client, "/v1/bus_stop/?limit=5")
+
+    assert all(len(page) == 5 for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= 5
+    assert [stop for page in pages for stop in page] == sorted(everything, key=lambda stop: stop["id"])
+
+
+def test_pages_keep_only_requested_fields(client):
+    pages = _all_pages(client, "/v1/direction/?limit=3&fields=id")
+
+    ids = [direction for page in pages for direction in page]
+    assert ids == sorted(ids, key=lambda direction: direction["id"])
+    assert all(list(direction) == ["id"] for direction in ids)
+    assert len(ids) == len(client.get("/v1/direction/").json())
+
+
+def test_pages_carry_the_network_etag(client):
+    etag = client.get("/v1/bus_stop/", headers={"Accept-Encoding": "identity"}).headers["ETag"]
+
+    page = client.get("/v1/bus_stop/?limit=5", headers={"Accept-Encoding": "identity"})
+
+    assert page.headers["ETag"] == etag
+    assert client.get("/v1/bus_stop/?limit=5", headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("url, status", [
+    ("/v1/bus_stop/?cursor=not-a-cursor", 400),
+    ("/v1/direction/?cursor=IkdBTUJFMSI", 400),  # a bus stop cursor ("GAMBE1")
+    ("/v1/bus_stop/?fields=id,color", 400),
+    ("/v1/bus_stop/?limit=0", 422),
+    ("/v1/bus_stop/?limit=501", 422),
+])
+def test_invalid_page_requests_are_rejected(client, url, status):
+    assert client.get(url).status_code == status
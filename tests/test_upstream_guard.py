@@ -0,0 +1,104 @@
+"""Circuit breaker states, and the rate limit of upstream calls."""
+import asyncio
+import time
+
+import pytest
+
+from services.upstream_guard import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, TokenBucket, UpstreamRejectedError
+
+RECOVERY = 0.05
+
+
+def _opened_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+    for _ in range(2):
+        breaker.record_failure(breaker.before_call())
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_open_circuit_rejects_until_recovery():
+    breaker = _opened_breaker()
+
+    with pytest.raises(UpstreamRejectedError) as rejected:
+        breaker.before_call()
+    assert 0 < rejected.value.retry_after <= RECOVERY
+    assert breaker.rejected == 1
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = _opened_breaker()
+    time.sleep(RECOVERY)
+
+    assert breaker.before_call() is True
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(UpstreamRejectedError):
+        breaker.before_call()
+
+
+def test_probe_success_closes_the_circuit():
+    breaker = _opened_breaker()
+    time.sleep(RECOVERY)
+
+    breaker.record_success(breaker.before_call())
+
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is False
+    assert breaker.before_call() is False
+
+
+def test_probe_failure_opens_the_circuit_again():
+    breaker = _opened_breaker()
+    time.sleep(RECOVERY)
+
+    breaker.record_failure(breaker.before_call())
+
+    assert breaker.state == OPEN
+    with pytest.raises(UpstreamRejectedError):
+        breaker.before_call()
+
+
+def test_calls_started_before_the_probe_do_not_free_its_slot():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=RECOVERY)
+    slow = breaker.before_call()
+    breaker.record_failure(breaker.before_call())
+    breaker.record_failure(breaker.before_call())
+    time.sleep(RECOVERY)
+    probe = breaker.before_call()
+
+    # The call started while closed ends during the probe
+    breaker.release(slow)
+
+    with pytest.raises(UpstreamRejectedError):
+        breaker.before_call()
+    breaker.release(probe)
+    assert breaker.before_call() is True
+
+
+def test_rate_limit_queues_a_burst_then_rejects():
+    async def scenario():
+        bucket = TokenBucket(rate=10, burst=2, max_wait=0.15)
+        start = time.monotonic()
+        results = await asyncio.gather(*(bucket.acquire() for _ in range(4)), return_exceptions=True)
+        return bucket, results, time.monotonic() - start
+
+    bucket, results, elapsed = asyncio.run(scenario())
+
+    # Two calls use the burst, the third waits 0.1 s for a token and the
+    # fourth would wait 0.2 s, longer than max_wait
+    assert results[:3] == [None, None, None]
+    assert isinstance(results[3], UpstreamRejectedError)
+    assert results[3].retry_after > 0.15
+    assert 0.09 <= elapsed < 0.2
+    assert bucket.rejected == 1